@@ -0,0 +1,316 @@
+"""
+Benchmark the API against a synthetic catalog.
+
+The app runs in process with the in-memory data backend and is called
+through httpx's ASGI transport, so results reflect the API's own cost
+(catalog assembly, serialization, validation) without network or database
+noise. Each scenario reports latency percentiles, throughput and, with
+--trace-memory, the peak Python heap it allocated; the report is written as
+JSON so runs can be compared with --compare.
+
+Usage (from the localization-management-api directory):
+    python scripts/benchmark.py --keys 10000 --languages 10 --output bench.json
+    python scripts/benchmark.py --keys 100000 --languages 40 --min-fill 0.3 --requests 20
+    python scripts/benchmark.py --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# The memory backend never talks to Supabase, but the settings require these
+os.environ["DATA_BACKEND"] = "memory"
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+
+import httpx
+from synthetic_catalog import (
+    fill_rates,
+    generate_keys,
+    generate_languages,
+    generate_translations,
+)
+from src.localization_management_api.core.cache import get_catalog_cache
+from src.localization_management_api.deps import get_supabase, get_supabase_strict
+from src.localization_management_api.main import app
+from src.localization_management_api.repositories.factory import get_memory_repository
+
+REPORT_VERSION = 1
+SCENARIOS = ("catalog_cold", "catalog_warm", "catalog_page", "bulk_update", "analytics")
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+
+def load_catalog(keys: int, languages: int, min_fill: float, max_fill: float, seed: int) -> Dict[str, Any]:
+    """Fill the in-memory repository with a synthetic catalog."""
+    repository = get_memory_repository()
+    language_rows = generate_languages(languages)
+    for language in language_rows:
+        repository.add_language(language["code"], language["name"])
+
+    key_rows = list(generate_keys(keys, seed))
+    for key in key_rows:
+        repository.add_key(key["key"], key["category"], key["description"], key_id=key["id"])
+
+    rates = fill_rates([language["code"] for language in language_rows], min_fill, max_fill)
+    translations = 0
+    for translation in generate_translations(key_rows, rates, seed):
+        repository.add_translation(translation["key_id"], translation["language_code"], translation["value"])
+        translations += 1
+
+    return {
+        "keys": keys,
+        "languages": languages,
+        "translations": translations,
+        "fill_rate": round(translations / (keys * languages), 4) if keys and languages else 0,
+    }
+
+
+def build_scenarios(args: argparse.Namespace) -> Dict[str, Tuple[Callable[[int], Request], Optional[Callable[[], None]]]]:
+    """Map each scenario to a request factory and an optional per-request setup."""
+    repository = get_memory_repository()
+    rng = random.Random(args.seed)
+    key_ids = sorted(repository.keys)
+    language_codes = sorted(repository.languages)
+    sections = sorted({key["key"].rsplit(".", 1)[0] for key in repository.keys.values()})
+    invalidate = get_catalog_cache().invalidate
+
+    def bulk_update(index: int) -> Request:
+        updates = [
+            {
+                "key_id": rng.choice(key_ids),
+                "language_code": rng.choice(language_codes),
+                "value": f"benchmark {index}.{row}",
+            }
+            for row in range(args.bulk_size)
+        ]
+        return "PATCH", "/localizations/bulk-update", {"json": updates}
+
+    return {
+        # Full catalog, assembled and encoded from scratch every time
+        "catalog_cold": (lambda index: ("GET", "/localizations", {}), invalidate),
+        # Full catalog served from the cache
+        "catalog_warm": (lambda index: ("GET", "/localizations", {}), None),
+        "catalog_page": (
+            lambda index: ("GET", "/localizations", {"params": {"limit": 100, "prefix": rng.choice(sections) + "."}}),
+            invalidate,
+        ),
+        "bulk_update": (bulk_update, None),
+        "analytics": (lambda index: ("GET", "/analytics/translation-completion/breakdown", {}), invalidate),
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Request],
+    setup: Optional[Callable[[], None]],
+    requests: int,
+    concurrency: int,
+    trace_memory: bool,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    response_bytes = 0
+    indices = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal response_bytes
+        for index in indices:
+            if setup is not None:
+                setup()
+            method, url, kwargs = make_request(index)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+            response_bytes += len(response.content)
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    peak_bytes = None
+    if trace_memory:
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_response_bytes": response_bytes // len(latencies) if latencies else 0,
+        "peak_traced_memory_bytes": peak_bytes,
+    }
+
+
+async def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    async def authenticated():
+        return None
+
+    app.dependency_overrides[get_supabase] = authenticated
+    app.dependency_overrides[get_supabase_strict] = authenticated
+
+    load_started = time.perf_counter()
+    dataset = load_catalog(args.keys, args.languages, args.min_fill, args.max_fill, args.seed)
+    dataset["load_seconds"] = round(time.perf_counter() - load_started, 2)
+    print(f"Loaded {dataset['keys']} keys x {dataset['languages']} languages, {dataset['translations']} translations")
+
+    scenarios = build_scenarios(args)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name in args.scenarios:
+                make_request, setup = scenarios[name]
+                if args.warmup:
+                    await run_scenario(client, make_request, setup, args.warmup, 1, False)
+                results[name] = await run_scenario(
+                    client, make_request, setup, args.requests, args.concurrency, args.trace_memory
+                )
+                latency = results[name]["latency_ms"]
+                print(
+                    f"{name:14} p50 {latency['p50']:9.2f} ms  p95 {latency['p95']:9.2f} ms  "
+                    f"p99 {latency['p99']:9.2f} ms  {results[name]['throughput_rps']:8.1f} req/s  "
+                    f"errors {results[name]['errors']}"
+                )
+
+    return {
+        "version": REPORT_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git_commit": _git_commit(),
+        },
+        "parameters": {
+            "keys": args.keys,
+            "languages": args.languages,
+            "min_fill": args.min_fill,
+            "max_fill": args.max_fill,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "bulk_size": args.bulk_size,
+            "trace_memory": args.trace_memory,
+        },
+        "dataset": dataset,
+        "scenarios": results,
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Describe the latency and throughput change of every scenario in both reports."""
+    lines = []
+    if baseline["parameters"] != current["parameters"]:
+        lines.append("Warning: the runs used different parameters")
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        changes = []
+        for metric in ("p50", "p95", "p99"):
+            old, new = before["latency_ms"][metric], result["latency_ms"][metric]
+            changes.append(f"{metric} {old:.2f} -> {new:.2f} ms ({_change(old, new)})")
+        old, new = before["throughput_rps"], result["throughput_rps"]
+        changes.append(f"throughput {old:.1f} -> {new:.1f} req/s ({_change(old, new)})")
+        lines.append(f"{name}: " + ", ".join(changes))
+    return lines
+
+
+def _change(old: float, new: float) -> str:
+    return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=10000, help="Translation keys to generate")
+    parser.add_argument("--languages", type=int, default=10, help="Active languages to generate")
+    parser.add_argument("--min-fill", type=float, default=0.5, help="Fill rate of the least complete language")
+    parser.add_argument("--max-fill", type=float, default=1.0, help="Fill rate of the most complete language")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated catalog and requests")
+    parser.add_argument("--requests", type=int, default=50, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per scenario")
+    parser.add_argument("--bulk-size", type=int, default=100, help="Rows per bulk-update request")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+        help="Scenarios to run",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record each scenario's peak Python heap (slows requests down)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="Compare the results with an earlier report")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmarks(args))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Report written to {args.output}")
+    if args.compare:
+        for line in compare_reports(json.loads(args.compare.read_text()), report):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,137 +1,219 @@
-import os
+"""
+Seed the database with test users and a synthetic translation catalog.
+
+Languages, keys and translations come from `synthetic_catalog`, so the same
+options always produce the same data. Rows are upserted in multi-row chunks
+with several chunks in flight at once, and every table is upserted on its
+natural key, so running the script again updates the existing rows instead
+of failing or duplicating them.
+
+Usage (from the localization-management-api directory):
+    python -m scripts.seed_prod_data
+    python -m scripts.seed_prod_data --keys 100000 --languages 20 --min-fill 0.4
+    python -m scripts.seed_prod_data --skip-users --chunk-size 2000 --concurrency 8
+"""
+import argparse
 import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from dotenv import load_dotenv
-from supabase import create_client, Client
-
-load_dotenv()
-
-supabase_url = os.getenv("SUPABASE_URL")
-service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-if not supabase_url or not service_role_key:
-    raise ValueError("Missing required environment variables: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(supabase_url, service_role_key)
-
-async def create_test_user(email: str, password: str, name: str):
-    """Create users with the given email and password"""
-    try:
-        user = supabase.auth.admin.create_user({
-            "email": email,
-            "password": password,
-            "email_confirm": True,
-            "user_metadata": {"full_name": name}
-        })
-        return user.user
-    except Exception as e:
-        print(f"Error creating user {email}: {str(e)}")
-        return None
-
-async def seed_test_data():
-    print("Starting to seed prod data...")
-    
-    # Create test users
-    test_users = [
-        {"email": "user1@example.com", "password": "user1pass123!", "name": "Test User 1"},
-        {"email": "user2@example.com", "password": "user2pass123!", "name": "Test User 2"}
-    ]
-    
-    created_users = []
-    for user_data in test_users:
-        print(f"Creating user: {user_data['email']}")
-        user = await create_test_user(
-            email=user_data["email"],
-            password=user_data["password"],
-            name=user_data["name"]
-        )
-        if user:
-            created_users.append(user)
-            print(f"✅ Created user: {user_data['email']}")
-
-    if not created_users:
-        print("❌ No users were created, aborting seed")
-        return
-
-    print("✅ Created users")
-
-    # Create languages
-    languages = [
-        {"code": "en", "name": "English", "is_active": True},
-        {"code": "jp", "name": "Japanese", "is_active": True},
-        {"code": "es", "name": "Spanish", "is_active": True}
-    ]
-    
-    created_languages = []
-    for lang in languages:
-        result = supabase.table("languages").insert(lang).execute()
-        if result.data:
-            created_languages.append(result.data[0])
-            print(f"✅ Created language: {lang['name']} ({lang['code']})")
-
-    if not created_languages:
-        print("❌ No languages were created, aborting seed")
-        return
-
-    # Create translation keys
-    translation_keys = [
-        {"key": "button.submit", "category": "buttons", "description": "Submit button text"},
-        {"key": "button.cancel", "category": "buttons", "description": "Cancel button text"},
-        {"key": "welcome.message", "category": "greetings", "description": "Welcome message"},
-        {"key": "error.required", "category": "errors", "description": "Required field error"},
-        {"key": "success.save", "category": "notifications", "description": "Save success message"}
-    ]
-    
-    created_keys = []
-    for key_data in translation_keys:
-        result = supabase.table("translation_keys").insert(key_data).execute()
-        if result.data:
-            created_keys.append(result.data[0])
-            print(f"✅ Created key: {key_data['key']}")
-
-    if not created_keys:
-        print("❌ No translation keys were created, aborting seed")
-        return
-
-    # Create translations
-    translations = [
-        # English translations
-        {"key_id": created_keys[0]["id"], "language_code": "en", "value": "Submit", "updated_by": created_users[0].id},
-        {"key_id": created_keys[1]["id"], "language_code": "en", "value": "Cancel", "updated_by": created_users[0].id},
-        {"key_id": created_keys[2]["id"], "language_code": "en", "value": "Welcome to Helium", "updated_by": created_users[0].id},
-        {"key_id": created_keys[3]["id"], "language_code": "en", "value": "This field is required", "updated_by": created_users[0].id},
-        {"key_id": created_keys[4]["id"], "language_code": "en", "value": "Changes saved successfully", "updated_by": created_users[0].id},
-        
-        # Japanese translations
-        {"key_id": created_keys[0]["id"], "language_code": "jp", "value": "送信", "updated_by": created_users[1].id},
-        {"key_id": created_keys[1]["id"], "language_code": "jp", "value": "キャンセル", "updated_by": created_users[1].id},
-        {"key_id": created_keys[2]["id"], "language_code": "jp", "value": "ヘリウムへようこそ", "updated_by": created_users[1].id},
-        {"key_id": created_keys[3]["id"], "language_code": "jp", "value": "この項目は必須です", "updated_by": created_users[1].id},
-        {"key_id": created_keys[4]["id"], "language_code": "jp", "value": "変更が保存されました", "updated_by": created_users[1].id},
-        
-        # Spanish translations
-        {"key_id": created_keys[0]["id"], "language_code": "es", "value": "Enviar", "updated_by": created_users[0].id},
-        {"key_id": created_keys[1]["id"], "language_code": "es", "value": "Cancelar", "updated_by": created_users[0].id},
-        {"key_id": created_keys[2]["id"], "language_code": "es", "value": "Bienvenido a Helium", "updated_by": created_users[0].id},
-        {"key_id": created_keys[3]["id"], "language_code": "es", "value": "Este campo es obligatorio", "updated_by": created_users[0].id},
-        {"key_id": created_keys[4]["id"], "language_code": "es", "value": "Cambios guardados exitosamente", "updated_by": created_users[0].id}
-    ]
-    
-    created_translations = 0
-    for translation in translations:
+from postgrest.types import ReturnMethod
+from supabase import AsyncClient, acreate_client
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_catalog import (
+    fill_rates,
+    generate_keys,
+    generate_languages,
+    generate_translations,
+)
+
+# Upserts that return their rows are capped like reads, so key chunks, whose
+# ids are read back, stay within the PostgREST row limit
+POSTGREST_MAX_ROWS = 1000
+
+TEST_USERS = [
+    {"email": "user1@example.com", "password": "user1pass123!", "name": "Test User 1"},
+    {"email": "user2@example.com", "password": "user2pass123!", "name": "Test User 2"},
+]
+
+
+def chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group `rows` into lists of `size`, without materializing the whole iterable."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def upsert_chunks(
+    supabase: AsyncClient,
+    table: str,
+    rows: Iterable[Dict[str, Any]],
+    on_conflict: str,
+    chunk_size: int,
+    concurrency: int,
+    retries: int,
+    returning: ReturnMethod = ReturnMethod.minimal,
+) -> List[dict]:
+    """
+    Upsert `rows` into `table`, one request per chunk and up to `concurrency`
+    requests at a time.
+
+    Workers pull chunks from a shared iterator, so only the chunks in flight
+    are held in memory. A failed chunk is retried with exponential backoff.
+
+    Returns:
+        The rows returned by the database; empty unless `returning` asks for them.
+    """
+    pending = chunks(rows, chunk_size)
+    returned: List[dict] = []
+    written = 0
+
+    async def upsert(chunk: List[Dict[str, Any]]) -> List[dict]:
+        for attempt in range(retries + 1):
+            try:
+                result = await (
+                    supabase
+                    .table(table)
+                    .upsert(chunk, on_conflict=on_conflict, returning=returning)
+                    .execute()
+                )
+                return result.data
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                print(f"Upsert of {len(chunk)} {table} rows failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def worker() -> None:
+        nonlocal written
+        for chunk in pending:
+            returned.extend(await upsert(chunk))
+            written += len(chunk)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    rate = f", {written / elapsed:,.0f} rows/s" if elapsed else ""
+    print(f"Upserted {written:,} {table} rows in {elapsed:.2f}s{rate}")
+    return returned
+
+
+async def ensure_test_users(supabase: AsyncClient) -> List[str]:
+    """Create the test users, reusing the ones that already exist. Returns their ids."""
+    existing = {user.email: user.id for user in await supabase.auth.admin.list_users()}
+    user_ids = []
+    for user_data in TEST_USERS:
+        if user_data["email"] in existing:
+            print(f"User {user_data['email']} already exists")
+            user_ids.append(existing[user_data["email"]])
+            continue
         try:
-            result = supabase.table("translations").insert(translation).execute()
-            if result.data:
-                created_translations += 1
+            response = await supabase.auth.admin.create_user({
+                "email": user_data["email"],
+                "password": user_data["password"],
+                "email_confirm": True,
+                "user_metadata": {"full_name": user_data["name"]},
+            })
         except Exception as e:
-            print(f"Error creating translation: {str(e)}")
-
-    print(f"✅ Created {created_translations} translations")
+            print(f"Error creating user {user_data['email']}: {str(e)}")
+            continue
+        print(f"Created user {user_data['email']}")
+        user_ids.append(response.user.id)
+    return user_ids
+
+
+async def seed(args: argparse.Namespace) -> None:
+    load_dotenv()
+    supabase_url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not supabase_url or not service_role_key:
+        raise ValueError("Missing required environment variables: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+
+    supabase = await acreate_client(supabase_url, service_role_key)
+    started = time.perf_counter()
+
+    user_ids = [] if args.skip_users else await ensure_test_users(supabase)
+
+    languages = generate_languages(args.languages)
+    await upsert_chunks(
+        supabase, "languages", languages, "code", args.chunk_size, args.concurrency, args.retries
+    )
+
+    # Keys are upserted on their name, so keys left by an earlier run keep
+    # their ids; translations are written against the ids the database returns
+    keys = list(generate_keys(args.keys, args.seed))
+    key_rows = await upsert_chunks(
+        supabase,
+        "translation_keys",
+        ({"key": key["key"], "category": key["category"], "description": key["description"]} for key in keys),
+        "key",
+        min(args.chunk_size, POSTGREST_MAX_ROWS),
+        args.concurrency,
+        args.retries,
+        returning=ReturnMethod.representation,
+    )
+    key_ids = {row["key"]: row["id"] for row in key_rows}
+    for key in keys:
+        key["id"] = key_ids[key["key"]]
+
+    codes = [language["code"] for language in languages]
+    rates = fill_rates(codes, args.min_fill, args.max_fill)
+    # Spread the languages over the test users, so contributor analytics have data
+    editors = {code: user_ids[index % len(user_ids)] for index, code in enumerate(codes)} if user_ids else {}
+
+    def translations() -> Iterator[Dict[str, Any]]:
+        for translation in generate_translations(keys, rates, args.seed):
+            if editors:
+                translation["updated_by"] = editors[translation["language_code"]]
+            yield translation
+
+    await upsert_chunks(
+        supabase,
+        "translations",
+        translations(),
+        "key_id,language_code",
+        args.chunk_size,
+        args.concurrency,
+        args.retries,
+    )
+
+    print(f"\nSeed completed in {time.perf_counter() - started:.2f}s")
+    print(f"Users: {len(user_ids)}")
+    print(f"Languages: {len(languages)}")
+    print(f"Translation keys: {len(keys)}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=50, help="Translation keys to generate")
+    parser.add_argument("--languages", type=int, default=3, help="Active languages to generate")
+    parser.add_argument("--min-fill", type=float, default=0.8, help="Fill rate of the least complete language")
+    parser.add_argument("--max-fill", type=float, default=1.0, help="Fill rate of the most complete language")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated catalog")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per upsert request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Upsert requests in flight at once")
+    parser.add_argument("--retries", type=int, default=3, help="Retries of a failed upsert request")
+    parser.add_argument("--skip-users", action="store_true", help="Do not create the test users")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1 or args.concurrency < 1:
+        parser.error("--chunk-size and --concurrency must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    asyncio.run(seed(parse_args(argv)))
 
-    print("\n🎉 Seed completed successfully!")
-    print(f"Users: {len(created_users)}")
-    print(f"Languages: {len(created_languages)}")
-    print(f"Translation keys: {len(created_keys)}")
-    print(f"Translations: {created_translations}")
 
 if __name__ == "__main__":
-    asyncio.run(seed_test_data())
+    main()
@@ -0,0 +1,99 @@
+"""
+Deterministic synthetic catalogs for seeding and benchmarks.
+
+The same parameters always produce the same languages, keys (including
+their ids) and translations, so seeding is repeatable and benchmark runs are
+comparable.
+"""
+import random
+import uuid
+from typing import Dict, Iterator, List
+
+# Fixed namespace for key ids, so ids only depend on the seed and key name
+KEY_ID_NAMESPACE = uuid.UUID("6f1c1c52-8f3e-4c39-9d3b-3f0d5a8e2b71")
+
+LANGUAGES = [
+    ("en", "English"), ("es", "Spanish"), ("jp", "Japanese"), ("fr", "French"),
+    ("de", "German"), ("it", "Italian"), ("pt", "Portuguese"), ("nl", "Dutch"),
+    ("sv", "Swedish"), ("da", "Danish"), ("fi", "Finnish"), ("nb", "Norwegian"),
+    ("pl", "Polish"), ("cs", "Czech"), ("sk", "Slovak"), ("hu", "Hungarian"),
+    ("ro", "Romanian"), ("bg", "Bulgarian"), ("el", "Greek"), ("tr", "Turkish"),
+    ("ru", "Russian"), ("uk", "Ukrainian"), ("ar", "Arabic"), ("he", "Hebrew"),
+    ("hi", "Hindi"), ("bn", "Bengali"), ("th", "Thai"), ("vi", "Vietnamese"),
+    ("id", "Indonesian"), ("ms", "Malay"), ("ko", "Korean"), ("zh", "Chinese"),
+    ("zh-TW", "Chinese (Traditional)"), ("es-MX", "Spanish (Mexico)"),
+    ("pt-BR", "Portuguese (Brazil)"), ("fr-CA", "French (Canada)"),
+    ("en-GB", "English (UK)"), ("ca", "Catalan"), ("hr", "Croatian"), ("sr", "Serbian"),
+]
+
+CATEGORIES = ["buttons", "labels", "errors", "messages", "navigation", "forms", "emails", "settings"]
+
+WORDS = (
+    "account save cancel submit delete confirm profile settings message error "
+    "required field password email welcome back continue order payment "
+    "invoice team project search filter export import language update "
+    "success warning loading empty select option upload download share"
+).split()
+
+
+def generate_languages(count: int) -> List[Dict[str, object]]:
+    """`count` active languages; codes beyond the built-in list are synthetic."""
+    languages = [
+        {"code": code, "name": name, "is_active": True}
+        for code, name in LANGUAGES[:count]
+    ]
+    for index in range(len(languages), count):
+        languages.append({"code": f"x{index:03d}", "name": f"Language {index}", "is_active": True})
+    return languages
+
+
+def fill_rates(language_codes: List[str], min_fill: float, max_fill: float) -> Dict[str, float]:
+    """
+    Spread fill rates linearly from `max_fill` for the first language down
+    to `min_fill` for the last, like a source language followed by
+    progressively less complete translations.
+    """
+    if len(language_codes) == 1:
+        return {language_codes[0]: max_fill}
+    step = (max_fill - min_fill) / (len(language_codes) - 1)
+    return {code: max_fill - index * step for index, code in enumerate(language_codes)}
+
+
+def key_id(seed: int, key: str) -> str:
+    return str(uuid.uuid5(KEY_ID_NAMESPACE, f"{seed}:{key}"))
+
+
+def generate_keys(count: int, seed: int = 0) -> Iterator[Dict[str, str]]:
+    """Translation keys named `<category>.<section>.key<n>`, with stable ids."""
+    rng = random.Random(seed)
+    for index in range(count):
+        category = CATEGORIES[index % len(CATEGORIES)]
+        key = f"{category}.section{index // 100:04d}.key{index:06d}"
+        yield {
+            "id": key_id(seed, key),
+            "key": key,
+            "category": category,
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+        }
+
+
+def generate_translations(
+    keys: List[Dict[str, str]],
+    rates: Dict[str, float],
+    seed: int = 0,
+) -> Iterator[Dict[str, str]]:
+    """
+    Translations for `keys`, where each language has a value for roughly
+    its fill rate of the keys.
+    """
+    rng = random.Random(seed + 1)
+    for key in keys:
+        for language_code, rate in rates.items():
+            if rng.random() >= rate:
+                continue
+            words = rng.choices(WORDS, k=rng.randint(1, 8))
+            yield {
+                "key_id": key["id"],
+                "language_code": language_code,
+                "value": f"[{language_code}] {' '.join(words)}",
+            }
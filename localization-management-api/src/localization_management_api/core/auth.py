@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import jwt
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SYMMETRIC_ALGORITHMS = {"HS256"}
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
+
+class LocalVerificationUnavailable(Exception):
+    """The token cannot be checked locally and must be verified by the auth server."""
+
+
+class UnknownSigningKey(LocalVerificationUnavailable):
+    """The token names a signing key that is not in the cached JWKS."""
+
+
+class TokenVerifier:
+    """
+    Verify Supabase access tokens without calling the auth server.
+
+    HS256 tokens are checked against the project JWT secret; RS256/ES256 tokens
+    against the project's JWKS. `verify` never does I/O: the JWKS is fetched
+    by `verify_async`, in a thread, when a token names a key it does not know
+    yet, and at most once per `jwks_refresh_interval` seconds, so tokens with
+    made-up key ids cannot make every request refetch it. Validated tokens are
+    kept in a bounded LRU until their `exp`, so repeated requests with the
+    same token skip signature verification entirely.
+    """
+
+    def __init__(
+        self,
+        jwt_secret: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        audience: str = "authenticated",
+        max_entries: int = 10000,
+        leeway: float = 0,
+        jwks_refresh_interval: float = 30,
+    ):
+        self.jwt_secret = jwt_secret or None
+        self.audience = audience
+        self.max_entries = max_entries
+        self.leeway = leeway
+        self.jwks_refresh_interval = jwks_refresh_interval
+        self._jwks_client = jwt.PyJWKClient(jwks_url, cache_jwk_set=False) if jwks_url else None
+        self._signing_keys: Dict[str, Any] = {}
+        self._jwks_fetched_at = float("-inf")
+        self._jwks_refresh_lock = asyncio.Lock()
+        self._lock = threading.Lock()
+        self._validated: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return the claims of a valid token.
+
+        Raises:
+            jwt.InvalidTokenError: If the token is invalid or expired.
+            LocalVerificationUnavailable: If no key is available to check it.
+            UnknownSigningKey: If its signing key is not in the cached JWKS.
+        """
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+        with self._lock:
+            cached = self._validated.get(cache_key)
+            if cached is not None:
+                expires_at, claims = cached
+                if expires_at > now:
+                    self._validated.move_to_end(cache_key)
+                    return claims
+                del self._validated[cache_key]
+
+        claims = self._decode(token)
+
+        with self._lock:
+            self._validated[cache_key] = (float(claims["exp"]), claims)
+            while len(self._validated) > self.max_entries:
+                self._validated.popitem(last=False)
+        return claims
+
+    async def verify_async(self, token: str) -> Dict[str, Any]:
+        """Like `verify`, refreshing the JWKS off the event loop when the token's key is unknown."""
+        try:
+            return self.verify(token)
+        except UnknownSigningKey:
+            if not await self.refresh_signing_keys():
+                raise
+        return self.verify(token)
+
+    async def refresh_signing_keys(self) -> bool:
+        """
+        Fetch the JWKS again, unless it was fetched less than
+        `jwks_refresh_interval` seconds ago. Returns whether the keys may
+        have changed since the call, including by a concurrent refresh.
+        """
+        if self._jwks_client is None:
+            return False
+        fetched_at = self._jwks_fetched_at
+        async with self._jwks_refresh_lock:
+            if self._jwks_fetched_at != fetched_at:
+                return True
+            if time.monotonic() - self._jwks_fetched_at < self.jwks_refresh_interval:
+                return False
+            # Failed fetches count too, so an unreachable auth server is not
+            # asked again on every request
+            self._jwks_fetched_at = time.monotonic()
+            try:
+                signing_keys = await asyncio.to_thread(self._fetch_signing_keys)
+            except (jwt.PyJWKClientError, jwt.exceptions.PyJWKError) as e:
+                logger.warning(f"Could not fetch the JWKS: {e}")
+                return False
+            self._signing_keys = signing_keys
+            return True
+
+    def _fetch_signing_keys(self) -> Dict[str, Any]:
+        return {
+            jwk.key_id: jwk.key
+            for jwk in self._jwks_client.get_jwk_set().keys
+            if jwk.key_id is not None
+        }
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            if self.jwt_secret is None:
+                raise LocalVerificationUnavailable("SUPABASE_JWT_SECRET is not configured")
+            key = self.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            if self._jwks_client is None:
+                raise LocalVerificationUnavailable("No JWKS URL is configured")
+            key = self._signing_keys.get(header.get("kid"))
+            if key is None:
+                raise UnknownSigningKey(f"Signing key unavailable: {header.get('kid')}")
+        else:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {algorithm}")
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            leeway=self.leeway,
+            options={"require": ["exp", "sub"]},
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._validated.clear()
+
+
+def token_subject(token: str) -> Optional[str]:
+    """
+    The `sub` claim (the user id) of a token that has already been verified,
+    or None for tokens without one, such as the service role key.
+    """
+    try:
+        return jwt.decode(token, options={"verify_signature": False}).get("sub")
+    except jwt.InvalidTokenError:
+        return None
+
+
+_token_verifier: Optional[TokenVerifier] = None
+
+def get_token_verifier() -> TokenVerifier:
+    global _token_verifier
+    if _token_verifier is None:
+        _token_verifier = TokenVerifier(
+            jwt_secret=settings.SUPABASE_JWT_SECRET,
+            jwks_url=f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+            max_entries=settings.AUTH_TOKEN_CACHE_SIZE,
+            jwks_refresh_interval=settings.AUTH_JWKS_REFRESH_SECONDS,
+        )
+    return _token_verifier
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from postgrest import AsyncPostgrestClient
+from ..repositories.base import CatalogRepository
+from .catalog import POSTGREST_MAX_ROWS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Values per `in` filter, keeping request URLs well below server limits
+IN_FILTER_BATCH_SIZE = 200
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """Split `items` into consecutive chunks of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def gather_bounded(awaitables: Iterable[Awaitable[T]], concurrency: int) -> List[T]:
+    """Like `asyncio.gather`, but with at most `concurrency` awaitables running at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables))
+
+
+async def fetch_all_rows(
+    supabase: AsyncPostgrestClient,
+    table: str,
+    columns: str,
+    concurrency: int = 4,
+) -> List[dict]:
+    """
+    Read a whole table, past the PostgREST row cap.
+
+    The first page also returns the row count, and the remaining pages are
+    then read up to `concurrency` at a time.
+    """
+    first_page = await (
+        supabase
+        .table(table)
+        .select(columns, count="exact")
+        .order("id")
+        .range(0, POSTGREST_MAX_ROWS - 1)
+        .execute()
+    )
+    rows = list(first_page.data)
+    total = first_page.count or 0
+    pages = await gather_bounded(
+        (
+            supabase
+            .table(table)
+            .select(columns)
+            .order("id")
+            .range(offset, offset + POSTGREST_MAX_ROWS - 1)
+            .execute()
+            for offset in range(POSTGREST_MAX_ROWS, total, POSTGREST_MAX_ROWS)
+        ),
+        concurrency,
+    )
+    for page in pages:
+        rows.extend(page.data)
+    return rows
+
+
+async def fetch_existing_key_ids(
+    supabase: AsyncPostgrestClient,
+    key_ids: Sequence[str],
+    concurrency: int = 4,
+) -> set:
+    """Return the subset of `key_ids` that exist in translation_keys."""
+    keys_results = await gather_bounded(
+        (
+            supabase
+            .table("translation_keys")
+            .select("id")
+            .in_("id", list(batch))
+            .execute()
+            for batch in chunked(list(key_ids), IN_FILTER_BATCH_SIZE)
+        ),
+        concurrency,
+    )
+    return {key["id"] for keys_result in keys_results for key in keys_result.data}
+
+
+async def upsert_translations_batched(
+    write_chunk: Callable[[List[Dict[str, str]]], Awaitable[List[dict]]],
+    rows: List[Dict[str, str]],
+    chunk_size: int,
+    concurrency: int,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Upsert translation rows in chunks of `chunk_size`, running up to
+    `concurrency` chunks at a time.
+
+    `write_chunk(rows)` upserts one chunk in a single transaction, so it is
+    written entirely or not at all, and returns the rows as written. When the same
+    (key_id, language_code) appears more than once the last row wins and the
+    earlier ones are reported as superseded, since Postgres rejects a chunk
+    that upserts the same row twice.
+
+    Returns:
+        A per-row report in input order, and the rows written as returned by
+        the database.
+    """
+    results: List[dict] = [
+        {
+            "index": index,
+            "key_id": row["key_id"],
+            "language_code": row["language_code"],
+            "status": "superseded",
+        }
+        for index, row in enumerate(rows)
+    ]
+
+    last_index = {}
+    for index, row in enumerate(rows):
+        last_index[(row["key_id"], row["language_code"])] = index
+    chunks = list(chunked(sorted(last_index.values()), chunk_size))
+
+    async def write(indices: Sequence[int]) -> None:
+        try:
+            written_rows = await write_chunk([rows[index] for index in indices])
+        except Exception as e:
+            logger.warning(f"Translation chunk of {len(indices)} rows failed: {e}")
+            for index in indices:
+                results[index]["status"] = "failed"
+                results[index]["error"] = str(e)
+        else:
+            written.extend(written_rows)
+            for index in indices:
+                results[index]["status"] = "updated"
+
+    written: List[dict] = []
+    await gather_bounded((write(indices) for indices in chunks), concurrency)
+    return results, written
+
+
+def classify_translation_updates(
+    rows: Sequence[Dict[str, str]],
+    current: Dict[str, Dict[str, dict]],
+) -> List[str]:
+    """
+    Compare rows about to be written with the stored translations, `current`
+    being grouped by key_id and language as `fetch_translations_for_keys`
+    returns them. Each row is `new`, `changed` or `unchanged`; when the same
+    (key_id, language_code) appears more than once, the earlier rows are
+    `superseded` and only the last one is compared.
+    """
+    last_index = {}
+    for index, row in enumerate(rows):
+        last_index[(row["key_id"], row["language_code"])] = index
+
+    changes = ["superseded"] * len(rows)
+    for (key_id, language_code), index in last_index.items():
+        stored = current.get(key_id, {}).get(language_code)
+        if stored is None:
+            changes[index] = "new"
+        elif stored.get("value") != rows[index]["value"]:
+            changes[index] = "changed"
+        else:
+            changes[index] = "unchanged"
+    return changes
+
+
+async def write_translation_updates(
+    repository: CatalogRepository,
+    rows: List[Dict[str, str]],
+    chunk_size: int,
+    concurrency: int,
+    dry_run: bool = False,
+    updated_by: Optional[str] = None,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Upsert only the rows that change a stored translation.
+
+    The current values of the rows' keys are read first, in batches, and
+    rows equal to them are reported `unchanged` and not written, so their
+    `updated_at`, and the ETags, deltas and caches derived from it, stay as
+    they are. The rest go to `repository.upsert_translations`. A value
+    written by someone else between the read and the write can make a row
+    look unchanged; it is then left as that writer set it. Written rows get
+    `updated_by`, the id of the user making the change, so they are counted
+    as that user's contributions.
+
+    Every result has a `change` of `new`, `changed`, `unchanged` or
+    `superseded`. With `dry_run` nothing is written and that is also the
+    result's status.
+
+    Returns:
+        A per-row report in input order, and the rows written.
+    """
+    key_ids = sorted({row["key_id"] for row in rows})
+    languages = {row["language_code"] for row in rows}
+    # Imports are usually one language at a time; read only that one then
+    language = next(iter(languages)) if len(languages) == 1 else None
+    current: Dict[str, Dict[str, dict]] = {}
+    for translations in await gather_bounded(
+        (
+            repository.fetch_translations_for_keys(batch, language)
+            for batch in chunked(key_ids, IN_FILTER_BATCH_SIZE)
+        ),
+        concurrency,
+    ):
+        current.update(translations)
+
+    changes = classify_translation_updates(rows, current)
+    results: List[dict] = [
+        {
+            "index": index,
+            "key_id": row["key_id"],
+            "language_code": row["language_code"],
+            "status": change,
+            "change": change,
+        }
+        for index, (row, change) in enumerate(zip(rows, changes))
+    ]
+    to_write = [index for index, change in enumerate(changes) if change in ("new", "changed")]
+    if dry_run or not to_write:
+        return results, []
+
+    write_results, written = await repository.upsert_translations(
+        [{**rows[index], "updated_by": updated_by} for index in to_write],
+        chunk_size,
+        concurrency,
+    )
+    for index, write_result in zip(to_write, write_results):
+        results[index]["status"] = write_result["status"]
+        if "error" in write_result:
+            results[index]["error"] = write_result["error"]
+    return results, written
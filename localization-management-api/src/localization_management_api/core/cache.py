@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from .config import settings
+
+MISSING = object()
+
+CATALOG_REGION = "catalog"
+# Entries keyed by client input are kept in LRUs of their own, each holding
+# at most this many entries, so no request can evict the catalog entries
+REGION_MAX_ENTRIES = {
+    "pages": 128,
+    "runtime": 64,
+    "search": 128,
+}
+
+
+class CatalogSnapshot:
+    """The full catalog as served by GET /localizations, indexed by key id."""
+
+    def __init__(self, entries: List[dict], languages: List[str], version: int):
+        self.entries = entries
+        self.languages = languages
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.by_id: Dict[str, dict] = {entry["id"]: entry for entry in entries}
+
+
+class CatalogCache:
+    """
+    In-process cache of the translation catalog, keyed by a catalog version.
+
+    The full catalog is kept as a `CatalogSnapshot` that writes patch in place.
+    Anything derived from it (pages, analytics) is stored in a bounded LRU
+    under the version it was computed for, so bumping the version on a write
+    retires those entries. Everything also expires after `ttl_seconds`, which
+    picks up changes made directly in the database.
+
+    Entries whose keys come from requests go to a named `region` of
+    REGION_MAX_ENTRIES, a separate LRU that only evicts its own entries.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._regions: Dict[str, "OrderedDict[Tuple[int, Hashable], Tuple[float, Any]]"] = {
+            CATALOG_REGION: self._entries,
+        }
+
+    def _is_fresh(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at < self.ttl_seconds
+
+    def _region(self, region: str) -> "OrderedDict[Tuple[int, Hashable], Tuple[float, Any]]":
+        if region not in self._regions:
+            if region not in REGION_MAX_ENTRIES:
+                raise KeyError(f"Unknown cache region: {region}")
+            self._regions[region] = OrderedDict()
+        return self._regions[region]
+
+    def _clear_entries(self) -> None:
+        for entries in self._regions.values():
+            entries.clear()
+
+    def get_snapshot(self) -> Optional[CatalogSnapshot]:
+        """Return the cached full catalog, or None on a miss."""
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and self._is_fresh(snapshot.loaded_at):
+                self.hits += 1
+                return snapshot
+            self._snapshot = None
+            self.misses += 1
+            return None
+
+    def store_snapshot(self, entries: List[dict], languages: List[str], version: int) -> Optional[CatalogSnapshot]:
+        """
+        Store a freshly loaded full catalog and return its snapshot.
+
+        `version` must be the cache version read before the catalog was
+        loaded; if a write happened in the meantime the data may be stale and
+        is not stored, and None is returned.
+        """
+        with self._lock:
+            if version != self.version:
+                return None
+            self._snapshot = CatalogSnapshot(entries, languages, version)
+            return self._snapshot
+
+    def get(self, key: Hashable, region: str = CATALOG_REGION) -> Any:
+        """Return the value cached under `key` for the current version, or MISSING."""
+        with self._lock:
+            entries = self._region(region)
+            cache_key = (self.version, key)
+            item = entries.get(cache_key)
+            if item is not None and self._is_fresh(item[0]):
+                entries.move_to_end(cache_key)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del entries[cache_key]
+            self.misses += 1
+            return MISSING
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        version: Optional[int] = None,
+        region: str = CATALOG_REGION,
+    ) -> None:
+        """Cache `value` under `key`, evicting the least recently used entries of its region."""
+        with self._lock:
+            version = self.version if version is None else version
+            if version != self.version:
+                return
+            entries = self._region(region)
+            max_entries = self.max_entries if region == CATALOG_REGION else REGION_MAX_ENTRIES[region]
+            cache_key = (version, key)
+            entries[cache_key] = (time.monotonic(), value)
+            entries.move_to_end(cache_key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        region: str = CATALOG_REGION,
+    ) -> Any:
+        """Return the cached value for `key`, awaiting `loader()` on a miss."""
+        version = self.version
+        value = self.get(key, region)
+        if value is MISSING:
+            value = await loader()
+            self.put(key, value, version, region)
+        return value
+
+    def apply_translation_updates(self, rows: Iterable[dict]) -> int:
+        """
+        Record written translation rows and bump the catalog version.
+
+        The cached full catalog is patched in place; derived entries from the
+        previous version are dropped. Returns the new version.
+        """
+        with self._lock:
+            self.version += 1
+            self._clear_entries()
+            if self._patch(rows):
+                self._snapshot.version = self.version
+            return self.version
+
+    def patch_snapshot(self, rows: Iterable[dict]) -> None:
+        """
+        Patch the cached full catalog in place without bumping the version,
+        so entries derived from it are kept until the next version bump.
+        """
+        with self._lock:
+            self._patch(rows)
+
+    def _patch(self, rows: Iterable[dict]) -> bool:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False
+        for row in rows:
+            entry = snapshot.by_id.get(row["key_id"])
+            if entry is None:
+                # A key we have never seen; reload instead of guessing
+                self._snapshot = None
+                return False
+            entry["translations"][row["language_code"]] = {
+                "value": row["value"],
+                "updated_at": row.get("updated_at"),
+            }
+        return True
+
+    def invalidate(self) -> int:
+        """Drop everything and bump the catalog version."""
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+            self._clear_entries()
+            return self.version
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "regions": {
+                    region: len(entries)
+                    for region, entries in self._regions.items()
+                    if region != CATALOG_REGION
+                },
+                "ttl_seconds": self.ttl_seconds,
+                "snapshot_keys": len(self._snapshot.entries) if self._snapshot else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_catalog_cache: Optional[CatalogCache] = None
+
+def get_catalog_cache() -> CatalogCache:
+    global _catalog_cache
+    if _catalog_cache is None:
+        _catalog_cache = CatalogCache(
+            max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+        )
+    return _catalog_cache
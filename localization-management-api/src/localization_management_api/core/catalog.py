@@ -0,0 +1,138 @@
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+# Supabase caps PostgREST responses at 1000 rows unless max-rows is raised,
+# so anything that may exceed that has to be read in batches of this size.
+POSTGREST_MAX_ROWS = 1000
+
+KEY_COLUMNS = "id, key, category, description, created_at, updated_at"
+TRANSLATION_COLUMNS = "key_id, language_code, value, updated_at"
+
+
+def build_key_entry(
+    key: Dict[str, Any],
+    translations: Optional[Dict[str, Dict[str, Any]]],
+    languages: Iterable[str],
+) -> Dict[str, Any]:
+    """
+    Build the API representation of a translation key.
+
+    Every language in `languages` is present in the result; languages without
+    a stored translation get an empty value.
+    """
+    translations = translations or {}
+    entry_translations = {
+        lang_code: {
+            "value": trans["value"],
+            "updated_at": trans["updated_at"],
+        }
+        for lang_code, trans in translations.items()
+    }
+    for lang_code in languages:
+        if lang_code not in entry_translations:
+            entry_translations[lang_code] = {
+                "value": "",
+                "updated_at": None,
+            }
+
+    return {
+        "id": key["id"],
+        "key": key["key"],
+        "category": key["category"],
+        "description": key.get("description"),
+        "created_at": key["created_at"],
+        "updated_at": key["updated_at"],
+        "translations": entry_translations,
+    }
+
+
+def group_translations_by_key(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Group translation rows by key_id and language_code."""
+    translations_by_key: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for trans in rows:
+        translations_by_key.setdefault(trans["key_id"], {})[trans["language_code"]] = trans
+    return translations_by_key
+
+
+def has_missing_translation(entry: Dict[str, Any], languages: Iterable[str]) -> bool:
+    """Whether any of `languages` has an empty value in a key entry."""
+    translations = entry["translations"]
+    return any(
+        not translations.get(lang_code, {}).get("value")
+        for lang_code in languages
+    )
+
+
+def compute_completion(entries: Iterable[Dict[str, Any]], languages: List[str]) -> Dict[str, float]:
+    """
+    Percentage of keys with a non-empty translation, per language.
+    """
+    entries = list(entries)
+    if not languages or not entries:
+        return {}
+
+    translated = {lang_code: 0 for lang_code in languages}
+    for entry in entries:
+        for lang_code in languages:
+            trans = entry["translations"].get(lang_code)
+            if trans and trans["value"]:
+                translated[lang_code] += 1
+
+    return {
+        lang_code: round(count / len(entries) * 100, 2)
+        for lang_code, count in translated.items()
+    }
+
+
+def encode_cursor(key: str) -> str:
+    """Encode the last key of a page as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def escape_like(pattern: str) -> str:
+    """Escape LIKE wildcards so `pattern` is matched literally."""
+    return (
+        pattern
+        .replace("\\", "\\\\")
+        .replace("%", "\\%")
+        .replace("_", "\\_")
+    )
+
+
+def compute_etag(watermark: Dict[str, Any], variant: str = "") -> str:
+    """
+    Build an entity tag from a catalog watermark.
+
+    `variant` distinguishes representations of the same catalog state, such as
+    different pages or filters of GET /localizations.
+    """
+    payload = json.dumps([watermark, variant], sort_keys=True, default=str)
+    return f'"{hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches `etag`."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or etag in (
+        candidate[2:] if candidate.startswith("W/") else candidate
+        for candidate in candidates
+    )
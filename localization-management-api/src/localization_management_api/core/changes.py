@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from ..repositories.base import CatalogRepository
+from ..repositories.factory import get_service_repository
+from ..repositories.postgres import listen_for_translation_changes
+from .columnar import dumps_json
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_SOURCES = ("local", "postgres")
+# Clients wait this long before reconnecting after the stream drops
+RECONNECT_MILLISECONDS = 3000
+LISTENER_RETRY_SECONDS = 5.0
+# Look-back applied to `since` and watermarks to cover transactions still in
+# flight at the time of the previous read
+SINCE_OVERLAP_SECONDS = 5
+
+ChangeKey = Tuple[str, str]
+
+
+def format_event(event: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    """One server-sent event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    return ("\n".join(lines) + "\ndata: ").encode() + dumps_json(data) + b"\n\n"
+
+
+def _change(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "key_id": row["key_id"],
+        "language_code": row["language_code"],
+        "value": row["value"],
+        "updated_at": row.get("updated_at"),
+    }
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class Subscriber:
+    """
+    The queue of encoded events waiting to be sent to one client.
+
+    A client that falls `queue_size` events behind is disconnected rather
+    than buffered without bound; it resumes from its last event id.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(queue_size + 1)
+        self.queue_size = queue_size
+
+    def put(self, frame: Optional[bytes]) -> None:
+        if frame is not None and self.queue.qsize() >= self.queue_size:
+            logger.info("Disconnecting a change feed subscriber that fell behind")
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            frame = None
+        self.queue.put_nowait(frame)
+
+
+class ChangeFeed:
+    """
+    Pushes translation changes to subscribers as server-sent events.
+
+    Changes are collected for `coalesce_seconds` and only the latest per
+    (key_id, language_code) is kept; each batch is then encoded once as a
+    single `changes` event and the same bytes are queued for every
+    subscriber. The last `history_size` events are kept, so a reconnecting
+    client can be sent what it missed.
+
+    Event ids are `<epoch>:<sequence>:<watermark>`, where the epoch
+    identifies this process and the watermark is the newest `updated_at` the
+    client has seen. A client whose events are no longer in the history, or
+    that was connected to another process, is caught up from the database
+    from the watermark instead.
+
+    With the `local` source, changes are published by the endpoints that
+    write them, so each process only sees its own writes. The `postgres`
+    source listens for notifications from triggers on the translations table
+    instead, which covers every process and writes made outside the API.
+    """
+
+    def __init__(
+        self,
+        source: str = "local",
+        coalesce_seconds: float = 0.1,
+        history_size: int = 1000,
+        queue_size: int = 256,
+    ):
+        if source not in CHANGE_FEED_SOURCES:
+            raise ValueError(f"Unknown change feed source: {source}. Use one of: {', '.join(CHANGE_FEED_SOURCES)}")
+        self.source = source
+        self.coalesce_seconds = coalesce_seconds
+        self.queue_size = queue_size
+        self.epoch = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.watermark: Optional[str] = None
+        self._history: Deque[Tuple[int, bytes]] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscriber] = set()
+        # Latest change per (key_id, language_code); without a value when it
+        # came from a notification and still has to be read
+        self._pending: Dict[ChangeKey, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._emit_lock = asyncio.Lock()
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def event_id(self) -> str:
+        return f"{self.epoch}:{self.sequence}:{self.watermark or ''}"
+
+    async def start(self) -> None:
+        if self.source == "postgres" and self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen(), name="change-feed-listener")
+
+    async def stop(self) -> None:
+        """Stop listening and end every subscriber's stream."""
+        for task in (self._listener_task, self._flush_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._listener_task = None
+        self._flush_task = None
+        for subscriber in self._subscribers:
+            subscriber.put(None)
+
+    def publish(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Queue written translation rows for the next event. Ignored with the
+        `postgres` source, which receives the same writes from the database.
+        """
+        if self.source != "local":
+            return
+        for row in rows:
+            self._pending[(row["key_id"], row["language_code"])] = _change(row)
+        self._schedule_flush()
+
+    def _notify(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._pending[(row["key_id"], row["language_code"])] = {
+                "key_id": row["key_id"],
+                "language_code": row["language_code"],
+                "updated_at": row.get("updated_at"),
+            }
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._pending and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.coalesce_seconds)
+        # Batches are emitted one at a time and in order, even when loading
+        # the values of one takes longer than the next window
+        async with self._emit_lock:
+            changes, self._pending = self._pending, {}
+            self._flush_task = None
+            try:
+                await self._load_values(changes)
+            except Exception:
+                logger.exception("Could not read the values of changed translations")
+                return
+            self._emit([change for change in changes.values() if "value" in change])
+
+    async def _load_values(self, changes: Dict[ChangeKey, Dict[str, Any]]) -> None:
+        key_ids = sorted({key_id for (key_id, _), change in changes.items() if "value" not in change})
+        if not key_ids:
+            return
+        repository = await get_service_repository()
+        translations = await repository.fetch_translations_for_keys(key_ids)
+        for (key_id, language_code), change in changes.items():
+            row = translations.get(key_id, {}).get(language_code)
+            # Without a row the translation was deleted since; nothing to send
+            if "value" not in change and row is not None:
+                change.update(_change(row))
+
+    def _emit(self, changes: List[Dict[str, Any]]) -> None:
+        if not changes:
+            return
+        self.sequence += 1
+        timestamps = [change["updated_at"] for change in changes if change["updated_at"]]
+        if self.watermark is not None:
+            timestamps.append(self.watermark)
+        if timestamps:
+            self.watermark = max(timestamps, key=_parse_timestamp)
+        frame = format_event("changes", {"changes": changes}, self.event_id())
+        self._history.append((self.sequence, frame))
+        for subscriber in self._subscribers:
+            subscriber.put(frame)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Tuple[Subscriber, Optional[List[bytes]], Optional[str]]:
+        """
+        Register a subscriber and find what it missed since `last_event_id`.
+
+        Returns the subscriber, the missed events when the history still
+        holds them (None otherwise), and the client's watermark.
+        """
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        if not last_event_id:
+            return subscriber, [], None
+
+        epoch, _, rest = last_event_id.partition(":")
+        sequence, _, watermark = rest.partition(":")
+        try:
+            _parse_timestamp(watermark)
+        except ValueError:
+            watermark = ""
+        if epoch == self.epoch and sequence.isdigit():
+            seen = int(sequence)
+            oldest = self._history[0][0] if self._history else self.sequence + 1
+            if oldest - 1 <= seen <= self.sequence:
+                return subscriber, [frame for number, frame in self._history if number > seen], watermark or None
+        return subscriber, None, watermark or None
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    async def _listen(self) -> None:
+        """Receive notifications from the database, reconnecting when the connection drops."""
+        while True:
+            connection = None
+            try:
+                closed = asyncio.Event()
+                connection = await listen_for_translation_changes(self._notify, closed.set)
+                await closed.wait()
+                logger.warning("Change feed listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed listener failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(LISTENER_RETRY_SECONDS)
+
+
+async def iter_change_events(
+    feed: ChangeFeed,
+    repository: CatalogRepository,
+    last_event_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    heartbeat_seconds: float = 15.0,
+    max_replay_rows: int = 5000,
+) -> AsyncIterator[bytes]:
+    """
+    The server-sent event stream of one client.
+
+    The stream starts with what the client missed: from the feed's history,
+    or else read from the database from its watermark (or `since`), looking
+    back `SINCE_OVERLAP_SECONDS` further so rows committed late are not
+    missed, with one change per (key_id, language_code). When neither is
+    possible, or more than `max_replay_rows` changed, a `reset`
+    event tells the client to reload the catalog. Then it follows the feed,
+    with a comment every `heartbeat_seconds` to keep idle connections open.
+    """
+    subscriber, missed, watermark = feed.subscribe(last_event_id)
+    # Events from here on reach the subscriber's queue, so a catch-up read
+    # from the database is labelled with the sequence as of now
+    sequence = feed.sequence
+    try:
+        yield f"retry: {RECONNECT_MILLISECONDS}\n\n".encode()
+
+        if last_event_id is None and since is None:
+            pass
+        elif last_event_id is not None and missed is not None:
+            for frame in missed:
+                yield frame
+        elif watermark or since:
+            start = (_parse_timestamp(watermark) if watermark else since) - timedelta(seconds=SINCE_OVERLAP_SECONDS)
+            # One row over the cap is enough to know it is exceeded
+            _, translations = await repository.fetch_changes_since(start, limit=max_replay_rows + 1)
+            if len(translations) > max_replay_rows:
+                yield format_event("reset", {"reason": "too_many_changes"}, feed.event_id())
+            elif translations:
+                # Rows come oldest first, so the newest value of each cell wins
+                latest: Dict[ChangeKey, Dict[str, Any]] = {}
+                for row in translations:
+                    latest[(row["key_id"], row["language_code"])] = _change(row)
+                changes = list(latest.values())
+                newest = max(
+                    (change["updated_at"] for change in changes if change["updated_at"]),
+                    key=_parse_timestamp,
+                    default=watermark,
+                )
+                yield format_event("changes", {"changes": changes}, f"{feed.epoch}:{sequence}:{newest or ''}")
+        else:
+            yield format_event("reset", {"reason": "history_unavailable"}, feed.event_id())
+
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), heartbeat_seconds)
+            except TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if frame is None:
+                return
+            yield frame
+    finally:
+        feed.unsubscribe(subscriber)
+
+
+_change_feed: Optional[ChangeFeed] = None
+
+def get_change_feed() -> ChangeFeed:
+    global _change_feed
+    if _change_feed is None:
+        _change_feed = ChangeFeed(
+            source=settings.CHANGE_FEED_SOURCE,
+            coalesce_seconds=settings.CHANGE_FEED_COALESCE_MS / 1000,
+            history_size=settings.CHANGE_FEED_HISTORY_SIZE,
+            queue_size=settings.CHANGE_FEED_QUEUE_SIZE,
+        )
+    return _change_feed
@@ -0,0 +1,80 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard encoder is used instead
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; without it only JSON is offered
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_JSON_MEDIA_TYPE = "application/vnd.localization.catalog+json"
+COLUMNAR_MSGPACK_MEDIA_TYPE = "application/vnd.localization.catalog+msgpack"
+COLUMNAR_FORMAT = "columnar-v1"
+KEY_FIELDS = ("id", "key", "category", "description", "created_at", "updated_at")
+
+
+def build_columnar_catalog(entries: Iterable[Dict[str, Any]], languages: List[str]) -> Dict[str, Any]:
+    """
+    Lay the catalog out as parallel arrays.
+
+    `keys[field][i]` is a field of the i-th key, and `values[lang][i]` /
+    `updated_at[lang][i]` its translation in `lang` (`""` / None when there is
+    none), so field names and language codes appear once instead of per key.
+    """
+    entries = list(entries)
+    keys = {field: [entry.get(field) for entry in entries] for field in KEY_FIELDS}
+    values = {}
+    updated_at = {}
+    for lang_code in languages:
+        translations = [entry["translations"].get(lang_code) or {} for entry in entries]
+        values[lang_code] = [trans.get("value", "") for trans in translations]
+        updated_at[lang_code] = [trans.get("updated_at") for trans in translations]
+    return {
+        "format": COLUMNAR_FORMAT,
+        "languages": list(languages),
+        "keys": keys,
+        "values": values,
+        "updated_at": updated_at,
+    }
+
+
+def dumps_json(content: Any) -> bytes:
+    """Compact JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Pick the catalog representation for an Accept header.
+
+    The columnar formats are only used when asked for explicitly; anything
+    else gets the default JSON list.
+    """
+    offered = set()
+    for part in (accept or "").split(","):
+        media_type, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        offered.add(media_type.strip().lower())
+    if msgpack is not None and COLUMNAR_MSGPACK_MEDIA_TYPE in offered:
+        return COLUMNAR_MSGPACK_MEDIA_TYPE
+    if COLUMNAR_JSON_MEDIA_TYPE in offered:
+        return COLUMNAR_JSON_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def encode_catalog(entries: List[Dict[str, Any]], languages: List[str], media_type: str) -> bytes:
+    """Serialize the catalog in the representation named by `media_type`."""
+    if media_type == JSON_MEDIA_TYPE:
+        return dumps_json(entries)
+    columnar = build_columnar_catalog(entries, languages)
+    if media_type == COLUMNAR_MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(columnar, use_bin_type=True, default=str)
+    return dumps_json(columnar)
@@ -13,6 +13,79 @@ class Settings:
         self.FRONTEND_URL              = self._get_required_env("FRONTEND_URL")
         self.ENV                       = self._get_optional_env("ENV", default="development")
 
+        # Shared HTTP connection pool for Supabase calls
+        self.SUPABASE_HTTP_MAX_CONNECTIONS           = int(self._get_optional_env("SUPABASE_HTTP_MAX_CONNECTIONS", default="100"))
+        self.SUPABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(self._get_optional_env("SUPABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS", default="20"))
+        self.SUPABASE_HTTP_TIMEOUT_SECONDS           = float(self._get_optional_env("SUPABASE_HTTP_TIMEOUT_SECONDS", default="30"))
+
+        # Token verification: "local" checks JWTs in-process and falls back to
+        # the auth server only when no key is available; "remote" always calls it.
+        # The JWKS is fetched again at most every AUTH_JWKS_REFRESH_SECONDS
+        self.AUTH_MODE                 = self._get_optional_env("AUTH_MODE", default="local")
+        self.SUPABASE_JWT_SECRET       = self._get_optional_env("SUPABASE_JWT_SECRET")
+        self.AUTH_TOKEN_CACHE_SIZE     = int(self._get_optional_env("AUTH_TOKEN_CACHE_SIZE", default="10000"))
+        self.AUTH_JWKS_REFRESH_SECONDS = float(self._get_optional_env("AUTH_JWKS_REFRESH_SECONDS", default="30"))
+
+        # In-process catalog cache
+        self.CATALOG_CACHE_MAX_ENTRIES = int(self._get_optional_env("CATALOG_CACHE_MAX_ENTRIES", default="256"))
+        self.CATALOG_CACHE_TTL_SECONDS = float(self._get_optional_env("CATALOG_CACHE_TTL_SECONDS", default="60"))
+
+        # Catalog snapshot file shared by the worker processes of one host
+        # (empty disables it); workers check it for a newer file this often
+        self.SHARED_SNAPSHOT_PATH                   = self._get_optional_env("SHARED_SNAPSHOT_PATH")
+        self.SHARED_SNAPSHOT_CHECK_INTERVAL_SECONDS = float(self._get_optional_env("SHARED_SNAPSHOT_CHECK_INTERVAL_SECONDS", default="1"))
+
+        # Batched writes for PATCH /localizations/bulk-update
+        self.BULK_UPSERT_CHUNK_SIZE    = int(self._get_optional_env("BULK_UPSERT_CHUNK_SIZE", default="500"))
+        self.BULK_UPSERT_CONCURRENCY   = int(self._get_optional_env("BULK_UPSERT_CONCURRENCY", default="4"))
+
+        # Write-behind for PATCH /localizations/{key_id}: edits are acknowledged
+        # at once and written in batches after WRITE_BEHIND_INTERVAL_MS, or
+        # when WRITE_BEHIND_MAX_PENDING cells are waiting
+        self.WRITE_BEHIND_ENABLED      = self._get_optional_env("WRITE_BEHIND_ENABLED", default="false").lower() == "true"
+        self.WRITE_BEHIND_INTERVAL_MS  = float(self._get_optional_env("WRITE_BEHIND_INTERVAL_MS", default="500"))
+        self.WRITE_BEHIND_MAX_PENDING  = int(self._get_optional_env("WRITE_BEHIND_MAX_PENDING", default="1000"))
+
+        # Data access: "supabase" goes through PostgREST with the caller's
+        # token, "postgres" connects to DATABASE_URL directly (needs asyncpg),
+        # "memory" keeps an unpersisted catalog in process
+        self.DATA_BACKEND              = self._get_optional_env("DATA_BACKEND", default="supabase")
+        self.DATABASE_URL              = self._get_optional_env("DATABASE_URL")
+        self.DATABASE_POOL_MIN_SIZE    = int(self._get_optional_env("DATABASE_POOL_MIN_SIZE", default="1"))
+        self.DATABASE_POOL_MAX_SIZE    = int(self._get_optional_env("DATABASE_POOL_MAX_SIZE", default="10"))
+
+        # Background jobs (imports, exports, analytics recomputation)
+        self.JOB_WORKERS               = int(self._get_optional_env("JOB_WORKERS", default="2"))
+        self.JOB_RETENTION_SECONDS     = float(self._get_optional_env("JOB_RETENTION_SECONDS", default="3600"))
+
+        # Runtime lookups (GET /localizations/runtime/{lang}): every chain ends
+        # with DEFAULT_LOCALE; LOCALE_FALLBACKS adds pairs like "es-MX:es-419".
+        # RUNTIME_PUBLIC serves them without a token, so CDNs can cache them
+        self.DEFAULT_LOCALE                  = self._get_optional_env("DEFAULT_LOCALE", default="en")
+        self.LOCALE_FALLBACKS                = self._get_optional_env("LOCALE_FALLBACKS")
+        self.RUNTIME_PUBLIC                  = self._get_optional_env("RUNTIME_PUBLIC", default="false").lower() == "true"
+        self.RUNTIME_CACHE_MAX_AGE           = int(self._get_optional_env("RUNTIME_CACHE_MAX_AGE", default="60"))
+        self.RUNTIME_CACHE_S_MAXAGE          = int(self._get_optional_env("RUNTIME_CACHE_S_MAXAGE", default="300"))
+        self.RUNTIME_STALE_WHILE_REVALIDATE  = int(self._get_optional_env("RUNTIME_STALE_WHILE_REVALIDATE", default="86400"))
+
+        # Live change feed (GET /localizations/changes): "local" publishes this
+        # process's own writes, "postgres" listens for database notifications
+        # on DATABASE_URL (needs asyncpg)
+        self.CHANGE_FEED_SOURCE             = self._get_optional_env("CHANGE_FEED_SOURCE", default="local")
+        self.CHANGE_FEED_COALESCE_MS        = float(self._get_optional_env("CHANGE_FEED_COALESCE_MS", default="100"))
+        self.CHANGE_FEED_HISTORY_SIZE       = int(self._get_optional_env("CHANGE_FEED_HISTORY_SIZE", default="1000"))
+        self.CHANGE_FEED_QUEUE_SIZE         = int(self._get_optional_env("CHANGE_FEED_QUEUE_SIZE", default="256"))
+        self.CHANGE_FEED_HEARTBEAT_SECONDS  = float(self._get_optional_env("CHANGE_FEED_HEARTBEAT_SECONDS", default="15"))
+        self.CHANGE_FEED_MAX_REPLAY_ROWS    = int(self._get_optional_env("CHANGE_FEED_MAX_REPLAY_ROWS", default="5000"))
+
+        # Request metrics: GET /metrics (unauthenticated, so off by default),
+        # Server-Timing response headers, slow request logging (0 disables it)
+        # and the share of requests run under the sampling profiler
+        self.METRICS_ENABLED           = self._get_optional_env("METRICS_ENABLED", default="false").lower() == "true"
+        self.SERVER_TIMING_ENABLED     = self._get_optional_env("SERVER_TIMING_ENABLED", default="false").lower() == "true"
+        self.SLOW_REQUEST_MS           = float(self._get_optional_env("SLOW_REQUEST_MS", default="0"))
+        self.PROFILE_SAMPLE_RATE       = float(self._get_optional_env("PROFILE_SAMPLE_RATE", default="0"))
+
     def _get_required_env(self, var_name: str) -> str:
         val = os.getenv(var_name)
         if val is None:
@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import io
+import json
+import struct
+import zipfile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # installed from requirements.txt; without it exports are offered with gzip only
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+MO_MAGIC = 0x950412de
+
+
+class ExportConflictError(ValueError):
+    """The catalog cannot be represented in the requested format."""
+
+
+def _translated_values(entries: Iterable[Dict[str, Any]], language: str) -> List[Tuple[str, str]]:
+    """(key, value) pairs with a non-empty translation in `language`, sorted by key."""
+    values = []
+    for entry in entries:
+        value = entry["translations"].get(language, {}).get("value")
+        if value:
+            values.append((entry["key"], value))
+    return sorted(values)
+
+
+def build_flat_json(entries: Iterable[Dict[str, Any]], language: str) -> bytes:
+    """`{"button.submit": "Submit", ...}`; untranslated keys are left out."""
+    return json.dumps(
+        dict(_translated_values(entries, language)),
+        ensure_ascii=False,
+        indent=2,
+    ).encode("utf-8")
+
+
+def build_nested_json(entries: Iterable[Dict[str, Any]], language: str) -> bytes:
+    """
+    Like `build_flat_json`, but with keys split on `.` into nested objects.
+
+    Raises:
+        ExportConflictError: If a key is both a value and a prefix of another
+            key, e.g. `button` and `button.submit`.
+    """
+    tree: Dict[str, Any] = {}
+    for key, value in _translated_values(entries, language):
+        *parents, leaf = key.split(".")
+        node = tree
+        for depth, part in enumerate(parents):
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ExportConflictError(
+                    f"Key '{key}' conflicts with '{'.'.join(parents[:depth + 1])}'"
+                )
+        if leaf in node:
+            raise ExportConflictError(f"Key '{key}' conflicts with a nested key")
+        node[leaf] = value
+    return json.dumps(tree, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _po_header(language: str) -> str:
+    return (
+        "Content-Type: text/plain; charset=UTF-8\n"
+        "Content-Transfer-Encoding: 8bit\n"
+        f"Language: {language}\n"
+    )
+
+
+def _po_quote(text: str) -> str:
+    escaped = (
+        text
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\t", "\\t")
+        .replace("\r", "\\r")
+    )
+    lines = escaped.split("\n")
+    if len(lines) == 1:
+        return f'"{escaped}"'
+    # Multi-line strings start with an empty line, one source line per line
+    parts = [f'"{line}\\n"' for line in lines[:-1]]
+    if lines[-1]:
+        parts.append(f'"{lines[-1]}"')
+    return '""\n' + "\n".join(parts)
+
+
+def build_po(entries: Iterable[Dict[str, Any]], language: str) -> bytes:
+    """
+    A gettext catalog with one message per key, using the key as msgid.
+
+    Untranslated keys are included with an empty msgstr, and descriptions
+    become extracted comments.
+    """
+    blocks = [f'msgid ""\nmsgstr {_po_quote(_po_header(language))}\n']
+    for entry in sorted(entries, key=lambda entry: entry["key"]):
+        lines = []
+        if entry.get("description"):
+            lines.extend(f"#. {line}" for line in entry["description"].splitlines())
+        value = entry["translations"].get(language, {}).get("value") or ""
+        lines.append(f"msgid {_po_quote(entry['key'])}")
+        lines.append(f"msgstr {_po_quote(value)}")
+        blocks.append("\n".join(lines) + "\n")
+    return "\n".join(blocks).encode("utf-8")
+
+
+def build_mo(entries: Iterable[Dict[str, Any]], language: str) -> bytes:
+    """
+    A compiled gettext catalog (little-endian, no hash table).
+
+    Only translated keys are included, as `msgfmt` does.
+    """
+    messages = {"": _po_header(language)}
+    messages.update(_translated_values(entries, language))
+
+    ids = b""
+    strs = b""
+    offsets = []
+    for msgid in sorted(messages, key=lambda msgid: msgid.encode("utf-8")):
+        msgid_bytes = msgid.encode("utf-8")
+        msgstr_bytes = messages[msgid].encode("utf-8")
+        offsets.append((len(ids), len(msgid_bytes), len(strs), len(msgstr_bytes)))
+        ids += msgid_bytes + b"\0"
+        strs += msgstr_bytes + b"\0"
+
+    count = len(offsets)
+    # Header is 7 words, followed by the msgid and msgstr tables of 2 words each
+    keys_start = 7 * 4 + count * 16
+    values_start = keys_start + len(ids)
+    key_table = []
+    value_table = []
+    for id_offset, id_length, str_offset, str_length in offsets:
+        key_table += [id_length, keys_start + id_offset]
+        value_table += [str_length, values_start + str_offset]
+
+    words = [MO_MAGIC, 0, count, 7 * 4, 7 * 4 + count * 8, 0, 0] + key_table + value_table
+    return struct.pack(f"<{len(words)}I", *words) + ids + strs
+
+
+# name -> (builder, media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[Callable[[Iterable[Dict[str, Any]], str], bytes], str, str]] = {
+    "json": (build_flat_json, "application/json", "json"),
+    "nested-json": (build_nested_json, "application/json", "json"),
+    "po": (build_po, "text/x-gettext-translation; charset=utf-8", "po"),
+    "mo": (build_mo, "application/x-gettext-translation", "mo"),
+}
+
+
+class ExportArtifact:
+    """
+    An export file held in memory, uncompressed and pre-compressed.
+
+    Pass `precompress=False` for bodies that are already compressed, such as
+    zip archives.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str,
+        filename: str,
+        precompress: bool = True,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ):
+        self.media_type = media_type
+        self.filename = filename
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.encodings: Dict[str, bytes] = {"identity": body}
+        if precompress:
+            self.encodings["gzip"] = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+            if brotli is not None:
+                self.encodings["br"] = brotli.compress(body, quality=brotli_quality)
+
+    def select_encoding(self, accept_encoding: Optional[str]) -> str:
+        """
+        Pick the smallest available encoding the client accepts.
+
+        Encodings with `q=0` are treated as refused; `identity` is always
+        acceptable, so very small files may be sent uncompressed.
+        """
+        accepted = {"identity"}
+        for part in (accept_encoding or "").split(","):
+            name, _, params = part.strip().partition(";")
+            name = name.strip().lower()
+            if not name:
+                continue
+            quality = params.strip().replace(" ", "")
+            if quality in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(name)
+        if "*" in accepted:
+            accepted.update(self.encodings)
+
+        candidates = [encoding for encoding in self.encodings if encoding in accepted]
+        return min(candidates, key=lambda encoding: len(self.encodings[encoding]))
+
+    def encoding_etag(self, encoding: str) -> str:
+        """The ETag of the body in `encoding`."""
+        # Strong ETags identify the exact bytes, so each encoding gets its own
+        return self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+
+
+def build_export_archive(entries: Iterable[Dict[str, Any]], languages: Iterable[str], export_format: str) -> ExportArtifact:
+    """Build the exports of several languages in `export_format` as one zip archive."""
+    builder, _, extension = EXPORT_FORMATS[export_format]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for language in languages:
+            archive.writestr(f"{language}.{extension}", builder(entries, language))
+    return ExportArtifact(
+        buffer.getvalue(),
+        "application/zip",
+        f"translations-{export_format}.zip",
+        precompress=False,
+    )
+
+
+def build_export(entries: Iterable[Dict[str, Any]], language: str, export_format: str) -> ExportArtifact:
+    """
+    Build the export of `language` in `export_format` (a key of EXPORT_FORMATS).
+
+    Raises:
+        ExportConflictError: If the catalog cannot be represented in the format.
+    """
+    builder, media_type, extension = EXPORT_FORMATS[export_format]
+    return ExportArtifact(
+        builder(entries, language),
+        media_type,
+        f"{language}.{extension}",
+    )
@@ -0,0 +1,466 @@
+import codecs
+import csv
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+from xml.etree.ElementTree import XMLPullParser, ParseError
+from ..repositories.base import CatalogRepository
+from .bulk import write_translation_updates
+from .cache import get_catalog_cache
+from .changes import get_change_feed
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "xliff", "json")
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/xliff+xml": "xliff",
+    "application/x-xliff+xml": "xliff",
+    "application/xml": "xliff",
+    "text/xml": "xliff",
+    "application/json": "json",
+}
+# Longest single CSV record or JSON value accepted, so one malformed record
+# cannot make the parser buffer the rest of the file
+MAX_RECORD_CHARS = 1_000_000
+# Errors listed in an import report; further errors are only counted
+MAX_REPORTED_ERRORS = 1000
+# CSV columns that are neither the key nor a language in the one-column-per-language layout
+IGNORED_CSV_COLUMNS = {"key_id", "category", "description"}
+
+
+class ImportFormatError(ValueError):
+    """The file is malformed and cannot be read any further."""
+
+
+def _row(row: int, key: Any, language_code: Any, value: Any) -> Dict[str, Any]:
+    return {"row": row, "key": key, "language_code": language_code, "value": value}
+
+
+async def _iter_text(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream (with or without BOM) chunk by chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        async for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f"File is not valid UTF-8: {e}") from e
+    if text:
+        yield text
+
+
+async def _iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """
+    Yield CSV records one at a time.
+
+    Lines are joined until the record has an even number of quotes, which
+    is where a quoted field containing line breaks ends.
+    """
+    buffer = ""
+    record = ""
+    quotes = 0
+    async for text in _iter_text(chunks):
+        buffer += text
+        *lines, buffer = buffer.split("\n")
+        complete = []
+        for line in lines:
+            record += line + "\n"
+            quotes += line.count('"')
+            if quotes % 2 == 0:
+                complete.append(record)
+                record = ""
+                quotes = 0
+            elif len(record) > MAX_RECORD_CHARS:
+                raise ImportFormatError(f"CSV record longer than {MAX_RECORD_CHARS} characters")
+        if len(buffer) > MAX_RECORD_CHARS:
+            raise ImportFormatError(f"CSV line longer than {MAX_RECORD_CHARS} characters")
+        # One reader per chunk; each item is a whole record
+        for fields in csv.reader(complete):
+            yield fields
+
+    record += buffer
+    if (quotes + buffer.count('"')) % 2:
+        raise ImportFormatError("Unterminated quoted field at end of CSV file")
+    if record.strip():
+        yield next(csv.reader([record]), [])
+
+
+async def parse_csv(chunks: AsyncIterator[bytes], language: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse a CSV file with a header row. Two layouts are accepted:
+
+    - `key,language_code,value` (or `key,value` with `language` given)
+    - `key,en,es,...`, one column per language code
+
+    `row` counts CSV records, with the header as row 1.
+    """
+    records = _iter_csv_records(chunks)
+    header = await anext(records, None)
+    if header is None:
+        return
+    header = [column.strip() for column in header]
+    if "key" not in header:
+        raise ImportFormatError("CSV header must include a 'key' column")
+    key_index = header.index("key")
+
+    if "value" in header:
+        value_index = header.index("value")
+        language_index = header.index("language_code") if "language_code" in header else None
+        if language_index is None and not language:
+            raise ImportFormatError("CSV without a 'language_code' column needs the 'language' parameter")
+        row = 1
+        async for record in records:
+            row += 1
+            if not any(record):
+                continue
+            if len(record) != len(header):
+                yield {"row": row, "error": f"Expected {len(header)} columns, got {len(record)}"}
+                continue
+            yield _row(
+                row,
+                record[key_index],
+                record[language_index] if language_index is not None else language,
+                record[value_index],
+            )
+        return
+
+    language_columns = [
+        (index, column)
+        for index, column in enumerate(header)
+        if index != key_index and column not in IGNORED_CSV_COLUMNS
+    ]
+    row = 1
+    async for record in records:
+        row += 1
+        if not any(record):
+            continue
+        if len(record) != len(header):
+            yield {"row": row, "error": f"Expected {len(header)} columns, got {len(record)}"}
+            continue
+        for index, column in language_columns:
+            yield _row(row, record[key_index], column, record[index])
+
+
+class _JsonReader:
+    """Pull-style reader over a stream of JSON text."""
+
+    def __init__(self, texts: AsyncIterator[str]):
+        self._texts = texts
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    async def _read_more(self) -> bool:
+        if self.eof:
+            return False
+        text = await anext(self._texts, None)
+        if text is None:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    async def next_char(self) -> Optional[str]:
+        """Skip whitespace and return (without consuming) the next character."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not await self._read_more():
+                return None
+
+    async def expect(self, chars: str) -> str:
+        char = await self.next_char()
+        if char is None or char not in chars:
+            found = "end of file" if char is None else repr(char)
+            raise ImportFormatError(f"Expected one of {chars!r} in JSON, found {found}")
+        self.pos += 1
+        return char
+
+    async def value(self) -> Any:
+        """Decode the next JSON value, reading more input while it is incomplete."""
+        await self.next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if len(self.buffer) - self.pos > MAX_RECORD_CHARS:
+                    raise ImportFormatError(f"JSON value longer than {MAX_RECORD_CHARS} characters")
+                if not await self._read_more():
+                    raise ImportFormatError(f"Invalid JSON: {e.msg}") from e
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not isinstance(value, (str, dict, list)) and await self._read_more():
+                continue
+            self.pos = end
+            return value
+
+
+async def parse_json(chunks: AsyncIterator[bytes], language: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse a flat `{"key": "value", ...}` object for a single `language`.
+
+    `row` is the position of the entry in the object, starting at 1.
+    """
+    if not language:
+        raise ImportFormatError("JSON imports need the 'language' parameter")
+    reader = _JsonReader(_iter_text(chunks))
+    await reader.expect("{")
+    if await reader.next_char() == "}":
+        return
+
+    row = 0
+    while True:
+        row += 1
+        key = await reader.value()
+        if not isinstance(key, str):
+            raise ImportFormatError("Expected a string key in JSON object")
+        await reader.expect(":")
+        value = await reader.value()
+        if isinstance(value, str):
+            yield _row(row, key, language, value)
+        else:
+            yield {"row": row, "key": key, "error": "Value must be a string"}
+        if await reader.expect(",}") == "}":
+            return
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class _XliffReader:
+    """Incremental XLIFF reader that drops each unit once it has been read."""
+
+    def __init__(self, language: Optional[str]):
+        self.parser = XMLPullParser(events=("start", "end"))
+        self.language = language
+        self.file_language: Optional[str] = None
+        self.stack = []
+        self.row = 0
+
+    def feed(self, chunk: Optional[bytes]) -> List[Dict[str, Any]]:
+        """Feed a chunk (None at the end of the file) and return the rows completed by it."""
+        try:
+            if chunk is None:
+                self.parser.close()
+            else:
+                self.parser.feed(chunk)
+            events = list(self.parser.read_events())
+        except ParseError as e:
+            raise ImportFormatError(f"Invalid XLIFF: {e}") from e
+
+        rows = []
+        for event, element in events:
+            name = _local_name(element.tag)
+            if event == "start":
+                self.stack.append(element)
+                if name == "xliff" and element.get("trgLang"):
+                    self.file_language = element.get("trgLang")
+                elif name == "file" and element.get("target-language"):
+                    self.file_language = element.get("target-language")
+                continue
+
+            self.stack.pop()
+            if name not in ("trans-unit", "unit"):
+                continue
+            self.row += 1
+            key = element.get("resname") or element.get("name") or element.get("id")
+            target = next(
+                (child for child in element.iter() if _local_name(child.tag) == "target"),
+                None,
+            )
+            if target is not None:
+                rows.append(_row(self.row, key, self.language or self.file_language, "".join(target.itertext())))
+            if self.stack:
+                self.stack[-1].remove(element)
+        return rows
+
+
+async def parse_xliff(chunks: AsyncIterator[bytes], language: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse XLIFF 1.2 (`trans-unit`) or 2.0 (`unit`) files.
+
+    The key is the unit's `resname` (1.2) or `name` (2.0), falling back to
+    its `id`; the target language comes from the file unless `language` is
+    given. Units without a target are ignored. `row` is the position of the
+    unit, starting at 1.
+    """
+    reader = _XliffReader(language)
+    async for chunk in chunks:
+        for row in reader.feed(chunk):
+            yield row
+    for row in reader.feed(None):
+        yield row
+
+
+PARSERS: Dict[str, Callable[[AsyncIterator[bytes], Optional[str]], AsyncIterator[Dict[str, Any]]]] = {
+    "csv": parse_csv,
+    "xliff": parse_xliff,
+    "json": parse_json,
+}
+
+
+class ImportReport:
+    """Counters and (capped) per-row errors of an import."""
+
+    def __init__(self, import_format: str, dry_run: bool = False):
+        self.format = import_format
+        self.dry_run = dry_run
+        self.rows = 0
+        self.updated = 0
+        self.new = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.invalid = 0
+        self.skipped = 0
+        self.superseded = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self.aborted: Optional[str] = None
+
+    def add_error(self, row: int, error: str, key: Any = None, language_code: Any = None) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "key": key, "language_code": language_code, "error": error})
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.error_count or self.aborted)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "partial" if self.has_errors else "success",
+            "format": self.format,
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "updated": self.updated,
+            "new": self.new,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "invalid": self.invalid,
+            "skipped": self.skipped,
+            "superseded": self.superseded,
+            "aborted": self.aborted,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+async def import_translations(
+    repository: CatalogRepository,
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    languages: Set[str],
+    key_ids: Dict[str, str],
+    language: Optional[str] = None,
+    chunk_size: int = 500,
+    concurrency: int = 4,
+    on_progress: Optional[Callable[[ImportReport], Any]] = None,
+    dry_run: bool = False,
+    updated_by: Optional[str] = None,
+) -> ImportReport:
+    """
+    Parse a translation file from `chunks` and upsert its rows.
+
+    Rows are validated against `languages` (active language codes) and
+    `key_ids` (key name -> id). Valid rows are buffered up to
+    `chunk_size * concurrency` and written with `write_translation_updates`
+    before parsing continues, so memory use is bounded by the buffer rather
+    than by the file. Empty values are skipped, and values that are already
+    stored are counted as unchanged rather than written, so re-importing a
+    mostly unchanged file writes little. With `dry_run` nothing is written
+    and the report counts what would be `new`, `changed` and `unchanged`.
+    Written rows are attributed to the user `updated_by`.
+
+    A malformed file stops the import; rows written up to that point stay
+    written and the reason is reported in `aborted`.
+    """
+    report = ImportReport(import_format, dry_run)
+    cache = get_catalog_cache()
+    pending: List[Dict[str, str]] = []
+    pending_rows: List[Dict[str, Any]] = []
+
+    async def flush() -> None:
+        if not pending:
+            return
+        results, written = await write_translation_updates(
+            repository,
+            pending,
+            chunk_size,
+            concurrency,
+            dry_run,
+            updated_by,
+        )
+        if written:
+            cache.apply_translation_updates(written)
+            get_change_feed().publish(written)
+        for result, parsed in zip(results, pending_rows):
+            if result["change"] == "new":
+                report.new += 1
+            elif result["change"] == "changed":
+                report.changed += 1
+            if result["status"] in ("new", "changed"):
+                continue
+            if result["status"] == "updated":
+                report.updated += 1
+            elif result["status"] == "unchanged":
+                report.unchanged += 1
+            elif result["status"] == "superseded":
+                report.superseded += 1
+            else:
+                report.failed += 1
+                report.add_error(parsed["row"], result.get("error", "Write failed"), parsed["key"], parsed["language_code"])
+        pending.clear()
+        pending_rows.clear()
+        if on_progress is not None:
+            on_progress(report)
+
+    try:
+        async for parsed in PARSERS[import_format](chunks, language):
+            report.rows += 1
+            if "error" in parsed:
+                report.invalid += 1
+                report.add_error(parsed["row"], parsed["error"], parsed.get("key"))
+                continue
+
+            key, language_code, value = parsed["key"], parsed["language_code"], parsed["value"]
+            if not value:
+                report.skipped += 1
+                continue
+            if language_code not in languages:
+                report.invalid += 1
+                report.add_error(parsed["row"], f"Invalid or inactive language code: {language_code}", key, language_code)
+                continue
+            key_id = key_ids.get(key)
+            if key_id is None:
+                report.invalid += 1
+                report.add_error(parsed["row"], f"Translation key not found: {key}", key, language_code)
+                continue
+
+            pending.append({"key_id": key_id, "language_code": language_code, "value": value})
+            pending_rows.append(parsed)
+            if len(pending) >= chunk_size * concurrency:
+                await flush()
+    except ImportFormatError as e:
+        logger.warning(f"Import aborted after {report.rows} rows: {e}")
+        report.aborted = str(e)
+
+    await flush()
+    return report
+
+
+def detect_import_format(content_type: Optional[str]) -> Optional[str]:
+    """Map a request Content-Type to an import format, if it identifies one."""
+    if not content_type:
+        return None
+    return CONTENT_TYPE_FORMATS.get(content_type.split(";")[0].strip().lower())
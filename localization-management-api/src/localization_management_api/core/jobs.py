@@ -0,0 +1,288 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from ..repositories.base import CatalogRepository
+from ..repositories.factory import get_service_repository
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+# Progress updates are written to the jobs table at most this often
+PROGRESS_PERSIST_INTERVAL_SECONDS = 2.0
+
+JobHandler = Callable[["Job", CatalogRepository], Awaitable[Any]]
+JobValidator = Callable[[Dict[str, Any]], None]
+
+_handlers: Dict[str, JobHandler] = {}
+_validators: Dict[str, JobValidator] = {}
+
+
+def register_job_handler(kind: str, validate: Optional[JobValidator] = None):
+    """
+    Register the coroutine that runs jobs of `kind`.
+
+    The handler is called as `handler(job, repository)` with a service role
+    repository, reports progress through `job.set_progress`, and returns the job
+    result, which must be JSON serializable. `validate(params)` is called on
+    submission and raises ValueError for invalid parameters.
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        if validate is not None:
+            _validators[kind] = validate
+        return handler
+    return decorator
+
+
+def job_kinds() -> List[str]:
+    return sorted(_handlers)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """
+    A unit of background work and its state.
+
+    `input` and `artifact` hold data that is not persisted: an uploaded file
+    for the job to read, and a downloadable result (such as an export
+    archive) that lives in memory until the job is pruned.
+    """
+
+    def __init__(self, kind: str, params: Dict[str, Any], input: Any = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.params = params
+        self.input = input
+        self.status = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.artifact: Any = None
+        self.error: Optional[str] = None
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.finished_monotonic: Optional[float] = None
+        self.cancel_requested = False
+        self.task: Optional[asyncio.Task] = None
+        self.on_progress: Optional[Callable[["Job"], None]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def set_progress(self, **progress: Any) -> None:
+        self.progress.update(progress)
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobRunner:
+    """
+    In-process job queue served by a fixed number of asyncio workers.
+
+    Job records are written to the `jobs` table when they are queued, start,
+    report progress (throttled) and finish, so their state survives the
+    process. Results that are not JSON (artifacts) only live in memory, and
+    finished jobs are dropped from memory after `retention_seconds`.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        retention_seconds: float = 3600,
+        repository_factory: Optional[Callable[[], Awaitable[CatalogRepository]]] = None,
+    ):
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self._repository_factory = repository_factory or get_service_repository
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue()
+        self._jobs: Dict[str, Job] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self._background: Set[asyncio.Task] = set()
+        self._last_persisted: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+            for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers; running jobs are marked as failed."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        for job in self._jobs.values():
+            if not job.finished:
+                self._finish(job, "failed", error="Interrupted by shutdown")
+                await self._persist(job)
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    def validate(self, kind: str, params: Dict[str, Any]) -> None:
+        """
+        Raises:
+            ValueError: If the kind is unknown or the parameters are invalid.
+        """
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}. Use one of: {', '.join(job_kinds())}")
+        if kind in _validators:
+            _validators[kind](params)
+
+    async def submit(self, kind: str, params: Optional[Dict[str, Any]] = None, input: Any = None) -> Job:
+        """
+        Queue a job of a registered `kind`.
+
+        Raises:
+            ValueError: If the kind is unknown or the parameters are invalid.
+        """
+        params = params or {}
+        self.validate(kind, params)
+
+        self._prune()
+        job = Job(kind, params, input)
+        job.on_progress = self._on_progress
+        self._jobs[job.id] = job
+        await self._persist(job)
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def load_record(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job's record, from memory or, for jobs no longer held here, the jobs table."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_record()
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return None
+        repository = await self._repository_factory()
+        return await repository.load_job(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested = True
+        if job.task is not None:
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        else:
+            # Still queued; the worker skips it
+            self._finish(job, "cancelled")
+            await self._persist(job)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if not job.finished:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = _now()
+        await self._persist(job)
+        if job.finished:
+            # Cancelled while the record was being written
+            return
+
+        try:
+            repository = await self._repository_factory()
+            job.task = asyncio.create_task(_handlers[job.kind](job, repository))
+            result = await job.task
+        except asyncio.CancelledError:
+            if job.cancel_requested:
+                self._finish(job, "cancelled")
+            else:
+                self._finish(job, "failed", error="Interrupted by shutdown")
+            await self._persist(job)
+            if asyncio.current_task().cancelling():
+                raise
+            return
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            self._finish(job, "failed", error=getattr(e, "detail", None) or str(e))
+        else:
+            job.result = result
+            self._finish(job, "succeeded")
+        await self._persist(job)
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = _now()
+        job.finished_monotonic = time.monotonic()
+        close = getattr(job.input, "close", None)
+        if close is not None:
+            close()
+        job.input = None
+
+    def _on_progress(self, job: Job) -> None:
+        now = time.monotonic()
+        if now - self._last_persisted.get(job.id, 0.0) < PROGRESS_PERSIST_INTERVAL_SECONDS:
+            return
+        self._last_persisted[job.id] = now
+        task = asyncio.create_task(self._persist(job))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _persist(self, job: Job) -> None:
+        try:
+            repository = await self._repository_factory()
+            await repository.save_job(job.to_record())
+        except Exception as e:
+            # Losing a status update must not fail the job itself
+            logger.warning(f"Could not persist job {job.id}: {e}")
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_monotonic > self.retention_seconds:
+                del self._jobs[job_id]
+                self._last_persisted.pop(job_id, None)
+
+
+_job_runner: Optional[JobRunner] = None
+
+def get_job_runner() -> JobRunner:
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner(
+            workers=settings.JOB_WORKERS,
+            retention_seconds=settings.JOB_RETENTION_SECONDS,
+        )
+    return _job_runner
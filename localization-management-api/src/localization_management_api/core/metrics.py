@@ -0,0 +1,441 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import httpx
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """A Prometheus counter with a fixed set of label names."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """A Prometheus histogram with cumulative buckets, per label set."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket plus +Inf, and the sum
+        self._counts: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[labels] += value
+
+    def count(self, labels: Labels) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, counts in sorted(self._counts.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    bucket_labels = _format_labels(self.label_names, labels, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                formatted = _format_labels(self.label_names, labels)
+                lines.append(f"{self.name}_sum{formatted} {_format_value(self._sums[labels])}")
+                lines.append(f"{self.name}_count{formatted} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """
+    Process-wide request and upstream call metrics, rendered in the
+    Prometheus text format by GET /metrics.
+    """
+
+    def __init__(self):
+        self.requests = Counter(
+            "http_requests_total",
+            "HTTP requests handled, by route template and status.",
+            ("method", "route", "status"),
+        )
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Time to handle an HTTP request, by route template.",
+            ("method", "route"),
+        )
+        self.upstream_requests = Counter(
+            "upstream_requests_total",
+            "Calls to Supabase, by service, table or function, and status.",
+            ("service", "target", "status"),
+        )
+        self.upstream_duration = Histogram(
+            "upstream_request_duration_seconds",
+            "Time of a call to Supabase until its body was read.",
+            ("service", "target"),
+        )
+        self.upstream_rows = Counter(
+            "upstream_response_rows_total",
+            "Rows returned by PostgREST, from the Content-Range header.",
+            ("service", "target"),
+        )
+        self.upstream_bytes = Counter(
+            "upstream_response_bytes_total",
+            "Response body bytes received from Supabase, as sent on the wire.",
+            ("service", "target"),
+        )
+        self.phase_duration = Histogram(
+            "request_phase_duration_seconds",
+            "Time spent in a named phase of request handling.",
+            ("phase",),
+        )
+
+    def render(self) -> str:
+        # Imported here, since the cache module is not needed to record metrics
+        from .cache import get_catalog_cache
+
+        lines: List[str] = []
+        for metric in (
+            self.requests,
+            self.request_duration,
+            self.upstream_requests,
+            self.upstream_duration,
+            self.upstream_rows,
+            self.upstream_bytes,
+            self.phase_duration,
+        ):
+            lines.extend(metric.render())
+
+        cache = get_catalog_cache()
+        for name, value in (("hits", cache.hits), ("misses", cache.misses), ("evictions", cache.evictions)):
+            lines.append(f"# HELP catalog_cache_{name}_total Catalog cache {name}.")
+            lines.append(f"# TYPE catalog_cache_{name}_total counter")
+            lines.append(f"catalog_cache_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics: Optional[Metrics] = None
+
+def get_metrics() -> Metrics:
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+class RequestTimings:
+    """Time spent per phase and upstream service while handling one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Per name: total seconds and number of timed calls
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        phase = self.phases.setdefault(name, [0.0, 0])
+        phase[0] += seconds
+        phase[1] += 1
+
+    def server_timing(self) -> str:
+        """
+        The timings as a `Server-Timing` header value. Concurrent calls to
+        the same service are summed, so a service can exceed `total`.
+        """
+        metrics = []
+        for name, (seconds, calls) in self.phases.items():
+            metric = f"{name};dur={seconds * 1000:.1f}"
+            if calls > 1:
+                metric += f';desc="{calls} calls"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_phase(name: str, seconds: float) -> None:
+    get_metrics().phase_duration.observe((name,), seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Time the enclosed block as `phase` of the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
+
+
+def describe_upstream(path: str) -> Tuple[str, str]:
+    """
+    Name the service and target of a Supabase URL path, keeping label values
+    to tables, functions and auth endpoints rather than full paths.
+    """
+    parts = [part for part in path.split("/") if part]
+    if parts[:2] == ["rest", "v1"]:
+        if len(parts) > 3 and parts[2] == "rpc":
+            return "postgrest", f"rpc/{parts[3]}"
+        return "postgrest", parts[2] if len(parts) > 2 else "/"
+    if parts[:2] == ["auth", "v1"]:
+        return "supabase_auth", parts[2] if len(parts) > 2 else "/"
+    return "http", parts[0] if parts else "/"
+
+
+def parse_content_range(value: Optional[str]) -> Optional[int]:
+    """Number of rows in a PostgREST `Content-Range` header like `0-24/100` or `*/0`."""
+    if not value:
+        return None
+    row_range = value.split("/", 1)[0]
+    if row_range == "*":
+        return 0
+    try:
+        first, last = row_range.split("-", 1)
+        return int(last) - int(first) + 1
+    except ValueError:
+        return None
+
+
+def record_upstream_call(
+    service: str,
+    target: str,
+    status: str,
+    seconds: float,
+    rows: Optional[int],
+    response_bytes: int,
+) -> None:
+    metrics = get_metrics()
+    metrics.upstream_requests.inc((service, target, status))
+    metrics.upstream_duration.observe((service, target), seconds)
+    if rows is not None:
+        metrics.upstream_rows.inc((service, target), rows)
+    metrics.upstream_bytes.inc((service, target), response_bytes)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(service, seconds)
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """Counts the bytes of a response body and reports them once it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[int], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._bytes = 0
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close(self._bytes)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the transport of the shared Supabase HTTP client to count and time
+    every call, with the rows and bytes it returned.
+
+    A call is timed until its body has been read and the response closed.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        service, target = describe_upstream(request.url.path)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            record_upstream_call(service, target, "error", time.perf_counter() - started, None, 0)
+            raise
+
+        def on_close(response_bytes: int) -> None:
+            record_upstream_call(
+                service,
+                target,
+                str(response.status_code),
+                time.perf_counter() - started,
+                parse_content_range(response.headers.get("content-range")),
+                response_bytes,
+            )
+
+        response.stream = _MeteredStream(response.stream, on_close)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _route_template(scope: Scope) -> str:
+    # Route templates rather than raw paths keep the label values bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+_profiling = False
+
+def _start_profiler() -> Optional["Profiler"]:
+    """
+    Start profiling this request when profiling is configured and the request
+    is sampled. Only one request is profiled at a time.
+    """
+    global _profiling
+    if (
+        Profiler is None
+        or _profiling
+        or settings.SLOW_REQUEST_MS <= 0
+        or random.random() >= settings.PROFILE_SAMPLE_RATE
+    ):
+        return None
+    _profiling = True
+    profiler = Profiler(interval=0.001, async_mode="enabled")
+    profiler.start()
+    return profiler
+
+
+def _stop_profiler(profiler: "Profiler") -> None:
+    global _profiling
+    try:
+        profiler.stop()
+    finally:
+        _profiling = False
+
+
+class MetricsMiddleware:
+    """
+    Records the latency of every request by route template and logs requests
+    slower than SLOW_REQUEST_MS. With `server_timing`, responses also get a
+    `Server-Timing` header with the time spent per phase and upstream
+    service; it tells clients about the backend, so it is off by default.
+
+    When pyinstrument is installed and PROFILE_SAMPLE_RATE is set, a sample of
+    requests runs under the sampling profiler, and the profiles of the slow
+    ones are logged.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing())
+                    headers.append("Timing-Allow-Origin", settings.FRONTEND_URL)
+            await send(message)
+
+        profiler = _start_profiler()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - timings.started
+            _request_timings.reset(token)
+            if profiler is not None:
+                _stop_profiler(profiler)
+
+            method, route = scope["method"], _route_template(scope)
+            metrics = get_metrics()
+            metrics.requests.inc((method, route, str(status)))
+            metrics.request_duration.observe((method, route), elapsed)
+
+            if 0 < settings.SLOW_REQUEST_MS <= elapsed * 1000:
+                logger.warning(
+                    f"Slow request {method} {scope['path']} took {elapsed * 1000:.0f} ms: "
+                    f"{timings.server_timing()}"
+                )
+                if profiler is not None:
+                    logger.warning(profiler.output_text(unicode=True, show_all=False))
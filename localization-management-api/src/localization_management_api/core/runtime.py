@@ -0,0 +1,146 @@
+import asyncio
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .columnar import dumps_json
+from .exports import ExportArtifact
+
+# Sorts after every character a key can contain, to find the end of a prefix range
+_PREFIX_END = "\U0010ffff"
+# Prefix lookups are client-chosen and far more varied than whole tables: they
+# are compressed faster, and each table keeps only the most recent ones
+PREFIX_GZIP_LEVEL = 6
+PREFIX_BROTLI_QUALITY = 5
+MAX_CACHED_PREFIX_RANGES = 64
+
+
+def parse_fallbacks(value: str) -> Dict[str, List[str]]:
+    """
+    Parse LOCALE_FALLBACKS, a comma-separated list of `locale:fallback`
+    pairs such as `es-MX:es-419,es-419:es`. A locale listed more than once
+    falls back to each in turn.
+    """
+    fallbacks: Dict[str, List[str]] = {}
+    for pair in value.split(","):
+        locale, _, fallback = pair.partition(":")
+        locale, fallback = locale.strip(), fallback.strip()
+        if not locale or not fallback:
+            continue
+        fallbacks.setdefault(locale.lower(), []).append(fallback)
+    return fallbacks
+
+
+def fallback_chain(
+    locale: str,
+    languages: Iterable[str],
+    fallbacks: Dict[str, List[str]],
+    default: Optional[str] = None,
+) -> List[str]:
+    """
+    The active languages to look a value up in for `locale`, in order.
+
+    A locale is followed by its configured fallbacks (each with its own
+    fallbacks), then by its parent tag (`es-MX` -> `es`), and the chain ends
+    with `default`. Tags are matched case-insensitively; tags that are not
+    active languages are skipped but still followed.
+    """
+    active = {code.lower(): code for code in languages}
+    chain: List[str] = []
+    seen = set()
+
+    def visit(tag: str) -> None:
+        tag = tag.lower()
+        if not tag or tag in seen:
+            return
+        seen.add(tag)
+        if tag in active:
+            chain.append(active[tag])
+        for fallback in fallbacks.get(tag, []):
+            visit(fallback)
+        visit(tag.rpartition("-")[0])
+
+    visit(locale)
+    if default:
+        visit(default)
+    return chain
+
+
+class RuntimeTable:
+    """
+    The values of one locale with its fallback chain already applied: every
+    key that has a value in any language of the chain, sorted by key.
+    """
+
+    def __init__(self, locale: str, chain: List[str], keys: List[str], values: List[str]):
+        self.locale = locale
+        self.chain = chain
+        self.keys = keys
+        self.values = values
+        self._artifacts: "OrderedDict[Tuple[int, int], ExportArtifact]" = OrderedDict()
+
+    def _range(self, prefix: Optional[str]) -> Tuple[int, int]:
+        if not prefix:
+            return 0, len(self.keys)
+        start = bisect_left(self.keys, prefix)
+        return start, bisect_left(self.keys, prefix + _PREFIX_END, start)
+
+    def lookup(self, prefix: Optional[str] = None) -> Dict[str, str]:
+        """The key -> value map, limited to keys starting with `prefix`."""
+        start, end = self._range(prefix)
+        return dict(zip(self.keys[start:end], self.values[start:end]))
+
+    async def artifact(self, prefix: Optional[str] = None) -> ExportArtifact:
+        """
+        The response body of a lookup, built off the event loop.
+
+        Bodies are cached by the range of keys they hold, so prefixes
+        selecting the same keys (every prefix matching nothing, say) share
+        one, and at most MAX_CACHED_PREFIX_RANGES prefix bodies are kept.
+        """
+        span = self._range(prefix)
+        artifact = self._artifacts.get(span)
+        if artifact is not None:
+            self._artifacts.move_to_end(span)
+            return artifact
+        artifact = await asyncio.to_thread(build_runtime_artifact, self, prefix)
+        self._artifacts[span] = artifact
+        # The whole table is not a prefix range and is never evicted
+        prefix_ranges = [cached for cached in self._artifacts if cached != (0, len(self.keys))]
+        if len(prefix_ranges) > MAX_CACHED_PREFIX_RANGES:
+            del self._artifacts[prefix_ranges[0]]
+        return artifact
+
+
+def build_runtime_table(entries: Iterable[Dict[str, Any]], locale: str, chain: List[str]) -> RuntimeTable:
+    """Resolve every key of the catalog for `locale` through `chain`."""
+    resolved = []
+    for entry in entries:
+        translations = entry["translations"]
+        for language in chain:
+            value = translations.get(language, {}).get("value")
+            if value:
+                resolved.append((entry["key"], value))
+                break
+    resolved.sort()
+    return RuntimeTable(
+        locale,
+        chain,
+        [key for key, _ in resolved],
+        [value for _, value in resolved],
+    )
+
+
+def build_runtime_artifact(table: RuntimeTable, prefix: Optional[str] = None) -> ExportArtifact:
+    """
+    The compact JSON body of a runtime lookup, pre-compressed like exports,
+    though with faster settings for prefix lookups.
+    """
+    if not prefix:
+        return ExportArtifact(dumps_json(table.lookup()), "application/json", f"{table.locale}.json")
+    return ExportArtifact(
+        dumps_json(table.lookup(prefix)),
+        "application/json",
+        f"{table.locale}.json",
+        gzip_level=PREFIX_GZIP_LEVEL,
+        brotli_quality=PREFIX_BROTLI_QUALITY,
+    )
@@ -0,0 +1,415 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .columnar import JSON_MEDIA_TYPE, encode_catalog
+from .config import settings
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; writers then rely on the atomic rename alone
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LCSNAP\x00\x01"
+FORMAT_VERSION = 1
+
+# magic, format version, key count, stored language count, padding, then an
+# (offset, length) pair per section
+SECTIONS = ("metadata", "languages", "keys", "key_order", "values", "strings", "catalog_json")
+_HEADER = struct.Struct("<8sIIII" + "QQ" * len(SECTIONS))
+# A string: (offset into the strings section, length); NULL_LENGTH is None
+_REF = struct.Struct("<II")
+NULL_LENGTH = 0xFFFFFFFF
+_INDEX = struct.Struct("<I")
+KEY_FIELDS = ("id", "key", "category", "description", "created_at", "updated_at")
+_KEY_RECORD_SIZE = _REF.size * len(KEY_FIELDS)
+# Per stored language and key: the value and updated_at of its translation.
+# A NULL value means the entry has no such language at all.
+_VALUE_RECORD_SIZE = _REF.size * 2
+# Bytes per chunk when the stored GET /localizations body is sent
+CATALOG_JSON_CHUNK_SIZE = 64 * 1024
+
+
+class _StringTable:
+    """Collects strings for the strings section, storing each distinct one once."""
+
+    def __init__(self):
+        self.blob = bytearray()
+        self._refs: Dict[str, Tuple[int, int]] = {}
+
+    def ref(self, value: Optional[Any]) -> Tuple[int, int]:
+        if value is None:
+            return 0, NULL_LENGTH
+        value = str(value)
+        ref = self._refs.get(value)
+        if ref is None:
+            encoded = value.encode("utf-8")
+            ref = self._refs[value] = (len(self.blob), len(encoded))
+            self.blob += encoded
+        return ref
+
+
+def build_mapped_catalog(
+    entries: List[Dict[str, Any]],
+    languages: List[str],
+    catalog_tag: str,
+    catalog_json: bytes,
+) -> bytes:
+    """
+    Lay out a catalog in the shared snapshot format.
+
+    `entries` are in the shape of GET /localizations and keep their order;
+    `languages` are the active languages and `catalog_tag` identifies the
+    catalog state the entries were read at. `catalog_json` is the encoded
+    GET /localizations body, stored so it can be served as is.
+    """
+    stored_languages = sorted({language for entry in entries for language in entry["translations"]} | set(languages))
+    strings = _StringTable()
+
+    language_refs = b"".join(_REF.pack(*strings.ref(language)) for language in stored_languages)
+    key_records = bytearray()
+    for entry in entries:
+        for field in KEY_FIELDS:
+            key_records += _REF.pack(*strings.ref(entry.get(field)))
+
+    value_records = bytearray()
+    for language in stored_languages:
+        for entry in entries:
+            translation = entry["translations"].get(language)
+            if translation is None:
+                value_records += _REF.pack(0, NULL_LENGTH) + _REF.pack(0, NULL_LENGTH)
+            else:
+                value_records += _REF.pack(*strings.ref(translation.get("value") or ""))
+                value_records += _REF.pack(*strings.ref(translation.get("updated_at")))
+
+    key_order = sorted(range(len(entries)), key=lambda index: entries[index]["key"])
+    if len(strings.blob) >= NULL_LENGTH:
+        raise ValueError("Catalog too large for the shared snapshot format")
+
+    metadata = json.dumps({
+        "catalog_tag": catalog_tag,
+        "languages": list(languages),
+        "created_at": time.time(),
+    }).encode("utf-8")
+    sections = [
+        metadata,
+        language_refs,
+        bytes(key_records),
+        b"".join(_INDEX.pack(index) for index in key_order),
+        bytes(value_records),
+        bytes(strings.blob),
+        catalog_json,
+    ]
+
+    offset = _HEADER.size
+    section_fields: List[int] = []
+    for section in sections:
+        section_fields += [offset, len(section)]
+        offset += len(section)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(entries), len(stored_languages), 0, *section_fields)
+    return header + b"".join(sections)
+
+
+class MappedCatalog:
+    """
+    A catalog file mapped read-only into memory.
+
+    Nothing is decoded up front: lookups read the records they need from the
+    mapping, so every process mapping the same file shares one copy of it
+    in the page cache. The mapping is released when the last reference to
+    this object goes away.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"Not a catalog snapshot: {path}")
+        magic, format_version, self.key_count, self._language_count, _, *fields = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"Not a catalog snapshot: {path}")
+        self._sections = {
+            name: (fields[2 * index], fields[2 * index + 1])
+            for index, name in enumerate(SECTIONS)
+        }
+
+        offset, length = self._sections["metadata"]
+        metadata = json.loads(self._mmap[offset:offset + length])
+        self.catalog_tag: str = metadata["catalog_tag"]
+        self.languages: List[str] = metadata["languages"]
+        self._strings_offset = self._sections["strings"][0]
+        languages_offset = self._sections["languages"][0]
+        self.stored_languages: List[str] = [
+            self._string(languages_offset + index * _REF.size)
+            for index in range(self._language_count)
+        ]
+        self._language_index = {language: index for index, language in enumerate(self.stored_languages)}
+
+    def __len__(self) -> int:
+        return self.key_count
+
+    def _string(self, ref_offset: int) -> Optional[str]:
+        offset, length = _REF.unpack_from(self._mmap, ref_offset)
+        if length == NULL_LENGTH:
+            return None
+        start = self._strings_offset + offset
+        return str(self._mmap[start:start + length], "utf-8")
+
+    def _key_field(self, index: int, field: int) -> Optional[str]:
+        return self._string(self._sections["keys"][0] + index * _KEY_RECORD_SIZE + field * _REF.size)
+
+    def _value_record(self, index: int, language_index: int) -> int:
+        return self._sections["values"][0] + (language_index * self.key_count + index) * _VALUE_RECORD_SIZE
+
+    @property
+    def catalog_json_size(self) -> int:
+        """The length of the encoded GET /localizations body."""
+        return self._sections["catalog_json"][1]
+
+    def iter_catalog_json(self, chunk_size: int = CATALOG_JSON_CHUNK_SIZE) -> Iterator[memoryview]:
+        """The encoded GET /localizations body, as slices of the mapping."""
+        offset, length = self._sections["catalog_json"]
+        view = memoryview(self._mmap)
+        for start in range(offset, offset + length, chunk_size):
+            yield view[start:min(start + chunk_size, offset + length)]
+
+    def entry(self, index: int) -> Dict[str, Any]:
+        """The `index`-th entry, in the shape of GET /localizations."""
+        entry: Dict[str, Any] = {
+            field: self._key_field(index, position)
+            for position, field in enumerate(KEY_FIELDS)
+        }
+        translations = {}
+        for language_index, language in enumerate(self.stored_languages):
+            record = self._value_record(index, language_index)
+            value = self._string(record)
+            if value is not None:
+                translations[language] = {"value": value, "updated_at": self._string(record + _REF.size)}
+        entry["translations"] = translations
+        return entry
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.key_count):
+            yield self.entry(index)
+
+    def _sorted_index(self, position: int) -> int:
+        return _INDEX.unpack_from(self._mmap, self._sections["key_order"][0] + position * _INDEX.size)[0]
+
+    def _key_range(self, prefix: str) -> range:
+        """Positions in key order of the keys starting with `prefix`."""
+        def lower_bound(probe: Callable[[str], bool]) -> int:
+            low, high = 0, self.key_count
+            while low < high:
+                middle = (low + high) // 2
+                if probe(self._key_field(self._sorted_index(middle), 1)):
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+
+        start = lower_bound(lambda key: key < prefix)
+        end = lower_bound(lambda key: key < prefix or key.startswith(prefix))
+        return range(start, end)
+
+    def resolve(self, chain: Iterable[str], prefix: Optional[str] = None) -> Tuple[List[str], List[str]]:
+        """
+        Keys (sorted, limited to `prefix`) with their first non-empty value
+        along the languages of `chain`.
+        """
+        language_indices = [self._language_index[language] for language in chain if language in self._language_index]
+        positions = self._key_range(prefix) if prefix else range(self.key_count)
+        keys: List[str] = []
+        values: List[str] = []
+        for position in positions:
+            index = self._sorted_index(position)
+            for language_index in language_indices:
+                value = self._string(self._value_record(index, language_index))
+                if value:
+                    keys.append(self._key_field(index, 1))
+                    values.append(value)
+                    break
+        return keys, values
+
+
+class MappedEntries(Sequence):
+    """The entries of a mapped catalog, decoded one at a time as they are read."""
+
+    def __init__(self, mapped: MappedCatalog):
+        self.mapped = mapped
+
+    def __len__(self) -> int:
+        return len(self.mapped)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.mapped.entry(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.mapped.entry(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.mapped.entries()
+
+
+class MappedSnapshot:
+    """
+    A mapped catalog in place of a `CatalogSnapshot`, for readers that only
+    iterate the entries, so workers need no copy of their own.
+    """
+
+    def __init__(self, mapped: MappedCatalog):
+        self.mapped = mapped
+        self.entries = MappedEntries(mapped)
+        self.languages = mapped.languages
+
+
+def read_catalog_tag(path: Path) -> Optional[str]:
+    """The catalog tag of a snapshot file, without mapping it; None when unreadable."""
+    try:
+        with open(path, "rb") as file:
+            header = file.read(_HEADER.size)
+            magic, format_version, _, _, _, metadata_offset, metadata_length, *_ = _HEADER.unpack(header)
+            if magic != MAGIC or format_version != FORMAT_VERSION:
+                return None
+            file.seek(metadata_offset)
+            return json.loads(file.read(metadata_length))["catalog_tag"]
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+class SharedSnapshot:
+    """
+    A catalog snapshot file shared by every worker process.
+
+    Whichever worker loads a catalog newer than the file writes a new one,
+    to a temporary file renamed over the old one, so readers always see a
+    complete file. Workers check the file at most every `check_interval`
+    seconds and map the new one when it changed; requests still holding the
+    previous mapping keep using it until they finish.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.check_interval = check_interval
+        self.swaps = 0
+        self._mapped: Optional[MappedCatalog] = None
+        self._identity: Optional[Tuple[int, int, int]] = None
+        self._checked_at = float("-inf")
+        self._publish_task: Optional[asyncio.Task] = None
+
+    def mapped(self) -> Optional[MappedCatalog]:
+        """The current mapping, remapped first when the file was replaced."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._mapped
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._mapped, self._identity = None, None
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity != self._identity:
+            try:
+                self._mapped = MappedCatalog(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not map the catalog snapshot {self.path}: {e}")
+                return self._mapped
+            self._identity = identity
+            self.swaps += 1
+        return self._mapped
+
+    def current(self, catalog_tag: str) -> Optional[MappedCatalog]:
+        """The mapping, if it holds the catalog identified by `catalog_tag`."""
+        mapped = self.mapped()
+        return mapped if mapped is not None and mapped.catalog_tag == catalog_tag else None
+
+    def publish(
+        self,
+        entries: List[Dict[str, Any]],
+        languages: List[str],
+        catalog_tag: str,
+        is_current: Callable[[], bool],
+    ) -> None:
+        """
+        Write the catalog to the shared file in the background, unless the
+        file already holds it or a write is in progress.
+
+        Requests patch the cached entries on the event loop, so the thread
+        writing the file works on a copy taken here, and the new file is only
+        put in place if `is_current()` still holds once it has been written.
+        """
+        mapped = self.mapped()
+        if (mapped is not None and mapped.catalog_tag == catalog_tag) or self._publish_task is not None:
+            return
+        # Translations are replaced, never mutated, so copying the dicts
+        # that hold them is enough
+        entries = [{**entry, "translations": dict(entry.get("translations") or {})} for entry in entries]
+        languages = list(languages)
+
+        async def write() -> None:
+            try:
+                await asyncio.to_thread(self._write, entries, languages, catalog_tag, is_current)
+            except Exception as e:
+                logger.warning(f"Could not write the catalog snapshot {self.path}: {e}")
+            finally:
+                self._publish_task = None
+                # Map the new file on the next request
+                self._checked_at = float("-inf")
+
+        self._publish_task = asyncio.create_task(write())
+
+    def _write(
+        self,
+        entries: List[Dict[str, Any]],
+        languages: List[str],
+        catalog_tag: str,
+        is_current: Callable[[], bool],
+    ) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another worker may have written the same catalog meanwhile
+            if read_catalog_tag(self.path) == catalog_tag:
+                return
+            temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                body = build_mapped_catalog(
+                    entries,
+                    languages,
+                    catalog_tag,
+                    encode_catalog(entries, languages, JSON_MEDIA_TYPE),
+                )
+                temporary.write_bytes(body)
+                if not is_current():
+                    temporary.unlink()
+                    return
+                os.replace(temporary, self.path)
+            except BaseException:
+                temporary.unlink(missing_ok=True)
+                raise
+        logger.info(f"Wrote catalog snapshot {self.path} ({len(body)} bytes, {len(entries)} keys)")
+
+
+_shared_snapshot: Optional[SharedSnapshot] = None
+
+def get_shared_snapshot() -> Optional[SharedSnapshot]:
+    """The shared snapshot, or None when SHARED_SNAPSHOT_PATH is not set."""
+    global _shared_snapshot
+    if _shared_snapshot is None and settings.SHARED_SNAPSHOT_PATH:
+        _shared_snapshot = SharedSnapshot(
+            settings.SHARED_SNAPSHOT_PATH,
+            check_interval=settings.SHARED_SNAPSHOT_CHECK_INTERVAL_SECONDS,
+        )
+    return _shared_snapshot
@@ -1,14 +1,116 @@
-from typing import Optional
-from supabase import create_client, Client
+from typing import Any, Dict, Optional, Union
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
 from .config import settings
+from .metrics import InstrumentedTransport
 
-_supabase: Optional[Client] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_supabase: Optional[AsyncClient] = None
 
-def get_supabase_client() -> Client:
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Shared HTTP connection pool for all calls to Supabase.
+
+    Every call is counted and timed for GET /metrics and `Server-Timing`.
+    """
+    global _http_client
+    if _http_client is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _http_client = httpx.AsyncClient(
+            transport=InstrumentedTransport(transport),
+            follow_redirects=True,
+            timeout=httpx.Timeout(settings.SUPABASE_HTTP_TIMEOUT_SECONDS),
+        )
+    return _http_client
+
+async def get_supabase_client() -> AsyncClient:
+    """
+    Process-wide Supabase client, authenticated with the service role key.
+
+    Use it for auth calls only; database access goes through
+    `get_postgrest_client`, which carries the caller's own token.
+    """
     global _supabase
     if _supabase is None:
-        _supabase = create_client(
+        _supabase = await acreate_client(
             settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_ROLE_KEY
+            settings.SUPABASE_SERVICE_ROLE_KEY,
+            options=AsyncClientOptions(httpx_client=get_http_client()),
         )
     return _supabase
+
+
+class _ScopedSession:
+    """
+    Stand-in for the httpx client PostgREST builders send requests through.
+
+    Every request goes to the shared pool with an absolute URL and this
+    session's headers, so nothing request-specific is stored on the pool.
+    """
+
+    def __init__(self, http_client: httpx.AsyncClient, base_url: str, headers: Dict[str, str]):
+        self._http_client = http_client
+        self._base_url = base_url.rstrip("/")
+        self._headers = headers
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        headers: Union[httpx.Headers, Dict[str, str], None] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        merged = httpx.Headers(self._headers)
+        if headers:
+            merged.update(headers)
+        return await self._http_client.request(
+            method,
+            f"{self._base_url}{path}",
+            headers=merged,
+            **kwargs,
+        )
+
+    async def aclose(self) -> None:
+        # The pool outlives the session; it is closed on shutdown
+        pass
+
+
+class ScopedPostgrestClient(AsyncPostgrestClient):
+    """
+    PostgREST client bound to a single access token.
+
+    Construction only builds a header dict, so one can be created per request;
+    all of them share the connection pool from `get_http_client`.
+    """
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return _ScopedSession(self.http_client, base_url, headers)
+
+
+def get_postgrest_client(access_token: str) -> AsyncPostgrestClient:
+    """Return a PostgREST client that sends `access_token` as its bearer token."""
+    return ScopedPostgrestClient(
+        f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1",
+        headers={
+            **DEFAULT_POSTGREST_CLIENT_HEADERS,
+            "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
+            "Authorization": f"Bearer {access_token}",
+        },
+        http_client=get_http_client(),
+    )
+
+async def close_supabase_client() -> None:
+    global _http_client, _supabase
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _supabase = None
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+from typing import Any, Collection, Dict, Iterable, List, Optional, Set, Tuple
+from ..repositories.factory import get_catalog_repository
+from .bulk import write_translation_updates
+from .cache import get_catalog_cache
+from .changes import get_change_feed
+from .auth import token_subject
+from .config import settings
+from .supabase_client import get_postgrest_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds between the flushes of rows that failed to write, on shutdown
+SHUTDOWN_RETRY_SECONDS = 0.5
+
+CellKey = Tuple[str, str]
+# A queued row and the access token of the user who made the edit
+PendingEdit = Tuple[Dict[str, str], str]
+
+
+class WriteBehindBuffer:
+    """
+    Collects single translation edits in memory and writes them in batches.
+
+    Edits are kept per (key_id, language_code) and a later edit replaces an
+    earlier one that has not been written yet, so a burst of saves to the
+    same cell costs one write. The buffer is flushed `flush_interval`
+    seconds after the first pending edit, or as soon as `max_pending` cells
+    are waiting, through `write_translation_updates`. Each edit keeps the
+    access token of the request that made it and is written with that
+    user's credentials, so row level security applies as it does to direct
+    writes; a flush makes one batch per user.
+
+    Queued edits are patched into the cached catalog snapshot at once, and
+    `overlay()` applies them to entries read from the database, so reads
+    served by this process show them before they are written. Patching does
+    not bump the cache version; the caches derived from the catalog are
+    invalidated once per flush rather than once per edit. The buffer is per
+    process: other workers only see an edit once it is written.
+
+    Rows that fail to write are put back, unless the cell was edited again
+    meanwhile, and dropped with an error log after `max_attempts` tries.
+    `stop()` flushes what is left before the process exits; edits still
+    pending when the process is killed are lost.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.5,
+        max_pending: int = 1000,
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.edits = 0
+        self.rows_written = 0
+        self._pending: Dict[CellKey, PendingEdit] = {}
+        # Taken from `_pending` by the flush in progress and not written yet
+        self._in_flight: Dict[CellKey, PendingEdit] = {}
+        self._attempts: Dict[CellKey, int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def unflushed(self) -> bool:
+        """Whether some edits are not in the database yet."""
+        return bool(self._pending or self._in_flight)
+
+    def add(self, key_id: str, language_code: str, value: str, access_token: str) -> None:
+        """
+        Queue an edit made by the holder of `access_token`; it replaces any
+        pending edit of the same cell.
+        """
+        cell = (key_id, language_code)
+        row = {"key_id": key_id, "language_code": language_code, "value": value}
+        self._pending[cell] = (row, access_token)
+        self._attempts.pop(cell, None)
+        self.edits += 1
+        get_catalog_cache().patch_snapshot([row])
+        if len(self._pending) >= self.max_pending:
+            self._start(self.flush())
+        else:
+            self._schedule_flush()
+
+    def overlay(self, entries: Iterable[Dict[str, Any]], languages: Optional[Collection[str]] = None) -> None:
+        """
+        Apply the edits not written yet to `entries`, in the shape of
+        GET /localizations, limited to `languages` when given.
+        """
+        if not self.unflushed:
+            return
+        edits_by_key: Dict[str, List[Dict[str, str]]] = {}
+        for row, _ in {**self._in_flight, **self._pending}.values():
+            if languages is None or row["language_code"] in languages:
+                edits_by_key.setdefault(row["key_id"], []).append(row)
+        for entry in entries:
+            for row in edits_by_key.get(entry["id"], ()):
+                entry.setdefault("translations", {})[row["language_code"]] = {
+                    "value": row["value"],
+                    "updated_at": None,
+                }
+
+    def _start(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _schedule_flush(self) -> None:
+        if self._pending and self._timer is None and not self._stopping:
+            self._timer = self._start(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> Dict[str, Any]:
+        """Write every pending edit now and report what happened to them."""
+        async with self._flush_lock:
+            self._in_flight, self._pending = self._pending, {}
+            summary = {"flushed": len(self._in_flight), "updated": 0, "unchanged": 0, "failed": 0}
+            if self._in_flight:
+                by_editor: Dict[str, List[Dict[str, str]]] = {}
+                for row, access_token in self._in_flight.values():
+                    by_editor.setdefault(access_token, []).append(row)
+
+                written: List[Dict[str, str]] = []
+                for access_token, rows in by_editor.items():
+                    results, editor_written = await self._write(rows, access_token)
+                    written.extend(editor_written)
+                    for row, result in zip(rows, results):
+                        status = result["status"]
+                        if status in summary:
+                            summary[status] += 1
+                        if status == "failed":
+                            self._retry(row, access_token, result.get("error"))
+                        else:
+                            self._attempts.pop((row["key_id"], row["language_code"]), None)
+
+                # Once per flush: bumps the version, so the caches derived from
+                # the catalog are rebuilt. Cells edited again meanwhile keep
+                # showing the newer value
+                get_catalog_cache().apply_translation_updates([
+                    row for row in written
+                    if (row["key_id"], row["language_code"]) not in self._pending
+                ])
+                if written:
+                    get_change_feed().publish(written)
+                self.rows_written += len(written)
+                self._in_flight = {}
+                self._schedule_flush()
+
+            summary["pending"] = len(self._pending)
+            return summary
+
+    async def _write(
+        self,
+        rows: List[Dict[str, str]],
+        access_token: str,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """Write `rows` with the repository of the user who edited them."""
+        try:
+            repository = await get_catalog_repository(get_postgrest_client(access_token))
+            return await write_translation_updates(
+                repository,
+                rows,
+                self.chunk_size,
+                self.concurrency,
+                updated_by=token_subject(access_token),
+            )
+        except Exception as e:
+            logger.warning(f"Could not flush {len(rows)} buffered translation edits: {e}")
+            return [{"status": "failed", "error": str(e)} for _ in rows], []
+
+    def _retry(self, row: Dict[str, str], access_token: str, error: Optional[str]) -> None:
+        cell = (row["key_id"], row["language_code"])
+        if cell in self._pending:
+            # Edited again since; the newer value is written instead
+            return
+        attempts = self._attempts.get(cell, 0) + 1
+        if attempts >= self.max_attempts:
+            self._attempts.pop(cell, None)
+            logger.error(
+                f"Dropping translation edit after {attempts} failed writes: "
+                f"key_id={cell[0]} language_code={cell[1]} value={row['value']!r} ({error})"
+            )
+            # The cache shows the dropped value, so read the catalog again
+            get_catalog_cache().invalidate()
+            return
+        self._attempts[cell] = attempts
+        self._pending[cell] = (row, access_token)
+
+    async def stop(self) -> None:
+        """Flush the pending edits, retrying failed rows, before the process exits."""
+        self._stopping = True
+        # A timer still waiting holds no rows, but flushes in progress hold
+        # rows that are no longer pending, so those are waited for instead
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while (await self.flush())["pending"]:
+            await asyncio.sleep(SHUTDOWN_RETRY_SECONDS)
+        logger.info(f"Write-behind buffer stopped after {self.edits} edits and {self.rows_written} writes")
+
+
+_write_behind_buffer: Optional[WriteBehindBuffer] = None
+
+def get_write_behind_buffer() -> Optional[WriteBehindBuffer]:
+    """The write-behind buffer, or None unless WRITE_BEHIND_ENABLED is set."""
+    global _write_behind_buffer
+    if _write_behind_buffer is None and settings.WRITE_BEHIND_ENABLED:
+        _write_behind_buffer = WriteBehindBuffer(
+            flush_interval=settings.WRITE_BEHIND_INTERVAL_MS / 1000,
+            max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+            chunk_size=settings.BULK_UPSERT_CHUNK_SIZE,
+            concurrency=settings.BULK_UPSERT_CONCURRENCY,
+        )
+    return _write_behind_buffer
@@ -1,27 +1,108 @@
 import logging
 from fastapi import Depends, HTTPException, status
+from typing import Optional
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import Client
-from .core.supabase_client import get_supabase_client
+from postgrest import AsyncPostgrestClient
+from .core.auth import LocalVerificationUnavailable, get_token_verifier, token_subject
+from .core.config import settings
+from .core.metrics import timed
+from .core.supabase_client import get_postgrest_client, get_supabase_client
+from .repositories.base import CatalogRepository
+from .repositories.factory import get_catalog_repository, get_service_repository
 
 logger = logging.getLogger(__name__)
 bearer = HTTPBearer()
+optional_bearer = HTTPBearer(auto_error=False)
 
-def get_supabase(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer),
-) -> Client:
-    token = credentials.credentials
-    supabase: Client = get_supabase_client()
-
-    supabase.postgrest.auth(token)
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired token",
+    )
 
+async def _verify_remotely(token: str) -> None:
+    supabase = await get_supabase_client()
     try:
-        supabase.auth.get_user(token)
+        await supabase.auth.get_user(token)
     except Exception as e:
         logger.warning(f"Token validation failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-        )
+        raise _unauthorized()
+
+async def get_supabase(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer),
+) -> AsyncPostgrestClient:
+    """
+    Return a PostgREST client scoped to the caller's token.
+
+    Each request gets its own client over the shared connection pool, so
+    concurrent requests never see each other's credentials.
+    """
+    token = credentials.credentials
+    supabase = get_postgrest_client(token)
+
+    with timed("auth"):
+        if settings.AUTH_MODE == "remote":
+            await _verify_remotely(token)
+            return supabase
+
+        try:
+            await get_token_verifier().verify_async(token)
+        except LocalVerificationUnavailable as e:
+            logger.debug(f"Falling back to remote token validation: {e}")
+            await _verify_remotely(token)
+        except Exception as e:
+            logger.warning(f"Token validation failed: {e}")
+            raise _unauthorized()
 
     return supabase
+
+async def get_supabase_strict(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer),
+    supabase: AsyncPostgrestClient = Depends(get_supabase),
+) -> AsyncPostgrestClient:
+    """
+    Like `get_supabase`, but also confirms the token with the auth server so
+    sessions revoked before their expiry are rejected. Use for sensitive routes.
+    """
+    if settings.AUTH_MODE != "remote":
+        await _verify_remotely(credentials.credentials)
+    return supabase
+
+async def get_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer),
+    supabase: AsyncPostgrestClient = Depends(get_supabase),
+) -> Optional[str]:
+    """
+    The id of the authenticated caller, recorded as `updated_by` on the
+    translations they write.
+    """
+    return token_subject(credentials.credentials)
+
+async def get_repository(
+    supabase: AsyncPostgrestClient = Depends(get_supabase),
+) -> CatalogRepository:
+    """
+    Return the catalog repository of the configured DATA_BACKEND for an
+    authenticated caller.
+    """
+    return await get_catalog_repository(supabase)
+
+async def get_repository_strict(
+    supabase: AsyncPostgrestClient = Depends(get_supabase_strict),
+) -> CatalogRepository:
+    """Like `get_repository`, with the token confirmed as `get_supabase_strict` does."""
+    return await get_catalog_repository(supabase)
+
+async def get_runtime_repository(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+) -> CatalogRepository:
+    """
+    The repository for runtime lookups. With RUNTIME_PUBLIC they need no
+    token and read with service role access; otherwise the caller is
+    authenticated like `get_repository`.
+    """
+    if settings.RUNTIME_PUBLIC:
+        return await get_service_repository()
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    return await get_catalog_repository(await get_supabase(credentials))
@@ -1,13 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from .core.changes import get_change_feed
 from .core.config import settings
-from .routers import localizations, analytics
+from .core.jobs import get_job_runner
+from .core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, get_metrics
+from .core.supabase_client import close_supabase_client
+from .core.write_behind import get_write_behind_buffer
+from .repositories.factory import close_repositories
+from .routers import localizations, analytics, exports, jobs
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await get_job_runner().start()
+    await get_change_feed().start()
+    yield
+    # Flushed first, so its last writes still reach the caches and the change feed
+    write_behind = get_write_behind_buffer()
+    if write_behind is not None:
+        await write_behind.stop()
+    await get_change_feed().stop()
+    await get_job_runner().stop()
+    await close_repositories()
+    await close_supabase_client()
 
 app = FastAPI(
     title="Localization Management API",
     version="1.0.0",
-    root_path=settings.root_path
+    root_path=settings.root_path,
+    lifespan=lifespan
 )
 
 # disable automatic slash redirects if desired
@@ -22,14 +44,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it runs first and times the whole request, CORS included
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
 # mount routers
 app.include_router(localizations.router, prefix="/localizations", tags=["localizations"])
 app.include_router(analytics.router,     prefix="/analytics",     tags=["analytics"])
+app.include_router(exports.router,       prefix="/exports",       tags=["exports"])
+app.include_router(jobs.router,          prefix="/jobs",          tags=["jobs"])
 
 @app.get("/")
 async def root():
     return {"message": "Localization Management API is running"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(content=get_metrics().render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.exception_handler(404)
 async def not_found_exception_handler(request: Request, exc: Exception):
     if request.url.path.startswith(f"{settings.root_path}/"):
@@ -0,0 +1,145 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+
+class CatalogRepository(ABC):
+    """
+    Data access for the localization catalog.
+
+    Routers, imports and jobs go through this interface rather than through a
+    database client, so the storage backend can be swapped (see
+    `DATA_BACKEND`). Rows are plain dicts shaped like PostgREST responses:
+    ids as strings and timestamps as ISO 8601 strings.
+    """
+
+    # Catalog reads
+
+    @abstractmethod
+    async def fetch_active_languages(self) -> Dict[str, str]:
+        """Map the code of every active language to its name, ordered by code."""
+
+    @abstractmethod
+    async def load_catalog(self) -> Tuple[List[dict], List[str]]:
+        """
+        Read the whole catalog.
+
+        Returns:
+            Every key in the GET /localizations entry shape, with every active
+            language filled in, and the active language codes.
+        """
+
+    @abstractmethod
+    async def fetch_key_batch(
+        self,
+        after: Optional[str],
+        limit: int,
+        category: Optional[str],
+        prefix: Optional[str],
+    ) -> List[dict]:
+        """Up to `limit` keys ordered by key name, starting after `after`."""
+
+    @abstractmethod
+    async def fetch_keys_by_id(self, key_ids: Sequence[str]) -> List[dict]:
+        """The keys with the given ids, in no particular order."""
+
+    @abstractmethod
+    async def fetch_translations_for_keys(
+        self,
+        key_ids: Sequence[str],
+        language: Optional[str] = None,
+    ) -> Dict[str, Dict[str, dict]]:
+        """The translations of the given keys, grouped by key_id and language."""
+
+    @abstractmethod
+    def iter_catalog_chunks(self, languages: List[str], chunk_size: int) -> AsyncIterator[List[dict]]:
+        """
+        Yield the whole catalog as lists of at most `chunk_size` entries, so
+        that only one chunk is held in memory at a time.
+        """
+
+    @abstractmethod
+    async def fetch_catalog_watermark(self) -> Dict[str, Any]:
+        """
+        Summarise the state of the catalog for ETag computation: the active
+        languages, and the newest `updated_at` and row count of
+        translation_keys and translations, and a sequence bumped by every
+        deletion. The counts come from the completion counters, so
+        translations count non-empty values only; deleting an empty one
+        only moves the deletion sequence.
+        """
+
+    @abstractmethod
+    async def fetch_changes_since(
+        self,
+        since: datetime,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        The keys and the translations updated after `since`, oldest first.
+        With `limit`, at most that many of each are read.
+        """
+
+    @abstractmethod
+    async def search_keys(
+        self,
+        q: str,
+        mode: str,
+        language: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> List[dict]:
+        """
+        Ranked key matches, as returned by the `search_translation_keys`
+        database function: key columns plus `matched_in` and `score`.
+        """
+
+    @abstractmethod
+    async def fetch_key_index(self) -> Dict[str, str]:
+        """Map every key name to its id."""
+
+    @abstractmethod
+    async def fetch_existing_key_ids(self, key_ids: Sequence[str]) -> Set[str]:
+        """The subset of `key_ids` that exist."""
+
+    # Writes
+
+    @abstractmethod
+    async def upsert_translations(
+        self,
+        rows: List[Dict[str, str]],
+        chunk_size: int,
+        concurrency: int,
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        Insert or update translation rows, as `upsert_translations_batched`
+        describes. Rows have `key_id`, `language_code`, `value` and
+        `updated_by`, the id of the user who wrote them or None.
+
+        Returns:
+            A per-row report in input order, and the rows written.
+        """
+
+    # Analytics
+
+    @abstractmethod
+    async def fetch_completion_counts(self, include_contributors: bool) -> Dict[str, Any]:
+        """Translated/total counts in the shape of the `translation_completion` function."""
+
+    @abstractmethod
+    async def fetch_completion_drift(self) -> Dict[str, Any]:
+        """Disagreements between the completion counters and a full recount."""
+
+    @abstractmethod
+    async def reconcile_completion_counters(self) -> Dict[str, Any]:
+        """Rebuild the completion counters, returning the drift that was corrected."""
+
+    # Background job records
+
+    @abstractmethod
+    async def save_job(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a job record."""
+
+    @abstractmethod
+    async def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job record, or None if there is none with that id."""
@@ -0,0 +1,44 @@
+from typing import Optional
+from postgrest import AsyncPostgrestClient
+from ..core.config import settings
+from ..core.supabase_client import get_postgrest_client
+from .base import CatalogRepository
+from .memory import MemoryRepository
+from .postgres import PostgresRepository, close_postgres_pool, get_postgres_pool
+from .supabase import SupabaseRepository
+
+DATA_BACKENDS = ("supabase", "postgres", "memory")
+
+
+_memory_repository: Optional[MemoryRepository] = None
+
+def get_memory_repository() -> MemoryRepository:
+    global _memory_repository
+    if _memory_repository is None:
+        _memory_repository = MemoryRepository()
+    return _memory_repository
+
+
+async def get_catalog_repository(supabase: AsyncPostgrestClient) -> CatalogRepository:
+    """
+    Return the repository of the configured DATA_BACKEND.
+
+    `supabase` is the client used by the supabase backend; the other
+    backends share one pool or store across all callers.
+    """
+    if settings.DATA_BACKEND == "supabase":
+        return SupabaseRepository(supabase)
+    if settings.DATA_BACKEND == "postgres":
+        return PostgresRepository(await get_postgres_pool())
+    if settings.DATA_BACKEND == "memory":
+        return get_memory_repository()
+    raise ValueError(f"Unknown DATA_BACKEND: {settings.DATA_BACKEND}. Use one of: {', '.join(DATA_BACKENDS)}")
+
+
+async def get_service_repository() -> CatalogRepository:
+    """The repository with service role access, for work done outside a request."""
+    return await get_catalog_repository(get_postgrest_client(settings.SUPABASE_SERVICE_ROLE_KEY))
+
+
+async def close_repositories() -> None:
+    await close_postgres_pool()
@@ -0,0 +1,340 @@
+import bisect
+import copy
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+from ..core.bulk import upsert_translations_batched
+from ..core.catalog import build_key_entry
+from .base import CatalogRepository
+
+KEY_FIELDS = ("id", "key", "category", "description", "created_at", "updated_at")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+class MemoryRepository(CatalogRepository):
+    """
+    Catalog held in process memory, for local development, tests and
+    benchmarks.
+
+    Behaves like the database: keys are ordered by name or id, upserts bump
+    `updated_at`, and completion counts are computed from the data. Search
+    ranks like `search_translation_keys` without the trigram similarity term.
+    Nothing is persisted.
+    """
+
+    def __init__(self):
+        self.languages: Dict[str, Dict[str, Any]] = {}
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        # key_id -> language_code -> translation row
+        self.translations: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        # Like the catalog_deletions sequence: bumped by every delete
+        self.deletions = 0
+        self._key_names: Optional[List[str]] = None
+        self._key_ids: Optional[List[str]] = None
+        self._ids_by_name: Dict[str, str] = {}
+
+    # Seeding
+
+    def add_language(self, code: str, name: str, is_active: bool = True) -> None:
+        self.languages[code] = {"code": code, "name": name, "is_active": is_active}
+
+    def add_key(
+        self,
+        key: str,
+        category: str,
+        description: Optional[str] = None,
+        key_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        now = _now()
+        row = {
+            "id": key_id or str(uuid.uuid4()),
+            "key": key,
+            "category": category,
+            "description": description,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.keys[row["id"]] = row
+        self._ids_by_name[key] = row["id"]
+        self._key_names = None
+        self._key_ids = None
+        return row
+
+    def add_translation(
+        self,
+        key_id: str,
+        language_code: str,
+        value: str,
+        updated_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if key_id not in self.keys:
+            raise KeyError(f"Translation key not found: {key_id}")
+        if language_code not in self.languages:
+            raise KeyError(f"Language not found: {language_code}")
+
+        now = _now()
+        existing = self.translations.setdefault(key_id, {}).get(language_code)
+        if existing is None:
+            existing = {
+                "id": str(uuid.uuid4()),
+                "key_id": key_id,
+                "language_code": language_code,
+                "created_at": now,
+            }
+            self.translations[key_id][language_code] = existing
+        existing["value"] = value
+        existing["updated_by"] = updated_by
+        existing["updated_at"] = now
+        return existing
+
+    def delete_translation(self, key_id: str, language_code: str) -> None:
+        if self.translations.get(key_id, {}).pop(language_code, None) is not None:
+            self.deletions += 1
+
+    # Ordering
+
+    def _sorted_key_names(self) -> List[str]:
+        if self._key_names is None:
+            self._key_names = sorted(self._ids_by_name)
+        return self._key_names
+
+    def _sorted_key_ids(self) -> List[str]:
+        if self._key_ids is None:
+            self._key_ids = sorted(self.keys)
+        return self._key_ids
+
+    def _key_row(self, key_id: str) -> dict:
+        key = self.keys[key_id]
+        return {field: key[field] for field in KEY_FIELDS}
+
+    def _active_codes(self) -> List[str]:
+        return sorted(code for code, lang in self.languages.items() if lang["is_active"])
+
+    # CatalogRepository
+
+    async def fetch_active_languages(self) -> Dict[str, str]:
+        return {code: self.languages[code]["name"] for code in self._active_codes()}
+
+    async def load_catalog(self) -> Tuple[List[dict], List[str]]:
+        languages = self._active_codes()
+        entries = [
+            build_key_entry(self.keys[key_id], self.translations.get(key_id), languages)
+            for key_id in self._sorted_key_ids()
+        ]
+        return entries, languages
+
+    async def fetch_key_batch(
+        self,
+        after: Optional[str],
+        limit: int,
+        category: Optional[str],
+        prefix: Optional[str],
+    ) -> List[dict]:
+        names = self._sorted_key_names()
+        start = bisect.bisect_right(names, after) if after is not None else 0
+        if prefix and bisect.bisect_left(names, prefix) > start:
+            start = bisect.bisect_left(names, prefix)
+
+        batch = []
+        for index in range(start, len(names)):
+            name = names[index]
+            if prefix and not name.startswith(prefix):
+                break
+            key = self.keys[self._ids_by_name[name]]
+            if category and key["category"] != category:
+                continue
+            batch.append(self._key_row(key["id"]))
+            if len(batch) == limit:
+                break
+        return batch
+
+    async def fetch_keys_by_id(self, key_ids: Sequence[str]) -> List[dict]:
+        return [self._key_row(key_id) for key_id in dict.fromkeys(key_ids) if key_id in self.keys]
+
+    async def fetch_translations_for_keys(
+        self,
+        key_ids: Sequence[str],
+        language: Optional[str] = None,
+    ) -> Dict[str, Dict[str, dict]]:
+        translations_by_key: Dict[str, Dict[str, dict]] = {}
+        for key_id in key_ids:
+            for lang_code, trans in self.translations.get(key_id, {}).items():
+                if language and lang_code != language:
+                    continue
+                translations_by_key.setdefault(key_id, {})[lang_code] = dict(trans)
+        return translations_by_key
+
+    async def iter_catalog_chunks(self, languages: List[str], chunk_size: int) -> AsyncIterator[List[dict]]:
+        key_ids = self._sorted_key_ids()
+        for start in range(0, len(key_ids), chunk_size):
+            yield [
+                build_key_entry(self.keys[key_id], self.translations.get(key_id), languages)
+                for key_id in key_ids[start:start + chunk_size]
+            ]
+
+    async def fetch_catalog_watermark(self) -> Dict[str, Any]:
+        translations = [trans for by_lang in self.translations.values() for trans in by_lang.values()]
+        return {
+            "languages": self._active_codes(),
+            "translation_keys": {
+                "updated_at": max((key["updated_at"] for key in self.keys.values()), default=None),
+                "count": len(self.keys),
+            },
+            "translations": {
+                "updated_at": max((trans["updated_at"] for trans in translations), default=None),
+                # Like the completion counters, which count non-empty values
+                "count": sum(1 for trans in translations if trans["value"]),
+            },
+            "deletions": self.deletions,
+        }
+
+    async def fetch_changes_since(
+        self,
+        since: datetime,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[dict], List[dict]]:
+        def changed(row: Dict[str, Any]) -> bool:
+            return datetime.fromisoformat(row["updated_at"]) > since
+
+        keys = sorted(
+            (self._key_row(key["id"]) for key in self.keys.values() if changed(key)),
+            key=lambda key: (key["updated_at"], key["id"]),
+        )
+        translations = sorted(
+            (
+                dict(trans)
+                for by_lang in self.translations.values()
+                for trans in by_lang.values()
+                if changed(trans)
+            ),
+            key=lambda trans: (trans["updated_at"], trans["id"]),
+        )
+        return keys[:limit], translations[:limit]
+
+    async def search_keys(
+        self,
+        q: str,
+        mode: str,
+        language: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> List[dict]:
+        term = q.lower()
+
+        def score(text: Optional[str], weight: float) -> Optional[float]:
+            if not text:
+                return None
+            text = text.lower()
+            if text.startswith(term):
+                return weight + 1.0
+            if mode == "substring" and term in text:
+                return weight
+            return None
+
+        best: Dict[str, Tuple[float, str]] = {}
+
+        def offer(key_id: str, matched_in: str, value: Optional[float]) -> None:
+            if value is not None and (key_id not in best or value > best[key_id][0]):
+                best[key_id] = (value, matched_in)
+
+        for key in self.keys.values():
+            offer(key["id"], "key", score(key["key"], 3.0))
+            offer(key["id"], "description", score(key["description"], 2.0))
+            for lang_code, trans in self.translations.get(key["id"], {}).items():
+                if language is None or lang_code == language:
+                    offer(key["id"], f"translation:{lang_code}", score(trans["value"], 1.0))
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], self.keys[item[0]]["key"]))
+        return [
+            {**self._key_row(key_id), "matched_in": matched_in, "score": value}
+            for key_id, (value, matched_in) in ranked[offset:offset + limit]
+        ]
+
+    async def fetch_key_index(self) -> Dict[str, str]:
+        return dict(self._ids_by_name)
+
+    async def fetch_existing_key_ids(self, key_ids: Sequence[str]) -> Set[str]:
+        return {key_id for key_id in key_ids if key_id in self.keys}
+
+    async def _upsert_chunk(self, rows: List[Dict[str, str]]) -> List[dict]:
+        # Validate the whole chunk first so it is written entirely or not at all
+        for row in rows:
+            if row["key_id"] not in self.keys:
+                raise ValueError(f"Translation key not found: {row['key_id']}")
+            if row["language_code"] not in self.languages:
+                raise ValueError(f"Language not found: {row['language_code']}")
+        return [
+            dict(self.add_translation(row["key_id"], row["language_code"], row["value"], row.get("updated_by")))
+            for row in rows
+        ]
+
+    async def upsert_translations(
+        self,
+        rows: List[Dict[str, str]],
+        chunk_size: int,
+        concurrency: int,
+    ) -> Tuple[List[dict], List[dict]]:
+        return await upsert_translations_batched(self._upsert_chunk, rows, chunk_size, concurrency)
+
+    async def fetch_completion_counts(self, include_contributors: bool) -> Dict[str, Any]:
+        languages = self._active_codes()
+        category_totals = Counter(key["category"] for key in self.keys.values())
+        translated: Counter = Counter()
+        contributions: Dict[str, Counter] = {}
+        for key_id, by_lang in self.translations.items():
+            category = self.keys[key_id]["category"]
+            for lang_code, trans in by_lang.items():
+                if trans["value"]:
+                    translated[(lang_code, category)] += 1
+                    if trans.get("updated_by") is not None and lang_code in languages:
+                        contributions.setdefault(trans["updated_by"], Counter())[lang_code] += 1
+
+        language_categories = {
+            lang_code: {
+                category: {"translated": translated[(lang_code, category)], "total": total}
+                for category, total in category_totals.items()
+            }
+            for lang_code in languages
+        } if category_totals else {}
+        counts = {
+            "total_keys": len(self.keys),
+            "languages": {
+                lang_code: {
+                    "translated": sum(stats["translated"] for stats in categories.values()),
+                    "total": len(self.keys),
+                }
+                for lang_code, categories in language_categories.items()
+            },
+            "categories": {
+                category: {
+                    "translated": sum(translated[(lang_code, category)] for lang_code in languages),
+                    "total": total * len(languages),
+                }
+                for category, total in category_totals.items()
+            } if languages else {},
+            "language_categories": language_categories,
+            "contributors": {
+                user_id: dict(by_language)
+                for user_id, by_language in contributions.items()
+            } if include_contributors else None,
+        }
+        return counts
+
+    async def fetch_completion_drift(self) -> Dict[str, Any]:
+        # Counts are always computed from the data, so there is nothing to drift
+        return {"translations": [], "categories": []}
+
+    async def reconcile_completion_counters(self) -> Dict[str, Any]:
+        return await self.fetch_completion_drift()
+
+    async def save_job(self, record: Dict[str, Any]) -> None:
+        self.jobs[record["id"]] = copy.deepcopy(record)
+
+    async def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = self.jobs.get(job_id)
+        return copy.deepcopy(record) if record is not None else None
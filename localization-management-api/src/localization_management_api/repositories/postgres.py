@@ -0,0 +1,371 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from ..core.bulk import chunked, upsert_translations_batched
+from ..core.catalog import build_key_entry, escape_like
+from ..core.config import settings
+from .base import CatalogRepository
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg is optional; it is only needed for DATA_BACKEND=postgres
+    asyncpg = None
+
+# Channel of the notifications sent by the translations change triggers
+TRANSLATION_CHANGES_CHANNEL = "translation_changes"
+
+# Keys per `= any($1)` filter
+ANY_FILTER_BATCH_SIZE = 5000
+# Rows fetched per round trip when streaming the catalog through a cursor
+CURSOR_PREFETCH = 2000
+
+LANGUAGES_SQL = "select code, name from public.languages where is_active order by code"
+
+KEY_SELECT = "select id, key, category, description, created_at, updated_at from public.translation_keys"
+
+# Keys joined with their translations, one row per translation (or one row
+# with null translation columns for keys without any), grouped by key
+CATALOG_SQL = """
+select
+  k.id, k.key, k.category, k.description, k.created_at, k.updated_at,
+  t.language_code, t.value, t.updated_at as translation_updated_at
+from public.translation_keys k
+left join public.translations t on t.key_id = k.id
+order by k.id, t.language_code
+"""
+
+UPSERT_TRANSLATIONS_SQL = """
+insert into public.translations (key_id, language_code, value, updated_by)
+select * from unnest($1::text[]::uuid[], $2::text[], $3::text[], $4::text[]::uuid[])
+on conflict (key_id, language_code) do update set value = excluded.value, updated_by = excluded.updated_by
+returning id, key_id, language_code, value, updated_by, updated_at
+"""
+
+SAVE_JOB_SQL = """
+insert into public.jobs (id, kind, status, params, progress, result, error, created_at, started_at, finished_at)
+values ($1::text::uuid, $2, $3, $4, $5, $6, $7, $8::text::timestamptz, $9::text::timestamptz, $10::text::timestamptz)
+on conflict (id) do update set
+  status = excluded.status,
+  progress = excluded.progress,
+  result = excluded.result,
+  error = excluded.error,
+  started_at = excluded.started_at,
+  finished_at = excluded.finished_at
+"""
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _row(record: Any) -> dict:
+    """Convert a record to the dict PostgREST would have returned for it."""
+    return {name: _to_json_value(value) for name, value in record.items()}
+
+
+def _key_row(record: Any) -> dict:
+    return {
+        "id": str(record["id"]),
+        "key": record["key"],
+        "category": record["category"],
+        "description": record["description"],
+        "created_at": record["created_at"].isoformat(),
+        "updated_at": record["updated_at"].isoformat(),
+    }
+
+
+def _group_catalog_rows(records: Iterable[Any], languages: List[str]) -> Iterable[dict]:
+    """Turn CATALOG_SQL rows, which arrive grouped by key, into key entries."""
+    key_id = None
+    key: Optional[dict] = None
+    translations: Dict[str, dict] = {}
+    for record in records:
+        if record["id"] != key_id:
+            if key is not None:
+                yield build_key_entry(key, translations, languages)
+            key_id = record["id"]
+            key = _key_row(record)
+            translations = {}
+        if record["language_code"] is not None:
+            translations[record["language_code"]] = {
+                "value": record["value"],
+                "updated_at": _to_json_value(record["translation_updated_at"]),
+            }
+    if key is not None:
+        yield build_key_entry(key, translations, languages)
+
+
+async def _init_connection(connection: Any) -> None:
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog",
+        )
+
+
+class PostgresRepository(CatalogRepository):
+    """
+    Catalog access over direct Postgres connections from an asyncpg pool.
+
+    Skips the PostgREST hop: the catalog is assembled by the
+    `catalog_entries` function or streamed from a single join through a
+    cursor, multi-statement reads run in one read-only repeatable read
+    transaction, and asyncpg prepares and caches every statement per
+    connection. Queries run as the database role of DATABASE_URL, so row
+    level security does not apply; callers are still authenticated by the
+    API.
+    """
+
+    def __init__(self, pool: Any):
+        self.pool = pool
+
+    async def fetch_active_languages(self) -> Dict[str, str]:
+        records = await self.pool.fetch(LANGUAGES_SQL)
+        return {record["code"]: record["name"] for record in records}
+
+    async def load_catalog(self) -> Tuple[List[dict], List[str]]:
+        catalog = await self.pool.fetchval("select public.catalog_entries()")
+        return catalog["entries"], catalog["languages"]
+
+    async def fetch_key_batch(
+        self,
+        after: Optional[str],
+        limit: int,
+        category: Optional[str],
+        prefix: Optional[str],
+    ) -> List[dict]:
+        conditions = []
+        args: List[Any] = []
+        if after is not None:
+            args.append(after)
+            conditions.append(f"key > ${len(args)}")
+        if category:
+            args.append(category)
+            conditions.append(f"category = ${len(args)}")
+        if prefix:
+            args.append(f"{escape_like(prefix)}%")
+            conditions.append(f"key like ${len(args)}")
+        where = f" where {' and '.join(conditions)}" if conditions else ""
+        args.append(limit)
+        records = await self.pool.fetch(f"{KEY_SELECT}{where} order by key limit ${len(args)}", *args)
+        return [_key_row(record) for record in records]
+
+    async def fetch_keys_by_id(self, key_ids: Sequence[str]) -> List[dict]:
+        keys = []
+        for batch in chunked(list(key_ids), ANY_FILTER_BATCH_SIZE):
+            records = await self.pool.fetch(f"{KEY_SELECT} where id = any($1::text[]::uuid[])", list(batch))
+            keys.extend(_key_row(record) for record in records)
+        return keys
+
+    async def fetch_translations_for_keys(
+        self,
+        key_ids: Sequence[str],
+        language: Optional[str] = None,
+    ) -> Dict[str, Dict[str, dict]]:
+        translations_by_key: Dict[str, Dict[str, dict]] = {}
+        if not key_ids:
+            return translations_by_key
+
+        sql = (
+            "select key_id, language_code, value, updated_at from public.translations"
+            " where key_id = any($1::text[]::uuid[])"
+        )
+        args: List[Any] = [list(key_ids)]
+        if language:
+            sql += " and language_code = $2"
+            args.append(language)
+        for record in await self.pool.fetch(sql, *args):
+            trans = _row(record)
+            translations_by_key.setdefault(trans["key_id"], {})[trans["language_code"]] = trans
+        return translations_by_key
+
+    async def iter_catalog_chunks(self, languages: List[str], chunk_size: int) -> AsyncIterator[List[dict]]:
+        """
+        The catalog join is read through a server-side cursor, so the
+        database streams rows as they are consumed. One pooled connection is
+        held until the iteration ends.
+        """
+        async with self.pool.acquire() as connection:
+            async with connection.transaction(isolation="repeatable_read", readonly=True):
+                records = connection.cursor(CATALOG_SQL, prefetch=CURSOR_PREFETCH)
+                chunk: List[dict] = []
+                async for entry in _agroup_catalog_rows(records, languages):
+                    chunk.append(entry)
+                    if len(chunk) == chunk_size:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+
+    async def fetch_catalog_watermark(self) -> Dict[str, Any]:
+        return await self.pool.fetchval("select public.catalog_watermark()")
+
+    async def fetch_changes_since(
+        self,
+        since: datetime,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[dict], List[dict]]:
+        # A null limit is no limit
+        async with self.pool.acquire() as connection:
+            async with connection.transaction(isolation="repeatable_read", readonly=True):
+                keys = await connection.fetch(
+                    f"{KEY_SELECT} where updated_at > $1 order by updated_at, id limit $2", since, limit
+                )
+                translations = await connection.fetch(
+                    "select key_id, language_code, value, updated_at from public.translations"
+                    " where updated_at > $1 order by updated_at, id limit $2",
+                    since,
+                    limit,
+                )
+        return [_key_row(record) for record in keys], [_row(record) for record in translations]
+
+    async def search_keys(
+        self,
+        q: str,
+        mode: str,
+        language: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> List[dict]:
+        records = await self.pool.fetch(
+            "select * from public.search_translation_keys($1, $2, $3, $4, $5)",
+            q, mode, language, limit, offset,
+        )
+        return [_row(record) for record in records]
+
+    async def fetch_key_index(self) -> Dict[str, str]:
+        records = await self.pool.fetch("select key, id::text as id from public.translation_keys")
+        return {record["key"]: record["id"] for record in records}
+
+    async def fetch_existing_key_ids(self, key_ids: Sequence[str]) -> Set[str]:
+        existing: Set[str] = set()
+        for batch in chunked(list(key_ids), ANY_FILTER_BATCH_SIZE):
+            records = await self.pool.fetch(
+                "select id::text as id from public.translation_keys where id = any($1::text[]::uuid[])",
+                list(batch),
+            )
+            existing.update(record["id"] for record in records)
+        return existing
+
+    async def _upsert_chunk(self, rows: List[Dict[str, str]]) -> List[dict]:
+        # One statement, so the chunk is atomic without an explicit transaction
+        records = await self.pool.fetch(
+            UPSERT_TRANSLATIONS_SQL,
+            [row["key_id"] for row in rows],
+            [row["language_code"] for row in rows],
+            [row["value"] for row in rows],
+            [row.get("updated_by") for row in rows],
+        )
+        return [_row(record) for record in records]
+
+    async def upsert_translations(
+        self,
+        rows: List[Dict[str, str]],
+        chunk_size: int,
+        concurrency: int,
+    ) -> Tuple[List[dict], List[dict]]:
+        return await upsert_translations_batched(self._upsert_chunk, rows, chunk_size, concurrency)
+
+    async def fetch_completion_counts(self, include_contributors: bool) -> Dict[str, Any]:
+        return await self.pool.fetchval("select public.translation_completion($1)", include_contributors)
+
+    async def fetch_completion_drift(self) -> Dict[str, Any]:
+        return await self.pool.fetchval("select public.completion_counter_drift()")
+
+    async def reconcile_completion_counters(self) -> Dict[str, Any]:
+        return await self.pool.fetchval("select public.reconcile_completion_counters()")
+
+    async def save_job(self, record: Dict[str, Any]) -> None:
+        await self.pool.execute(
+            SAVE_JOB_SQL,
+            record["id"],
+            record["kind"],
+            record["status"],
+            record["params"],
+            record["progress"],
+            record["result"],
+            record["error"],
+            record["created_at"],
+            record["started_at"],
+            record["finished_at"],
+        )
+
+    async def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = await self.pool.fetchrow("select * from public.jobs where id = $1::text::uuid", job_id)
+        return _row(record) if record is not None else None
+
+
+async def _agroup_catalog_rows(records: AsyncIterator[Any], languages: List[str]) -> AsyncIterator[dict]:
+    """`_group_catalog_rows` for rows read from a cursor."""
+    batch: List[Any] = []
+    async for record in records:
+        if batch and record["id"] != batch[-1]["id"]:
+            for entry in _group_catalog_rows(batch, languages):
+                yield entry
+            batch = []
+        batch.append(record)
+    for entry in _group_catalog_rows(batch, languages):
+        yield entry
+
+
+_pool: Optional[Any] = None
+_pool_lock = asyncio.Lock()
+
+async def get_postgres_pool() -> Any:
+    """The shared asyncpg pool, created on first use."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            if asyncpg is None:
+                raise RuntimeError("DATA_BACKEND=postgres needs the asyncpg package")
+            if not settings.DATABASE_URL:
+                raise RuntimeError("DATA_BACKEND=postgres needs DATABASE_URL")
+            _pool = await asyncpg.create_pool(
+                settings.DATABASE_URL,
+                min_size=settings.DATABASE_POOL_MIN_SIZE,
+                max_size=settings.DATABASE_POOL_MAX_SIZE,
+                init=_init_connection,
+            )
+    return _pool
+
+async def close_postgres_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def listen_for_translation_changes(
+    on_changes: Callable[[List[dict]], None],
+    on_close: Callable[[], None],
+) -> Any:
+    """
+    Open a connection that listens for translation change notifications.
+
+    `on_changes(rows)` is called with the key_id, language_code and
+    updated_at of the rows each notification covers, and `on_close()` when
+    the connection is lost. Returns the connection; close it to stop.
+    """
+    if asyncpg is None:
+        raise RuntimeError("CHANGE_FEED_SOURCE=postgres needs the asyncpg package")
+    if not settings.DATABASE_URL:
+        raise RuntimeError("CHANGE_FEED_SOURCE=postgres needs DATABASE_URL")
+
+    connection = await asyncpg.connect(settings.DATABASE_URL)
+
+    def notify(connection: Any, pid: int, channel: str, payload: str) -> None:
+        on_changes(json.loads(payload))
+
+    connection.add_termination_listener(lambda connection: on_close())
+    await connection.add_listener(TRANSLATION_CHANGES_CHANNEL, notify)
+    return connection
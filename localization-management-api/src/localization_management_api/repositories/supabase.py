@@ -0,0 +1,312 @@
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+from postgrest import AsyncPostgrestClient
+from ..core.bulk import (
+    IN_FILTER_BATCH_SIZE,
+    chunked,
+    fetch_all_rows,
+    fetch_existing_key_ids,
+    gather_bounded,
+    upsert_translations_batched,
+)
+from ..core.config import settings
+from ..core.catalog import (
+    KEY_COLUMNS,
+    POSTGREST_MAX_ROWS,
+    TRANSLATION_COLUMNS,
+    build_key_entry,
+    escape_like,
+)
+from .base import CatalogRepository
+
+# `in_` filter batches read at once
+IN_FILTER_CONCURRENCY = 4
+
+
+class SupabaseRepository(CatalogRepository):
+    """
+    Catalog access through PostgREST.
+
+    The client carries the caller's token, so every query runs under the
+    caller's row level security policies.
+    """
+
+    def __init__(self, supabase: AsyncPostgrestClient):
+        self.supabase = supabase
+
+    async def fetch_active_languages(self) -> Dict[str, str]:
+        languages_result = await (
+            self.supabase
+            .table("languages")
+            .select("code, name")
+            .eq("is_active", True)
+            .order("code")
+            .execute()
+        )
+        return {lang["code"]: lang["name"] for lang in languages_result.data}
+
+    async def load_catalog(self) -> Tuple[List[dict], List[str]]:
+        # The `catalog_entries` function joins keys, translations and active
+        # languages in the database and returns the finished entries
+        catalog = (await self.supabase.rpc("catalog_entries").execute()).data
+        return catalog["entries"], catalog["languages"]
+
+    async def fetch_key_batch(
+        self,
+        after: Optional[str],
+        limit: int,
+        category: Optional[str],
+        prefix: Optional[str],
+    ) -> List[dict]:
+        query = (
+            self.supabase
+            .table("translation_keys")
+            .select(KEY_COLUMNS)
+            .order("key")
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.gt("key", after)
+        if category:
+            query = query.eq("category", category)
+        if prefix:
+            query = query.like("key", f"{escape_like(prefix)}%")
+        return (await query.execute()).data
+
+    async def fetch_keys_by_id(self, key_ids: Sequence[str]) -> List[dict]:
+        keys_results = await asyncio.gather(*(
+            self.supabase
+            .table("translation_keys")
+            .select(KEY_COLUMNS)
+            .in_("id", list(batch))
+            .execute()
+            for batch in chunked(list(key_ids), IN_FILTER_BATCH_SIZE)
+        ))
+        return [key for keys_result in keys_results for key in keys_result.data]
+
+    async def _fetch_translation_batch(self, key_ids: Sequence[str], language: Optional[str]) -> List[dict]:
+        rows: List[dict] = []
+        offset = 0
+        while True:
+            query = (
+                self.supabase
+                .table("translations")
+                .select(TRANSLATION_COLUMNS)
+                .in_("key_id", list(key_ids))
+                .order("key_id")
+                .order("language_code")
+                .range(offset, offset + POSTGREST_MAX_ROWS - 1)
+            )
+            if language:
+                query = query.eq("language_code", language)
+            page = (await query.execute()).data
+            rows.extend(page)
+            if len(page) < POSTGREST_MAX_ROWS:
+                return rows
+            offset += POSTGREST_MAX_ROWS
+
+    async def fetch_translations_for_keys(
+        self,
+        key_ids: Sequence[str],
+        language: Optional[str] = None,
+    ) -> Dict[str, Dict[str, dict]]:
+        # Batched, so long id lists stay within the URL length limits
+        batches = await gather_bounded(
+            (
+                self._fetch_translation_batch(batch, language)
+                for batch in chunked(list(key_ids), IN_FILTER_BATCH_SIZE)
+            ),
+            IN_FILTER_CONCURRENCY,
+        )
+        translations_by_key: Dict[str, Dict[str, dict]] = {}
+        for rows in batches:
+            for trans in rows:
+                translations_by_key.setdefault(trans["key_id"], {})[trans["language_code"]] = trans
+        return translations_by_key
+
+    async def _iter_translations_in_key_range(self, first_key_id: str, last_key_id: str) -> AsyncIterator[dict]:
+        """
+        Yield the translations whose key_id lies in [first_key_id, last_key_id],
+        ordered by key_id and language_code.
+        """
+        offset = 0
+        while True:
+            result = await (
+                self.supabase
+                .table("translations")
+                .select(TRANSLATION_COLUMNS)
+                .gte("key_id", first_key_id)
+                .lte("key_id", last_key_id)
+                .order("key_id")
+                .order("language_code")
+                .range(offset, offset + POSTGREST_MAX_ROWS - 1)
+                .execute()
+            )
+            for row in result.data:
+                yield row
+
+            if len(result.data) < POSTGREST_MAX_ROWS:
+                return
+            offset += POSTGREST_MAX_ROWS
+
+    async def _fetch_key_chunk_by_id(self, after_id: Optional[str], chunk_size: int) -> List[dict]:
+        query = (
+            self.supabase
+            .table("translation_keys")
+            .select(KEY_COLUMNS)
+            .order("id")
+            .limit(chunk_size)
+        )
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        return (await query.execute()).data
+
+    async def iter_catalog_chunks(self, languages: List[str], chunk_size: int) -> AsyncIterator[List[dict]]:
+        """
+        Keys are read in chunks ordered by id and merged with the translations
+        of the same id range. The next chunk of keys is fetched while the
+        current one is being merged.
+        """
+        keys = await self._fetch_key_chunk_by_id(None, chunk_size)
+        while keys:
+            next_keys = None
+            if len(keys) == chunk_size:
+                next_keys = asyncio.create_task(self._fetch_key_chunk_by_id(keys[-1]["id"], chunk_size))
+
+            try:
+                translations = self._iter_translations_in_key_range(keys[0]["id"], keys[-1]["id"])
+                translation = await anext(translations, None)
+                entries = []
+                for key in keys:
+                    key_translations = {}
+                    while translation is not None and translation["key_id"] == key["id"]:
+                        key_translations[translation["language_code"]] = translation
+                        translation = await anext(translations, None)
+                    entries.append(build_key_entry(key, key_translations, languages))
+                yield entries
+            except BaseException:
+                if next_keys is not None:
+                    next_keys.cancel()
+                raise
+
+            keys = await next_keys if next_keys is not None else []
+
+    async def fetch_catalog_watermark(self) -> Dict[str, Any]:
+        return (await self.supabase.rpc("catalog_watermark").execute()).data
+
+    async def _fetch_rows_updated_since(
+        self,
+        table: str,
+        columns: str,
+        since: datetime,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        rows = []
+        offset = 0
+        while limit is None or offset < limit:
+            page_size = POSTGREST_MAX_ROWS if limit is None else min(POSTGREST_MAX_ROWS, limit - offset)
+            result = await (
+                self.supabase
+                .table(table)
+                .select(columns)
+                .gt("updated_at", since.isoformat())
+                .order("updated_at")
+                .order("id")
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            batch = result.data
+            rows.extend(batch)
+            if len(batch) < page_size:
+                return rows
+            offset += page_size
+        return rows
+
+    async def fetch_changes_since(
+        self,
+        since: datetime,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[dict], List[dict]]:
+        changed_keys, changed_translations = await asyncio.gather(
+            self._fetch_rows_updated_since("translation_keys", KEY_COLUMNS, since, limit),
+            self._fetch_rows_updated_since("translations", TRANSLATION_COLUMNS, since, limit),
+        )
+        return changed_keys, changed_translations
+
+    async def search_keys(
+        self,
+        q: str,
+        mode: str,
+        language: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> List[dict]:
+        result = await self.supabase.rpc(
+            "search_translation_keys",
+            {
+                "search_query": q,
+                "match_mode": mode,
+                "search_language": language,
+                "result_limit": limit,
+                "result_offset": offset,
+            },
+        ).execute()
+        return result.data
+
+    async def fetch_key_index(self) -> Dict[str, str]:
+        keys = await fetch_all_rows(self.supabase, "translation_keys", "id, key", settings.BULK_UPSERT_CONCURRENCY)
+        return {key["key"]: key["id"] for key in keys}
+
+    async def fetch_existing_key_ids(self, key_ids: Sequence[str]) -> Set[str]:
+        return await fetch_existing_key_ids(self.supabase, key_ids)
+
+    async def _upsert_chunk(self, rows: List[Dict[str, str]]) -> List[dict]:
+        result = await (
+            self.supabase
+            .table("translations")
+            .upsert(rows, on_conflict="key_id,language_code")
+            .execute()
+        )
+        return result.data
+
+    async def upsert_translations(
+        self,
+        rows: List[Dict[str, str]],
+        chunk_size: int,
+        concurrency: int,
+    ) -> Tuple[List[dict], List[dict]]:
+        return await upsert_translations_batched(self._upsert_chunk, rows, chunk_size, concurrency)
+
+    async def fetch_completion_counts(self, include_contributors: bool) -> Dict[str, Any]:
+        # The `translation_completion` function reads the counters maintained
+        # by triggers on translations and translation_keys
+        result = await self.supabase.rpc(
+            "translation_completion",
+            {"include_contributors": include_contributors},
+        ).execute()
+        return result.data
+
+    async def fetch_completion_drift(self) -> Dict[str, Any]:
+        return (await self.supabase.rpc("completion_counter_drift").execute()).data
+
+    async def reconcile_completion_counters(self) -> Dict[str, Any]:
+        return (await self.supabase.rpc("reconcile_completion_counters").execute()).data
+
+    async def save_job(self, record: Dict[str, Any]) -> None:
+        await (
+            self.supabase
+            .table("jobs")
+            .upsert(record)
+            .execute()
+        )
+
+    async def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        result = await (
+            self.supabase
+            .table("jobs")
+            .select("*")
+            .eq("id", job_id)
+            .execute()
+        )
+        return result.data[0] if result.data else None
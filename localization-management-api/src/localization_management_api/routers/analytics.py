@@ -1,56 +1,147 @@
-from typing import Dict
+from typing import Any, Dict
 from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
-from ..deps import get_supabase
-from ..core.config import settings
+from ..deps import get_repository, get_repository_strict
+from ..core.cache import get_catalog_cache
+from ..core.catalog import compute_completion
+from ..core.jobs import Job, register_job_handler
+from ..repositories.base import CatalogRepository
+from ..repositories.factory import get_service_repository
 
 router = APIRouter()
 
 @router.get("/translation-completion")
 async def get_translation_completion(
-    supabase: Client = Depends(get_supabase)
+    repository: CatalogRepository = Depends(get_repository)
 ) -> Dict[str, float]:
     """
     Calculate translation completion percentages.
-    
+
     Returns:
         Dict[str, float]: A dictionary with language codes as keys and completion percentages as values
     """
+    cache = get_catalog_cache()
+    snapshot = cache.get_snapshot()
+    if snapshot is not None:
+        return compute_completion(snapshot.entries, snapshot.languages)
+
     try:
-        # Get all active languages
-        languages_response = supabase.table('languages')\
-            .select('code')\
-            .eq('is_active', True)\
-            .execute()
-        active_languages = [lang['code'] for lang in languages_response.data]
-        total_languages = len(active_languages)
-        
-        if total_languages == 0:
-            return {}
-            
-        # Get all translation keys
-        keys_response = supabase.table('translation_keys').select('id').execute()
-        total_keys = len(keys_response.data)
-        
-        if total_keys == 0:
+        counts = await cache.get_or_load(
+            ("translation_completion", False),
+            lambda: repository.fetch_completion_counts(False),
+        )
+        if not counts["total_keys"]:
             return {}
-            
-        # Get count of non-empty translations per language
-        completion_stats = {}
-        for lang in active_languages:
-            # Count only non-empty translations
-            translations_response = supabase.table('translations')\
-                .select('value', count='exact')\
-                .eq('language_code', lang)\
-                .not_.eq('value', '')\
-                .not_.is_('value', 'null')\
-                .execute()
-                
-            translated_count = translations_response.count or 0
-            completion_percentage = (translated_count / total_keys) * 100 if total_keys > 0 else 0
-            completion_stats[lang] = round(completion_percentage, 2)
-            
-        return completion_stats
-        
+        return {
+            lang_code: _percentage(stats)
+            for lang_code, stats in counts["languages"].items()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/translation-completion/breakdown")
+async def get_translation_completion_breakdown(
+    include_contributors: bool = False,
+    repository: CatalogRepository = Depends(get_repository)
+) -> Dict[str, Any]:
+    """
+    Translation completion per language, per category and per language x category.
+
+    Each breakdown entry holds `translated` and `total` counts and a
+    `percentage`. With `include_contributors`, `contributors` maps each user id
+    to the number of non-empty translations they last updated, per language.
+    """
+    try:
+        counts = await get_catalog_cache().get_or_load(
+            ("translation_completion", include_contributors),
+            lambda: repository.fetch_completion_counts(include_contributors),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return _build_breakdown(counts, include_contributors)
+
+@router.get("/translation-completion/consistency")
+async def check_translation_completion_consistency(
+    repository: CatalogRepository = Depends(get_repository_strict)
+) -> Dict[str, Any]:
+    """
+    Compare the incrementally maintained completion counters with a full recount.
+
+    `drift` lists every (language, category) counter and category key count
+    that disagrees with the recount; `consistent` is true when there is none.
+    The recount scans every translation, so the check runs with service role
+    access (the only role allowed to call it) once the caller's token is
+    confirmed.
+    """
+    try:
+        service_repository = await get_service_repository()
+        drift = await service_repository.fetch_completion_drift()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "consistent": not drift["translations"] and not drift["categories"],
+        "drift": drift,
+    }
+
+@router.post("/translation-completion/reconcile")
+async def reconcile_translation_completion(
+    repository: CatalogRepository = Depends(get_repository_strict)
+) -> Dict[str, Any]:
+    """
+    Rebuild the completion counters from a full recount.
+
+    Returns the drift that was corrected. Like the consistency check it runs
+    with service role access once the caller's token is confirmed.
+    """
+    try:
+        service_repository = await get_service_repository()
+        drift = await service_repository.reconcile_completion_counters()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    get_catalog_cache().invalidate()
+    return {"reconciled": True, "drift": drift}
+
+def _build_breakdown(counts: Dict[str, Any], include_contributors: bool) -> Dict[str, Any]:
+    breakdown = {
+        "total_keys": counts["total_keys"],
+        "languages": _with_percentages(counts["languages"]),
+        "categories": _with_percentages(counts["categories"]),
+        "language_categories": {
+            lang_code: _with_percentages(categories)
+            for lang_code, categories in counts["language_categories"].items()
+        },
+    }
+    if include_contributors:
+        breakdown["contributors"] = counts["contributors"]
+    return breakdown
+
+def _percentage(stats: Dict[str, int]) -> float:
+    return round(stats["translated"] / stats["total"] * 100, 2) if stats["total"] else 0
+
+def _with_percentages(counts: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        name: {**stats, "percentage": _percentage(stats)}
+        for name, stats in counts.items()
+    }
+
+@register_job_handler("translation-completion")
+async def run_translation_completion_job(job: Job, repository: CatalogRepository) -> Dict[str, Any]:
+    """
+    Recompute the completion breakdown. With `reconcile`, the counters are
+    first rebuilt from a full recount, as POST /translation-completion/reconcile
+    does.
+    """
+    include_contributors = bool(job.params.get("include_contributors", False))
+    result: Dict[str, Any] = {}
+    if job.params.get("reconcile"):
+        job.set_progress(step="reconcile")
+        result["drift"] = await repository.reconcile_completion_counters()
+        get_catalog_cache().invalidate()
+
+    job.set_progress(step="breakdown")
+    counts = await repository.fetch_completion_counts(include_contributors)
+    get_catalog_cache().put(("translation_completion", include_contributors), counts)
+    result["breakdown"] = _build_breakdown(counts, include_contributors)
+    return result
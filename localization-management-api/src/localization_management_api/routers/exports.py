@@ -0,0 +1,117 @@
+import asyncio
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from ..deps import get_repository
+from ..core.cache import get_catalog_cache
+from ..core.catalog import etag_matches
+from ..core.exports import (
+    EXPORT_FORMATS,
+    ExportArtifact,
+    ExportConflictError,
+    build_export,
+    build_export_archive,
+)
+from ..core.jobs import Job, register_job_handler
+from ..repositories.base import CatalogRepository
+from .localizations import load_catalog_snapshot
+
+router = APIRouter()
+
+async def _get_artifact(repository: CatalogRepository, language: str, export_format: str):
+    snapshot = await load_catalog_snapshot(repository)
+    if language not in snapshot.languages:
+        raise HTTPException(status_code=404, detail=f"Invalid or inactive language code: {language}")
+    try:
+        return await asyncio.to_thread(build_export, snapshot.entries, language, export_format)
+    except ExportConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/{language}/{export_format}")
+async def export_language(
+    language: str,
+    export_format: str,
+    request: Request,
+    repository: CatalogRepository = Depends(get_repository)
+):
+    """
+    Download the translations of one language as a resource file.
+
+    `export_format` is one of:
+    - `json`: flat `{"key": "value"}` object
+    - `nested-json`: keys split on `.` into nested objects
+    - `po`: gettext catalog, with the key as msgid
+    - `mo`: compiled gettext catalog
+
+    Untranslated keys are left out, except in `po`, where they have an empty
+    msgstr. Files are built once per catalog version and kept compressed in
+    memory; the encoding is chosen from Accept-Encoding (`br` when brotli is
+    installed, otherwise `gzip`).
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    try:
+        artifact = await get_catalog_cache().get_or_load(
+            ("export", language, export_format),
+            lambda: _get_artifact(repository, language, export_format),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error exporting translations: {str(e)}"
+        )
+
+    return artifact_response(artifact, request)
+
+def artifact_response(artifact: ExportArtifact, request: Request) -> Response:
+    """Serve an artifact in the best encoding the client accepts, honouring If-None-Match."""
+    encoding = artifact.select_encoding(request.headers.get("accept-encoding"))
+    etag = artifact.encoding_etag(encoding)
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Content-Disposition": f'attachment; filename="{artifact.filename}"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=artifact.encodings[encoding],
+        media_type=artifact.media_type,
+        headers=headers,
+    )
+
+def _validate_export_params(params: Dict[str, Any]) -> None:
+    export_format = params.setdefault("format", "json")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+@register_job_handler("export", validate=_validate_export_params)
+async def run_export_job(job: Job, repository: CatalogRepository) -> Dict[str, Any]:
+    """
+    Export one `language`, or every active language as a zip archive when
+    it is omitted. The file is downloaded from GET /jobs/{id}/result.
+    """
+    export_format = job.params["format"]
+    language = job.params.get("language")
+    snapshot = await load_catalog_snapshot(repository)
+    job.set_progress(keys=len(snapshot.entries))
+
+    if language:
+        if language not in snapshot.languages:
+            raise ValueError(f"Invalid or inactive language code: {language}")
+        artifact = await asyncio.to_thread(build_export, snapshot.entries, language, export_format)
+    else:
+        artifact = await asyncio.to_thread(
+            build_export_archive, snapshot.entries, snapshot.languages, export_format
+        )
+
+    job.artifact = artifact
+    return {"filename": artifact.filename, "size": len(artifact.encodings["identity"])}
@@ -0,0 +1,141 @@
+import asyncio
+import tempfile
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from ..deps import get_repository, get_repository_strict, get_user_id
+from ..core.imports import detect_import_format
+from ..core.jobs import get_job_runner, job_kinds
+from ..repositories.base import CatalogRepository
+from .exports import artifact_response
+from .localizations import MAX_BULK_CHUNK_SIZE
+
+router = APIRouter()
+
+# Uploads larger than this are spooled to a temporary file instead of memory
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+
+@router.get("/kinds")
+async def list_job_kinds(repository: CatalogRepository = Depends(get_repository)):
+    """
+    List the job kinds that can be submitted.
+    """
+    return {"kinds": job_kinds()}
+
+@router.post("", status_code=202)
+async def submit_job(
+    job: Dict[str, Any],
+    repository: CatalogRepository = Depends(get_repository_strict)
+):
+    """
+    Queue a background job.
+
+    Request body: `{"kind": "...", "params": {...}}`, where kind is one of:
+    - `export`: `{"format": "json" | "nested-json" | "po" | "mo", "language": "es"}`;
+      without `language` every active language is exported as a zip archive
+    - `translation-completion`: `{"reconcile": false, "include_contributors": false}`
+
+    Imports upload a file and are submitted with POST /jobs/import.
+    Returns the job record; poll GET /jobs/{id} for progress.
+    """
+    params = job.get("params") or {}
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="'params' must be an object")
+    try:
+        submitted = await get_job_runner().submit(job.get("kind"), params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return submitted.to_record()
+
+@router.post("/import", status_code=202)
+async def submit_import_job(
+    request: Request,
+    format: Optional[str] = None,
+    language: Optional[str] = None,
+    chunk_size: Optional[int] = Query(None, ge=1, le=MAX_BULK_CHUNK_SIZE),
+    dry_run: bool = False,
+    repository: CatalogRepository = Depends(get_repository_strict),
+    user_id: Optional[str] = Depends(get_user_id),
+):
+    """
+    Queue an import of the file sent as the raw request body.
+
+    Takes the same parameters as POST /localizations/import. The upload is
+    stored in a temporary file (in memory while small) and imported in the
+    background; the import report becomes the job result.
+    """
+    params = {
+        "format": format or detect_import_format(request.headers.get("content-type")),
+        "language": language,
+        "chunk_size": chunk_size,
+        "dry_run": dry_run,
+        "updated_by": user_id,
+    }
+    upload = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    try:
+        get_job_runner().validate("import", params)
+        async for chunk in request.stream():
+            # Past UPLOAD_SPOOL_BYTES this is a disk write
+            await asyncio.to_thread(upload.write, chunk)
+        upload.seek(0)
+        submitted = await get_job_runner().submit("import", params, input=upload)
+    except ValueError as e:
+        upload.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        upload.close()
+        raise
+    return submitted.to_record()
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, repository: CatalogRepository = Depends(get_repository)):
+    """
+    Get a job's status, progress and (JSON) result.
+    """
+    try:
+        record = await get_job_runner().load_record(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching job: {str(e)}")
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return record
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str, repository: CatalogRepository = Depends(get_repository_strict)):
+    """
+    Cancel a queued or running job. Work already written by an import stays written.
+    """
+    job = await get_job_runner().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or no longer held by this server")
+    return job.to_record()
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    request: Request,
+    repository: CatalogRepository = Depends(get_repository)
+):
+    """
+    Download the result of a finished job: the exported file for exports,
+    the JSON result otherwise.
+    """
+    job = get_job_runner().get(job_id)
+    if job is None:
+        try:
+            record = await get_job_runner().load_record(job_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching job: {str(e)}")
+        if record is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if record["status"] != "succeeded":
+            raise HTTPException(status_code=409, detail=f"Job is {record['status']}")
+        if record["kind"] == "export":
+            raise HTTPException(status_code=410, detail="The exported file is no longer available")
+        return JSONResponse(record["result"])
+
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.artifact is not None:
+        return artifact_response(job.artifact, request)
+    return JSONResponse(job.result)
@@ -1,103 +1,586 @@
-from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
-from typing import List, Dict, Optional
-from ..deps import get_supabase
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional, Union
+from ..deps import bearer, get_repository, get_repository_strict, get_runtime_repository, get_user_id
+from ..core.bulk import write_translation_updates
+from ..core.cache import CatalogSnapshot, get_catalog_cache
+from ..core.changes import SINCE_OVERLAP_SECONDS, get_change_feed, iter_change_events
+from ..core.columnar import JSON_MEDIA_TYPE, encode_catalog, negotiate_media_type
+from ..core.config import settings
+from ..core.imports import IMPORT_FORMATS, ImportReport, detect_import_format, import_translations
+from ..core.jobs import Job, register_job_handler
+from ..core.metrics import timed
+from ..core.runtime import RuntimeTable, build_runtime_table, fallback_chain, parse_fallbacks
+from ..core.shared_snapshot import MappedCatalog, MappedSnapshot, get_shared_snapshot
+from ..core.write_behind import get_write_behind_buffer
+from ..core.catalog import (
+    build_key_entry,
+    compute_etag,
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    group_translations_by_key,
+    has_missing_translation,
+)
+from ..repositories.base import CatalogRepository
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+LOCALE_FALLBACKS = parse_fallbacks(settings.LOCALE_FALLBACKS)
+# Upper bound on key batches scanned per request when `missing_only` filters
+# most keys out, so a single page never walks the whole catalog.
+MAX_SCAN_BATCHES = 10
+# Keys read per round trip when streaming the full catalog
+STREAM_CHUNK_SIZE = 500
+MAX_BULK_CHUNK_SIZE = 5000
+# Bytes read from an uploaded file per step of an import job
+IMPORT_READ_SIZE = 64 * 1024
+DEFAULT_SEARCH_LIMIT = 20
+SEARCH_MODES = ("substring", "prefix")
+# Trigram indexes cannot serve substring patterns shorter than this
+MIN_SUBSTRING_QUERY_LENGTH = 3
+
+async def _get_translation_page(
+    repository: CatalogRepository,
+    limit: int,
+    cursor: Optional[str],
+    category: Optional[str],
+    language: Optional[str],
+    prefix: Optional[str],
+    missing_only: bool,
+) -> dict:
+    """
+    Build one page of the catalog, ordered by key.
+
+    Only the translations of the keys on the page are read, so the cost of a
+    request depends on `limit` rather than on the size of the catalog.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    languages = await repository.fetch_active_languages()
+    if language:
+        if language not in languages:
+            raise HTTPException(status_code=400, detail=f"Invalid or inactive language code: {language}")
+        page_languages = [language]
+    else:
+        page_languages = list(languages)
+
+    write_behind = get_write_behind_buffer()
+    items = []
+    has_more = False
+    for _ in range(MAX_SCAN_BATCHES):
+        # Fetch one extra key to know whether another batch exists
+        batch = await repository.fetch_key_batch(after, limit + 1, category, prefix)
+        has_more = len(batch) > limit
+        batch = batch[:limit]
+
+        translations_by_key = await repository.fetch_translations_for_keys(
+            [key["id"] for key in batch], language
+        )
+        entries = [
+            build_key_entry(key, translations_by_key.get(key["id"]), page_languages)
+            for key in batch
+        ]
+        if write_behind is not None:
+            write_behind.overlay(entries, page_languages)
+
+        for index, (key, entry) in enumerate(zip(batch, entries)):
+            after = key["key"]
+            if missing_only and not has_missing_translation(entry, page_languages):
+                continue
+            items.append(entry)
+            if len(items) == limit:
+                has_more = has_more or index < len(batch) - 1
+                break
+
+        if len(items) == limit or not has_more:
+            break
+
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(after) if has_more and after is not None else None,
+        "limit": limit,
+    }
+
+async def load_catalog_snapshot(repository: CatalogRepository) -> Union[CatalogSnapshot, MappedSnapshot]:
+    """
+    Return the full catalog, from the cache or freshly loaded.
+
+    With SHARED_SNAPSHOT_PATH set, the catalog is read from the file the
+    workers share, and a freshly loaded one is written there rather than
+    kept by this worker; only a worker with unwritten edits keeps its own
+    copy. Otherwise a freshly loaded catalog is cached unless a write
+    happened while it was being read.
+    """
+    cache = get_catalog_cache()
+    snapshot = cache.get_snapshot()
+    if snapshot is not None:
+        return snapshot
+    mapped = await load_shared_catalog(repository)
+    if mapped is not None:
+        return MappedSnapshot(mapped)
+    version = cache.version
+
+    shared = get_shared_snapshot()
+    # Read before the catalog, so a write in between makes the file look
+    # older than it is rather than newer
+    watermark = await cache.get_or_load("watermark", repository.fetch_catalog_watermark) if shared else None
+    with timed("catalog_load"):
+        entries, languages = await repository.load_catalog()
+    write_behind = get_write_behind_buffer()
+    if write_behind is not None and write_behind.unflushed:
+        # Shown to this process only, so not written to the shared file
+        write_behind.overlay(entries, languages)
+    elif shared is not None:
+        shared.publish(
+            entries,
+            languages,
+            compute_etag(watermark),
+            lambda: cache.version == version,
+        )
+        return CatalogSnapshot(entries, languages, version)
+    return (
+        cache.store_snapshot(entries, languages, version)
+        or CatalogSnapshot(entries, languages, version)
+    )
+
+async def load_shared_catalog(repository: CatalogRepository) -> Optional[MappedCatalog]:
+    """
+    The catalog file shared by the worker processes, when SHARED_SNAPSHOT_PATH
+    is set and the file holds the current catalog.
+    """
+    shared = get_shared_snapshot()
+    write_behind = get_write_behind_buffer()
+    # The file does not have the edits this process has not written yet
+    if shared is None or (write_behind is not None and write_behind.unflushed):
+        return None
+    watermark = await get_catalog_cache().get_or_load("watermark", repository.fetch_catalog_watermark)
+    return shared.current(compute_etag(watermark))
+
+async def _iter_mapped_catalog_json(mapped: MappedCatalog) -> AsyncIterator[memoryview]:
+    # Holds a reference to the mapping, so a swap mid-response cannot unmap it
+    for chunk in mapped.iter_catalog_json():
+        yield chunk
+
 @router.get("")
-async def get_translation_keys(supabase: Client = Depends(get_supabase)):
+async def get_translation_keys(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    language: Optional[str] = None,
+    prefix: Optional[str] = None,
+    missing_only: bool = False,
+    since: Optional[datetime] = None,
+    repository: CatalogRepository = Depends(get_repository)
+):
     """
-    Fetch all translation keys with their translations
+    Fetch translation keys with their translations.
+
+    Without query parameters the whole catalog is returned as a list. Passing
+    `limit`, `cursor` or any filter switches to the paginated mode, which
+    returns `{"items": [...], "next_cursor": ..., "limit": ...}` ordered by key.
+    Pass `next_cursor` back as `cursor` to fetch the following page.
+
+    Passing `since` returns only what changed after that timestamp, along with
+    a `watermark` to send as `since` on the next poll.
+
+    The whole catalog is also available as parallel arrays, which is much
+    smaller and faster to encode: send `Accept:
+    application/vnd.localization.catalog+json`, or
+    `application/vnd.localization.catalog+msgpack` when msgpack is installed.
+    Encoded catalogs are reused until the catalog changes. With
+    SHARED_SNAPSHOT_PATH set, worker processes serve the JSON catalog from a
+    file they all map, written by whichever one loaded the catalog first.
+
+    Every response carries an ETag derived from the newest `updated_at`;
+    requests with a matching If-None-Match get an empty 304.
     """
+    paginated = (
+        limit is not None
+        or cursor is not None
+        or category is not None
+        or language is not None
+        or prefix is not None
+        or missing_only
+    )
+    if since is not None and paginated:
+        raise HTTPException(
+            status_code=400,
+            detail="'since' cannot be combined with pagination or filter parameters"
+        )
+
+    cache = get_catalog_cache()
     try:
-        # First, get all translation keys with their categories and descriptions
-        keys_result = (
-            supabase
-            .table("translation_keys")
-            .select("*")
-            .execute()
+        # Only the full catalog has alternative representations
+        media_type = JSON_MEDIA_TYPE
+        if not paginated and since is None:
+            media_type = negotiate_media_type(request.headers.get("accept"))
+
+        watermark = await cache.get_or_load("watermark", repository.fetch_catalog_watermark)
+        variant = f"{request.query_params}|{media_type}"
+        write_behind = get_write_behind_buffer()
+        if write_behind is not None and write_behind.unflushed:
+            # Queued edits change the response before they move the watermark
+            variant += f"|edits={write_behind.edits}"
+        etag = compute_etag(watermark, variant)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})
+        response.headers["ETag"] = etag
+
+        if since is not None:
+            return await _get_translation_delta(repository, since)
+
+        if paginated:
+            limit = limit or DEFAULT_PAGE_SIZE
+            return await cache.get_or_load(
+                ("page", limit, cursor, category, language, prefix, missing_only),
+                lambda: _get_translation_page(
+                    repository,
+                    limit,
+                    cursor,
+                    category,
+                    language,
+                    prefix,
+                    missing_only,
+                ),
+                # A crawl through every cursor only evicts other pages
+                region="pages",
+            )
+
+        if media_type == JSON_MEDIA_TYPE:
+            mapped = await load_shared_catalog(repository)
+            if mapped is not None:
+                # Sent straight from the page cache, a chunk at a time
+                return StreamingResponse(
+                    _iter_mapped_catalog_json(mapped),
+                    media_type=media_type,
+                    headers={
+                        "ETag": etag,
+                        "Vary": "Accept",
+                        "Content-Length": str(mapped.catalog_json_size),
+                    },
+                )
+
+        async def encode() -> bytes:
+            snapshot = await load_catalog_snapshot(repository)
+            # Encoding the whole catalog takes long enough to stall other requests
+            with timed("encode"):
+                return await asyncio.to_thread(encode_catalog, snapshot.entries, snapshot.languages, media_type)
+
+        return Response(
+            content=await cache.get_or_load(("encoded_catalog", media_type), encode),
+            media_type=media_type,
+            headers={"ETag": etag, "Vary": "Accept"},
         )
-        
-        if not keys_result.data:
-            return []
-            
-        # Get all translations
-        translations_result = (
-            supabase
-            .table("translations")
-            .select("*")
-            .execute()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching translations: {str(e)}"
         )
-        
-        # Get all languages
-        languages_result = (
-            supabase
-            .table("languages")
-            .select("*")
-            .eq("is_active", True)
-            .execute()
+
+async def _get_translation_delta(repository: CatalogRepository, since: datetime) -> dict:
+    """
+    Return the keys and translations updated after `since`.
+
+    Each changed key is returned with only its changed translations. The query
+    looks back `SINCE_OVERLAP_SECONDS` further than asked, so rows written by
+    transactions that committed after an earlier poll are not missed; clients
+    may therefore see an unchanged row twice.
+    """
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    query_since = since - timedelta(seconds=SINCE_OVERLAP_SECONDS)
+
+    changed_keys, changed_translations = await repository.fetch_changes_since(query_since)
+
+    keys_by_id = {key["id"]: key for key in changed_keys}
+    translations_by_key = group_translations_by_key(changed_translations)
+
+    # Keys whose translations changed but whose own row did not
+    unchanged_key_ids = [key_id for key_id in translations_by_key if key_id not in keys_by_id]
+    if unchanged_key_ids:
+        keys_by_id.update({key["id"]: key for key in await repository.fetch_keys_by_id(unchanged_key_ids)})
+
+    timestamps = [row["updated_at"] for row in changed_keys + changed_translations]
+    return {
+        "since": since.isoformat(),
+        "watermark": max(timestamps, key=_parse_timestamp) if timestamps else since.isoformat(),
+        "items": [
+            build_key_entry(key, translations_by_key.get(key_id), [])
+            for key_id, key in keys_by_id.items()
+        ],
+    }
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+async def _iter_catalog_ndjson(repository: CatalogRepository, languages: List[str]) -> AsyncIterator[str]:
+    """
+    Yield the catalog as NDJSON, one translation key per line.
+
+    The catalog is read in chunks of `STREAM_CHUNK_SIZE` keys, so only one
+    chunk is held in memory at a time.
+    """
+    async for entries in repository.iter_catalog_chunks(languages, STREAM_CHUNK_SIZE):
+        yield "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+
+@router.get("/stream")
+async def stream_translation_keys(repository: CatalogRepository = Depends(get_repository)):
+    """
+    Stream the whole catalog as NDJSON (`application/x-ndjson`).
+
+    Each line holds one translation key in the same shape as GET /localizations.
+    """
+    snapshot = get_catalog_cache().get_snapshot()
+    if snapshot is not None:
+        return StreamingResponse(
+            (json.dumps(entry, ensure_ascii=False) + "\n" for entry in snapshot.entries),
+            media_type="application/x-ndjson",
         )
-        
-        # Create a mapping of language codes to language names
-        languages = {lang["code"]: lang["name"] for lang in languages_result.data}
-        
-        # Group translations by key_id and language_code
-        translations_by_key = {}
-        for trans in translations_result.data:
-            key_id = trans["key_id"]
-            if key_id not in translations_by_key:
-                translations_by_key[key_id] = {}
-            translations_by_key[key_id][trans["language_code"]] = {
-                "value": trans["value"],
-                "updated_at": trans["updated_at"]
-            }
-        
-        # Build the response
-        result = []
-        for key in keys_result.data:
-            key_id = key["id"]
-            translations = translations_by_key.get(key_id, {})
-            
-            # Ensure all active languages are included, even if no translation exists
-            for lang_code in languages:
-                if lang_code not in translations:
-                    translations[lang_code] = {
-                        "value": "",
-                        "updated_at": None
-                    }
-            
-            result.append({
-                "id": key_id,
-                "key": key["key"],
-                "category": key["category"],
-                "description": key.get("description"),
-                "created_at": key["created_at"],
-                "updated_at": key["updated_at"],
-                "translations": {
-                    lang_code: {
-                        "value": trans["value"],
-                        "updated_at": trans["updated_at"]
-                    }
-                    for lang_code, trans in translations.items()
-                }
-            })
-        
-        return result
-        
+
+    try:
+        languages = list(await repository.fetch_active_languages())
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching translations: {str(e)}"
         )
 
+    return StreamingResponse(
+        _iter_catalog_ndjson(repository, languages),
+        media_type="application/x-ndjson",
+    )
+
+async def _load_runtime_table(repository: CatalogRepository, lang: str) -> RuntimeTable:
+    mapped = await load_shared_catalog(repository)
+    catalog = mapped or await load_catalog_snapshot(repository)
+    # The default locale alone does not make an unknown locale valid
+    if not fallback_chain(lang, catalog.languages, LOCALE_FALLBACKS):
+        raise HTTPException(status_code=404, detail=f"Invalid or inactive language code: {lang}")
+    chain = fallback_chain(lang, catalog.languages, LOCALE_FALLBACKS, settings.DEFAULT_LOCALE)
+
+    async def build() -> RuntimeTable:
+        if mapped is not None:
+            return RuntimeTable(lang, chain, *mapped.resolve(chain))
+        return build_runtime_table(catalog.entries, lang, chain)
+
+    # Keyed by the resolved chain, which only active languages make up, so
+    # made-up subtags of a language share its table instead of adding one each
+    return await get_catalog_cache().get_or_load(("runtime_table", tuple(chain)), build, region="runtime")
+
+@router.get("/runtime/{lang}")
+async def get_runtime_translations(
+    lang: str,
+    request: Request,
+    prefix: Optional[str] = None,
+    repository: CatalogRepository = Depends(get_runtime_repository)
+):
+    """
+    Resolve every key for one locale, for apps at runtime: a flat
+    `{"key": "value"}` object, limited to keys starting with `prefix` when it
+    is given.
+
+    Keys without a value in `lang` take it from the locale's fallback chain:
+    the LOCALE_FALLBACKS configured for it, its parent tag (`es-MX` -> `es`)
+    and finally DEFAULT_LOCALE. Keys with no value anywhere in the chain are
+    left out. `lang` does not need to be an active language itself when one
+    of its fallbacks other than the default is; the chain used is returned
+    in `X-Fallback-Chain`.
+
+    The resolved table of each locale is built once per catalog version, and
+    responses are compressed off the event loop and kept; prefix responses
+    are compressed faster and only the most recent ones are kept, by the keys
+    they select. They carry a strong ETag and Cache-Control
+    headers; with RUNTIME_PUBLIC they need no token and may be cached by CDNs.
+    """
+    try:
+        table = await _load_runtime_table(repository, lang)
+        # Kept on the table rather than in the catalog cache, so client-chosen
+        # prefixes cannot evict catalog data
+        artifact = await table.artifact(prefix)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error resolving translations: {str(e)}"
+        )
+
+    encoding = artifact.select_encoding(request.headers.get("accept-encoding"))
+    etag = artifact.encoding_etag(encoding)
+    if settings.RUNTIME_PUBLIC:
+        cache_control = (
+            f"public, max-age={settings.RUNTIME_CACHE_MAX_AGE}, "
+            f"s-maxage={settings.RUNTIME_CACHE_S_MAXAGE}, "
+            f"stale-while-revalidate={settings.RUNTIME_STALE_WHILE_REVALIDATE}"
+        )
+    else:
+        cache_control = f"private, max-age={settings.RUNTIME_CACHE_MAX_AGE}"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+        "Content-Language": lang,
+        "X-Fallback-Chain": ", ".join(table.chain),
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=artifact.encodings[encoding], media_type=artifact.media_type, headers=headers)
+
+@router.get("/changes")
+async def stream_translation_changes(
+    request: Request,
+    since: Optional[datetime] = None,
+    repository: CatalogRepository = Depends(get_repository)
+):
+    """
+    Follow translation changes as server-sent events (`text/event-stream`).
+
+    Each `changes` event carries `{"changes": [{key_id, language_code, value,
+    updated_at}, ...]}`; edits to the same translation within a short window
+    are merged into the latest one. A reconnecting client sends the id of the
+    last event it received as `Last-Event-ID` (or `last_event_id`) and first
+    gets what it missed. Pass `since` to also receive the changes made after
+    that timestamp when connecting. A `reset` event means the missed changes
+    cannot be replayed and the catalog should be reloaded.
+
+    Clients should ignore a change older than the `updated_at` they already
+    hold. Browsers need a fetch-based event source client, since the stream
+    is authenticated with the bearer token like every other endpoint.
+    """
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    return StreamingResponse(
+        iter_change_events(
+            get_change_feed(),
+            repository,
+            last_event_id,
+            since,
+            heartbeat_seconds=settings.CHANGE_FEED_HEARTBEAT_SECONDS,
+            max_replay_rows=settings.CHANGE_FEED_MAX_REPLAY_ROWS,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _search_translation_keys(
+    repository: CatalogRepository,
+    q: str,
+    mode: str,
+    language: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+) -> dict:
+    try:
+        offset = int(decode_cursor(cursor)) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    languages = await repository.fetch_active_languages()
+    if language and language not in languages:
+        raise HTTPException(status_code=400, detail=f"Invalid or inactive language code: {language}")
+
+    # Fetch one extra match to know whether another page exists
+    matches = await repository.search_keys(q, mode, language, limit + 1, offset)
+    has_more = len(matches) > limit
+    matches = matches[:limit]
+
+    translations_by_key = await repository.fetch_translations_for_keys(
+        [match["id"] for match in matches], language
+    )
+    page_languages = [language] if language else list(languages)
+
+    items = []
+    for match in matches:
+        entry = build_key_entry(match, translations_by_key.get(match["id"]), page_languages)
+        entry["matched_in"] = match["matched_in"]
+        entry["score"] = match["score"]
+        items.append(entry)
+
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(str(offset + limit)) if has_more else None,
+        "limit": limit,
+    }
+
+@router.get("/search")
+async def search_translation_keys(
+    q: str = Query(..., min_length=1, max_length=200),
+    mode: str = "substring",
+    language: Optional[str] = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    repository: CatalogRepository = Depends(get_repository)
+):
+    """
+    Search key names, descriptions and translation values.
+
+    `mode` is `substring` (the default) or `prefix`; matching is
+    case-insensitive. With `language`, only values in that language are
+    searched and returned. Results are ranked with key name matches first and
+    paginated like GET /localizations: `{"items": [...], "next_cursor": ...,
+    "limit": ...}`, where each item also carries `matched_in` and `score`.
+    Results are cached per query in a bounded cache region of their own, so
+    search traffic cannot evict the cached catalog.
+    """
+    if mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid search mode: {mode}. Use one of: {', '.join(SEARCH_MODES)}"
+        )
+    if mode == "substring" and len(q) < MIN_SUBSTRING_QUERY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Substring queries need at least {MIN_SUBSTRING_QUERY_LENGTH} characters; use mode=prefix for shorter ones"
+        )
+
+    try:
+        return await get_catalog_cache().get_or_load(
+            ("search", q, mode, language, limit, cursor),
+            lambda: _search_translation_keys(repository, q, mode, language, limit, cursor),
+            region="search",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching translations: {str(e)}"
+        )
+
+@router.get("/cache/stats")
+async def get_cache_stats(repository: CatalogRepository = Depends(get_repository)):
+    """
+    Report the size, version and hit/miss counters of the catalog cache.
+    """
+    return get_catalog_cache().stats()
+
 @router.patch("/bulk-update")
 async def bulk_update_translations(
     updates: List[Dict[str, str]],
-    supabase: Client = Depends(get_supabase)
+    response: Response,
+    chunk_size: Optional[int] = Query(None, ge=1, le=MAX_BULK_CHUNK_SIZE),
+    dry_run: bool = False,
+    repository: CatalogRepository = Depends(get_repository_strict),
+    user_id: Optional[str] = Depends(get_user_id),
 ):
     """
     Bulk update multiple translations in a single request.
@@ -111,6 +594,15 @@ async def bulk_update_translations(
         },
         ...
     ]
+
+    Rows are written in chunks of `chunk_size` (BULK_UPSERT_CHUNK_SIZE by
+    default), each chunk atomically in one upsert. Rows whose value is
+    already stored are not written and reported as `unchanged`. The response
+    lists the outcome of every row; if any chunk failed the status code is
+    207.
+
+    With `dry_run` nothing is written: the response counts the rows that
+    would be `new`, `changed` or `unchanged`.
     """
     if not updates:
         raise HTTPException(status_code=400, detail="No updates provided")
@@ -119,14 +611,7 @@ async def bulk_update_translations(
         # Validate all keys and languages first
         key_ids = {update["key_id"] for update in updates if "key_id" in update}
         if key_ids:
-            keys_result = (
-                supabase
-                .table("translation_keys")
-                .select("id")
-                .in_("id", list(key_ids))
-                .execute()
-            )
-            existing_keys = {key["id"] for key in keys_result.data}
+            existing_keys = await repository.fetch_existing_key_ids(list(key_ids))
             
             # Check for any invalid keys
             invalid_keys = key_ids - existing_keys
@@ -137,14 +622,7 @@ async def bulk_update_translations(
                 )
         
         # Get all active languages
-        languages_result = (
-            supabase
-            .table("languages")
-            .select("code")
-            .eq("is_active", True)
-            .execute()
-        )
-        active_languages = {lang["code"] for lang in languages_result.data}
+        active_languages = set(await repository.fetch_active_languages())
         
         # Prepare data for bulk upsert
         upsert_data = []
@@ -167,21 +645,41 @@ async def bulk_update_translations(
                 "value": update["value"]
             })
         
-        # Perform individual upserts
-        if upsert_data:
-            for update in upsert_data:
-                supabase.table("translations").upsert(
-                    {
-                        "key_id": update["key_id"],
-                        "language_code": update["language_code"],
-                        "value": update["value"]
-                    },
-                    on_conflict="key_id,language_code"
-                ).execute()
-        
+        results, written = await write_translation_updates(
+            repository,
+            upsert_data,
+            chunk_size or settings.BULK_UPSERT_CHUNK_SIZE,
+            settings.BULK_UPSERT_CONCURRENCY,
+            dry_run=dry_run,
+            updated_by=user_id,
+        )
+        if written:
+            get_catalog_cache().apply_translation_updates(written)
+            get_change_feed().publish(written)
+
+        if dry_run:
+            return {
+                "status": "dry_run",
+                "new": sum(1 for result in results if result["change"] == "new"),
+                "changed": sum(1 for result in results if result["change"] == "changed"),
+                "unchanged": sum(1 for result in results if result["change"] == "unchanged"),
+                "results": results,
+            }
+
+        failed = sum(1 for result in results if result["status"] == "failed")
+        updated = sum(1 for result in results if result["status"] == "updated")
+        unchanged = sum(1 for result in results if result["status"] == "unchanged")
+        if failed:
+            response.status_code = 207
         return {
-            "status": "success",
-            "message": f"Successfully updated {len(upsert_data)} translations"
+            "status": "partial" if failed else "success",
+            "message": f"Successfully updated {updated} translations"
+                + (f", {unchanged} unchanged" if unchanged else "")
+                + (f", {failed} failed" if failed else ""),
+            "updated": updated,
+            "unchanged": unchanged,
+            "failed": failed,
+            "results": results,
         }
         
     except HTTPException:
@@ -193,58 +691,233 @@ async def bulk_update_translations(
             detail=f"Error updating translations: {str(e)}"
         )
 
+async def load_key_index(repository: CatalogRepository) -> Dict[str, str]:
+    """Map every key name to its id, from the cached catalog when available."""
+    snapshot = get_catalog_cache().get_snapshot()
+    if snapshot is not None:
+        return {entry["key"]: entry["id"] for entry in snapshot.entries}
+    return await repository.fetch_key_index()
+
+async def _run_import(
+    repository: CatalogRepository,
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    language: Optional[str],
+    chunk_size: Optional[int],
+    on_progress: Optional[Callable[[ImportReport], Any]] = None,
+    dry_run: bool = False,
+    updated_by: Optional[str] = None,
+) -> ImportReport:
+    cache = get_catalog_cache()
+    languages, key_ids = await asyncio.gather(
+        cache.get_or_load("active_languages", repository.fetch_active_languages),
+        load_key_index(repository),
+    )
+    if language and language not in languages:
+        raise HTTPException(status_code=400, detail=f"Invalid or inactive language code: {language}")
+
+    return await import_translations(
+        repository,
+        chunks,
+        import_format,
+        set(languages),
+        key_ids,
+        language=language,
+        chunk_size=chunk_size or settings.BULK_UPSERT_CHUNK_SIZE,
+        concurrency=settings.BULK_UPSERT_CONCURRENCY,
+        on_progress=on_progress,
+        dry_run=dry_run,
+        updated_by=updated_by,
+    )
+
+@router.post("/import")
+async def import_translation_file(
+    request: Request,
+    response: Response,
+    format: Optional[str] = None,
+    language: Optional[str] = None,
+    chunk_size: Optional[int] = Query(None, ge=1, le=MAX_BULK_CHUNK_SIZE),
+    dry_run: bool = False,
+    repository: CatalogRepository = Depends(get_repository_strict),
+    user_id: Optional[str] = Depends(get_user_id),
+):
+    """
+    Import a translation file sent as the raw request body.
+
+    `format` is `csv`, `xliff` or `json`; when omitted it is taken from the
+    Content-Type. CSV files have a header row with either
+    `key,language_code,value` or `key,<lang>,<lang>,...` columns; JSON files
+    are a flat `{"key": "value"}` object for `language`; XLIFF 1.2 and 2.0
+    files use their target language unless `language` is given.
+
+    The body is parsed as it arrives and written in chunks, so files of any
+    size are imported in bounded memory. Rows are matched to keys by key name,
+    and only values that differ from the stored ones are written.
+    The response counts rows by outcome and lists errors with their row
+    number; the status code is 207 if any row was rejected or failed.
+    With `dry_run` nothing is written and the response counts the rows that
+    would be `new`, `changed` or `unchanged`.
+    """
+    import_format = format or detect_import_format(request.headers.get("content-type"))
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown import format: {import_format}. Use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    if import_format == "json" and not language:
+        raise HTTPException(status_code=400, detail="JSON imports need the 'language' parameter")
+
+    try:
+        report = await _run_import(
+            repository,
+            request.stream(),
+            import_format,
+            language,
+            chunk_size,
+            dry_run=dry_run,
+            updated_by=user_id,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error importing translations")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error importing translations: {str(e)}"
+        )
+
+    if report.has_errors:
+        response.status_code = 207
+    return report.to_dict()
+
+def validate_import_params(params: Dict[str, Any]) -> None:
+    """Check the parameters of an import, raising ValueError if they are invalid."""
+    if params.get("format") not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format: {params.get('format')}. Use one of: {', '.join(IMPORT_FORMATS)}")
+    if params["format"] == "json" and not params.get("language"):
+        raise ValueError("JSON imports need the 'language' parameter")
+    chunk_size = params.get("chunk_size")
+    if chunk_size is not None and not 1 <= chunk_size <= MAX_BULK_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_BULK_CHUNK_SIZE}")
+
+@register_job_handler("import", validate=validate_import_params)
+async def run_import_job(job: Job, repository: CatalogRepository) -> Dict[str, Any]:
+    """
+    Import the file uploaded with the job (`job.input`, a file object), as
+    POST /localizations/import does.
+    """
+    upload = job.input
+    bytes_read = 0
+
+    async def chunks() -> AsyncIterator[bytes]:
+        nonlocal bytes_read
+        while True:
+            chunk = await asyncio.to_thread(upload.read, IMPORT_READ_SIZE)
+            if not chunk:
+                return
+            bytes_read += len(chunk)
+            yield chunk
+
+    def on_progress(report: ImportReport) -> None:
+        job.set_progress(bytes_read=bytes_read, rows=report.rows, updated=report.updated)
+
+    report = await _run_import(
+        repository,
+        chunks(),
+        job.params["format"],
+        job.params.get("language"),
+        job.params.get("chunk_size"),
+        on_progress,
+        dry_run=bool(job.params.get("dry_run")),
+        updated_by=job.params.get("updated_by"),
+    )
+    job.set_progress(bytes_read=bytes_read, rows=report.rows, updated=report.updated)
+    return report.to_dict()
+
+@router.post("/flush")
+async def flush_translation_updates(repository: CatalogRepository = Depends(get_repository_strict)):
+    """
+    Write the edits held by this process's write-behind buffer now, rather
+    than at the next scheduled flush, and report what happened to them.
+
+    Each worker process has its own buffer, so with several workers this
+    only flushes the edits queued by the one serving the request; the others
+    still write theirs within WRITE_BEHIND_INTERVAL_MS.
+    """
+    write_behind = get_write_behind_buffer()
+    if write_behind is None:
+        raise HTTPException(status_code=404, detail="Write-behind buffering is not enabled")
+    try:
+        return await write_behind.flush()
+    except Exception as e:
+        logger.exception("Error flushing buffered translation updates")
+        raise HTTPException(status_code=500, detail=f"Error flushing translation updates: {str(e)}")
+
 @router.patch("/{key_id}")
 async def update_translation(
     key_id: str,
     lang: str,
     value: str,
-    supabase: Client = Depends(get_supabase)
+    response: Response,
+    repository: CatalogRepository = Depends(get_repository),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer),
+    user_id: Optional[str] = Depends(get_user_id),
 ):
     """
     Update a translation for a specific key and language
+
+    With WRITE_BEHIND_ENABLED the edit is validated against the cached
+    catalog where possible, queued and acknowledged with a 202; edits to the
+    same cell within the flush interval are merged and only the last one is
+    written, with the caller's token. Reads served by the same process show queued edits at once.
+    POST /localizations/flush writes this process's queued edits immediately.
     """
     try:
-        # Check if the key exists
-        key_result = (
-            supabase
-            .table("translation_keys")
-            .select("id")
-            .eq("id", key_id)
-            .execute()
+        write_behind = get_write_behind_buffer()
+        if write_behind is not None:
+            cache = get_catalog_cache()
+            snapshot = cache.get_snapshot()
+            if snapshot is None or key_id not in snapshot.by_id:
+                if not await repository.fetch_existing_key_ids([key_id]):
+                    raise HTTPException(status_code=404, detail="Translation key not found")
+            languages = await cache.get_or_load("active_languages", repository.fetch_active_languages)
+            if lang not in languages:
+                raise HTTPException(status_code=400, detail="Invalid or inactive language code")
+
+            write_behind.add(key_id, lang, value, credentials.credentials)
+            response.status_code = 202
+            return {"status": "accepted", "message": "Translation update queued", "pending": write_behind.pending}
+
+        # Check that the key exists and the language is active, concurrently
+        existing_keys, languages = await asyncio.gather(
+            repository.fetch_existing_key_ids([key_id]),
+            repository.fetch_active_languages(),
         )
         
-        if not key_result.data:
+        if not existing_keys:
             raise HTTPException(status_code=404, detail="Translation key not found")
         
-        # Check if the language exists and is active
-        lang_result = (
-            supabase
-            .table("languages")
-            .select("code")
-            .eq("code", lang)
-            .eq("is_active", True)
-            .execute()
-        )
-        
-        if not lang_result.data:
+        if lang not in languages:
             raise HTTPException(status_code=400, detail="Invalid or inactive language code")
         
-        # Update or insert the translation
-        update_result = (
-            supabase
-            .table("translations")
-            .upsert(
-                {
-                    "key_id": key_id,
-                    "language_code": lang,
-                    "value": value
-                },
-                on_conflict="key_id,language_code"
-            )
-            .execute()
+        # Update or insert the translation, unless it already has this value
+        results, written = await write_translation_updates(
+            repository,
+            [{"key_id": key_id, "language_code": lang, "value": value}],
+            chunk_size=1,
+            concurrency=1,
+            updated_by=user_id,
         )
+        if results[0]["status"] == "failed":
+            raise RuntimeError(results[0]["error"])
+        if results[0]["status"] == "unchanged":
+            return {"status": "success", "message": "Translation unchanged", "changed": False}
+        get_catalog_cache().apply_translation_updates(written)
+        get_change_feed().publish(written)
         
-        return {"status": "success", "message": "Translation updated successfully"}
+        return {"status": "success", "message": "Translation updated successfully", "changed": True}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error updating translation")
         raise HTTPException(status_code=500, detail=f"Error updating translation: {str(e)}")
\ No newline at end of file
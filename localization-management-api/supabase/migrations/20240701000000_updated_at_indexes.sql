@@ -0,0 +1,7 @@
+-- Indexes backing ETag computation and delta sync (`?since=`) on GET /localizations,
+-- which look up the newest rows and scan rows changed after a timestamp.
+create index if not exists translation_keys_updated_at_idx
+on public.translation_keys (updated_at);
+
+create index if not exists translations_updated_at_idx
+on public.translations (updated_at);
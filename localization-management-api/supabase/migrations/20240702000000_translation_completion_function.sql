@@ -0,0 +1,87 @@
+-- Translation completion counts in a single round trip.
+--
+-- Returns translated/total counts per active language, per category, and per
+-- language x category. With include_contributors, also returns the number of
+-- non-empty translations last updated by each user, per language.
+create or replace function public.translation_completion(include_contributors boolean default false)
+returns jsonb
+language sql
+stable
+as $$
+  with active_languages as (
+    select code
+    from public.languages
+    where is_active
+  ),
+  category_totals as (
+    select category, count(*) as total
+    from public.translation_keys
+    group by category
+  ),
+  translated as (
+    select t.language_code, k.category, count(*) as translated
+    from public.translations t
+    join public.translation_keys k on k.id = t.key_id
+    join active_languages l on l.code = t.language_code
+    where t.value <> ''
+    group by t.language_code, k.category
+  ),
+  grid as (
+    select
+      l.code as language_code,
+      c.category,
+      c.total,
+      coalesce(tr.translated, 0) as translated
+    from active_languages l
+    cross join category_totals c
+    left join translated tr
+      on tr.language_code = l.code
+     and tr.category = c.category
+  )
+  select jsonb_build_object(
+    'total_keys', (select coalesce(sum(total), 0) from category_totals),
+    'languages', coalesce((
+      select jsonb_object_agg(language_code, jsonb_build_object('translated', translated, 'total', total))
+      from (
+        select language_code, sum(translated) as translated, sum(total) as total
+        from grid
+        group by language_code
+      ) per_language
+    ), '{}'::jsonb),
+    'categories', coalesce((
+      select jsonb_object_agg(category, jsonb_build_object('translated', translated, 'total', total))
+      from (
+        select category, sum(translated) as translated, sum(total) as total
+        from grid
+        group by category
+      ) per_category
+    ), '{}'::jsonb),
+    'language_categories', coalesce((
+      select jsonb_object_agg(language_code, categories)
+      from (
+        select
+          language_code,
+          jsonb_object_agg(category, jsonb_build_object('translated', translated, 'total', total)) as categories
+        from grid
+        group by language_code
+      ) per_language_category
+    ), '{}'::jsonb),
+    'contributors', case when include_contributors then coalesce((
+      select jsonb_object_agg(updated_by, languages)
+      from (
+        select updated_by, jsonb_object_agg(language_code, contributions) as languages
+        from (
+          select t.updated_by, t.language_code, count(*) as contributions
+          from public.translations t
+          join active_languages l on l.code = t.language_code
+          where t.updated_by is not null
+            and t.value <> ''
+          group by t.updated_by, t.language_code
+        ) per_user_language
+        group by updated_by
+      ) per_user
+    ), '{}'::jsonb) end
+  );
+$$;
+
+grant execute on function public.translation_completion(boolean) to authenticated;
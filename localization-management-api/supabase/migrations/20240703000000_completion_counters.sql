@@ -0,0 +1,384 @@
+-- Incrementally maintained translation completion counters.
+--
+-- translation_completion_counters holds the number of non-empty translations
+-- per language and key category; category_key_counters holds the number of
+-- keys per category. Both are kept current by triggers on translations and
+-- translation_keys, so completion stats are read without scanning
+-- translations.
+
+create table public.translation_completion_counters (
+  language_code text not null references public.languages(code) on delete cascade,
+  category text not null,
+  translated bigint not null default 0,
+  primary key (language_code, category)
+);
+
+create table public.category_key_counters (
+  category text primary key,
+  total bigint not null default 0
+);
+
+alter table public.translation_completion_counters enable row level security;
+alter table public.category_key_counters enable row level security;
+
+create policy "Allow all authenticated users to view completion counters"
+on public.translation_completion_counters
+for select
+to authenticated
+using (true);
+
+create policy "Allow all authenticated users to view category counters"
+on public.category_key_counters
+for select
+to authenticated
+using (true);
+
+-- Counter maintenance
+
+create or replace function public.bump_completion_counter(p_language_code text, p_category text, p_delta bigint)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  insert into public.translation_completion_counters (language_code, category, translated)
+  values (p_language_code, p_category, p_delta)
+  on conflict (language_code, category)
+  do update set translated = translation_completion_counters.translated + excluded.translated;
+$$;
+
+create or replace function public.bump_category_counter(p_category text, p_delta bigint)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  insert into public.category_key_counters (category, total)
+  values (p_category, p_delta)
+  on conflict (category)
+  do update set total = category_key_counters.total + excluded.total;
+$$;
+
+-- Translations: statement-level triggers aggregate each statement's rows, so a
+-- batched upsert costs one counter update per (language, category) touched.
+
+create or replace function public.count_inserted_translations()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  perform public.bump_completion_counter(language_code, category, delta)
+  from (
+    select n.language_code, k.category, count(*) as delta
+    from new_rows n
+    join public.translation_keys k on k.id = n.key_id
+    where n.value <> ''
+    group by n.language_code, k.category
+  ) changes;
+  return null;
+end;
+$$;
+
+create or replace function public.count_updated_translations()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  perform public.bump_completion_counter(language_code, category, delta)
+  from (
+    select language_code, category, sum(delta) as delta
+    from (
+      select n.language_code, k.category, 1 as delta
+      from new_rows n
+      join public.translation_keys k on k.id = n.key_id
+      where n.value <> ''
+      union all
+      select o.language_code, k.category, -1 as delta
+      from old_rows o
+      join public.translation_keys k on k.id = o.key_id
+      where o.value <> ''
+    ) deltas
+    group by language_code, category
+    having sum(delta) <> 0
+  ) changes;
+  return null;
+end;
+$$;
+
+-- Translations removed by a cascading key delete find no key here; their
+-- counts are removed by the translation_keys delete trigger instead.
+create or replace function public.count_deleted_translations()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  perform public.bump_completion_counter(language_code, category, -delta)
+  from (
+    select o.language_code, k.category, count(*) as delta
+    from old_rows o
+    join public.translation_keys k on k.id = o.key_id
+    where o.value <> ''
+    group by o.language_code, k.category
+  ) changes;
+  return null;
+end;
+$$;
+
+create trigger count_translations_insert
+after insert on public.translations
+referencing new table as new_rows
+for each statement execute function public.count_inserted_translations();
+
+create trigger count_translations_update
+after update on public.translations
+referencing old table as old_rows new table as new_rows
+for each statement execute function public.count_updated_translations();
+
+create trigger count_translations_delete
+after delete on public.translations
+referencing old table as old_rows
+for each statement execute function public.count_deleted_translations();
+
+-- Translation keys
+
+create or replace function public.count_inserted_keys()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  perform public.bump_category_counter(category, delta)
+  from (
+    select category, count(*) as delta
+    from new_rows
+    group by category
+  ) changes;
+  return null;
+end;
+$$;
+
+create or replace function public.count_changed_key()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    perform public.bump_category_counter(old.category, -1);
+    perform public.bump_completion_counter(t.language_code, old.category, -count(*))
+    from public.translations t
+    where t.key_id = old.id
+      and t.value <> ''
+    group by t.language_code;
+  end if;
+
+  if tg_op = 'UPDATE' then
+    perform public.bump_category_counter(new.category, 1);
+    perform public.bump_completion_counter(t.language_code, new.category, count(*))
+    from public.translations t
+    where t.key_id = new.id
+      and t.value <> ''
+    group by t.language_code;
+    return new;
+  end if;
+
+  return old;
+end;
+$$;
+
+create trigger count_translation_keys_insert
+after insert on public.translation_keys
+referencing new table as new_rows
+for each statement execute function public.count_inserted_keys();
+
+-- Runs before the delete so the key's translations are still there to count
+create trigger count_translation_keys_delete
+before delete on public.translation_keys
+for each row execute function public.count_changed_key();
+
+create trigger count_translation_keys_category_update
+after update of category on public.translation_keys
+for each row
+when (old.category is distinct from new.category)
+execute function public.count_changed_key();
+
+-- Full recount, drift report and reconciliation
+
+create or replace function public.completion_counter_drift()
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  with recount as (
+    select t.language_code, k.category, count(*) as translated
+    from public.translations t
+    join public.translation_keys k on k.id = t.key_id
+    where t.value <> ''
+    group by t.language_code, k.category
+  ),
+  key_recount as (
+    select category, count(*) as total
+    from public.translation_keys
+    group by category
+  ),
+  translated_drift as (
+    select
+      coalesce(c.language_code, r.language_code) as language_code,
+      coalesce(c.category, r.category) as category,
+      coalesce(c.translated, 0) as counter,
+      coalesce(r.translated, 0) as actual
+    from public.translation_completion_counters c
+    full join recount r
+      on r.language_code = c.language_code
+     and r.category = c.category
+    where coalesce(c.translated, 0) <> coalesce(r.translated, 0)
+  ),
+  category_drift as (
+    select
+      coalesce(c.category, r.category) as category,
+      coalesce(c.total, 0) as counter,
+      coalesce(r.total, 0) as actual
+    from public.category_key_counters c
+    full join key_recount r on r.category = c.category
+    where coalesce(c.total, 0) <> coalesce(r.total, 0)
+  )
+  select jsonb_build_object(
+    'translations', coalesce((select jsonb_agg(to_jsonb(d)) from translated_drift d), '[]'::jsonb),
+    'categories', coalesce((select jsonb_agg(to_jsonb(d)) from category_drift d), '[]'::jsonb)
+  );
+$$;
+
+create or replace function public.reconcile_completion_counters()
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  drift jsonb;
+begin
+  lock table public.translation_completion_counters, public.category_key_counters in exclusive mode;
+  drift := public.completion_counter_drift();
+
+  delete from public.translation_completion_counters;
+  insert into public.translation_completion_counters (language_code, category, translated)
+  select t.language_code, k.category, count(*)
+  from public.translations t
+  join public.translation_keys k on k.id = t.key_id
+  where t.value <> ''
+  group by t.language_code, k.category;
+
+  delete from public.category_key_counters;
+  insert into public.category_key_counters (category, total)
+  select category, count(*)
+  from public.translation_keys
+  group by category;
+
+  return drift;
+end;
+$$;
+
+-- Functions in public are exposed at /rpc and executable by every role by
+-- default. The counter helpers and trigger functions are only meant to run
+-- from the triggers, and the drift check and reconcile scan (and lock) the
+-- whole catalog, so only the service role may call them; the API gates them
+-- behind its strict authentication.
+revoke execute on function public.bump_completion_counter(text, text, bigint) from public, anon, authenticated;
+revoke execute on function public.bump_category_counter(text, bigint) from public, anon, authenticated;
+revoke execute on function public.count_inserted_translations() from public, anon, authenticated;
+revoke execute on function public.count_updated_translations() from public, anon, authenticated;
+revoke execute on function public.count_deleted_translations() from public, anon, authenticated;
+revoke execute on function public.count_inserted_keys() from public, anon, authenticated;
+revoke execute on function public.count_changed_key() from public, anon, authenticated;
+revoke execute on function public.completion_counter_drift() from public, anon, authenticated;
+revoke execute on function public.reconcile_completion_counters() from public, anon, authenticated;
+grant execute on function public.completion_counter_drift() to service_role;
+grant execute on function public.reconcile_completion_counters() to service_role;
+
+-- Completion stats now read the counters; only contributor counts still scan
+-- translations, and only when requested.
+create or replace function public.translation_completion(include_contributors boolean default false)
+returns jsonb
+language sql
+stable
+as $$
+  with active_languages as (
+    select code
+    from public.languages
+    where is_active
+  ),
+  category_totals as (
+    select category, total
+    from public.category_key_counters
+    where total > 0
+  ),
+  grid as (
+    select
+      l.code as language_code,
+      c.category,
+      c.total,
+      coalesce(tc.translated, 0) as translated
+    from active_languages l
+    cross join category_totals c
+    left join public.translation_completion_counters tc
+      on tc.language_code = l.code
+     and tc.category = c.category
+  )
+  select jsonb_build_object(
+    'total_keys', (select coalesce(sum(total), 0) from category_totals),
+    'languages', coalesce((
+      select jsonb_object_agg(language_code, jsonb_build_object('translated', translated, 'total', total))
+      from (
+        select language_code, sum(translated) as translated, sum(total) as total
+        from grid
+        group by language_code
+      ) per_language
+    ), '{}'::jsonb),
+    'categories', coalesce((
+      select jsonb_object_agg(category, jsonb_build_object('translated', translated, 'total', total))
+      from (
+        select category, sum(translated) as translated, sum(total) as total
+        from grid
+        group by category
+      ) per_category
+    ), '{}'::jsonb),
+    'language_categories', coalesce((
+      select jsonb_object_agg(language_code, categories)
+      from (
+        select
+          language_code,
+          jsonb_object_agg(category, jsonb_build_object('translated', translated, 'total', total)) as categories
+        from grid
+        group by language_code
+      ) per_language_category
+    ), '{}'::jsonb),
+    'contributors', case when include_contributors then coalesce((
+      select jsonb_object_agg(updated_by, languages)
+      from (
+        select updated_by, jsonb_object_agg(language_code, contributions) as languages
+        from (
+          select t.updated_by, t.language_code, count(*) as contributions
+          from public.translations t
+          join active_languages l on l.code = t.language_code
+          where t.updated_by is not null
+            and t.value <> ''
+          group by t.updated_by, t.language_code
+        ) per_user_language
+        group by updated_by
+      ) per_user
+    ), '{}'::jsonb) end
+  );
+$$;
+
+-- Backfill from the current data
+select public.reconcile_completion_counters();
@@ -0,0 +1,112 @@
+-- Indexed search over key names, descriptions and translation values, backing
+-- GET /localizations/search.
+--
+-- Matching is case-insensitive on lower(...). Trigram GIN indexes serve both
+-- substring and prefix patterns; the text_pattern_ops index additionally lets
+-- short key prefixes (fewer than three characters) use an index scan.
+create extension if not exists pg_trgm with schema extensions;
+
+create index if not exists translation_keys_key_trgm_idx
+on public.translation_keys using gin (lower(key) extensions.gin_trgm_ops);
+
+create index if not exists translation_keys_key_prefix_idx
+on public.translation_keys (lower(key) text_pattern_ops);
+
+create index if not exists translation_keys_description_trgm_idx
+on public.translation_keys using gin (lower(description) extensions.gin_trgm_ops);
+
+create index if not exists translations_value_trgm_idx
+on public.translations using gin (lower(value) extensions.gin_trgm_ops);
+
+-- Ranked search. Each key is scored by its best match: key names weigh more
+-- than descriptions, which weigh more than translation values; matches at the
+-- start of the field get a bonus, and trigram similarity breaks the remaining
+-- ties. With search_language set, only values in that language are searched.
+create or replace function public.search_translation_keys(
+  search_query text,
+  match_mode text default 'substring',
+  search_language text default null,
+  result_limit integer default 20,
+  result_offset integer default 0
+)
+returns table (
+  id uuid,
+  key text,
+  category text,
+  description text,
+  created_at timestamptz,
+  updated_at timestamptz,
+  matched_in text,
+  score real
+)
+language sql
+stable
+set search_path = public, extensions
+as $$
+  with params as (
+    select
+      lower(search_query) as term,
+      replace(replace(replace(lower(search_query), '\', '\\'), '%', '\%'), '_', '\_') as escaped
+  ),
+  patterns as (
+    select
+      term,
+      escaped || '%' as prefix_pattern,
+      case when match_mode = 'prefix' then escaped || '%' else '%' || escaped || '%' end as pattern
+    from params
+  ),
+  matches as (
+    select
+      k.id as key_id,
+      'key' as matched_in,
+      3.0
+        + case when lower(k.key) like p.prefix_pattern then 1.0 else 0.0 end
+        + similarity(lower(k.key), p.term) as score
+    from public.translation_keys k, patterns p
+    where lower(k.key) like p.pattern
+
+    union all
+
+    select
+      k.id,
+      'description',
+      2.0
+        + case when lower(k.description) like p.prefix_pattern then 1.0 else 0.0 end
+        + similarity(lower(k.description), p.term)
+    from public.translation_keys k, patterns p
+    where lower(k.description) like p.pattern
+
+    union all
+
+    select
+      t.key_id,
+      'translation:' || t.language_code,
+      1.0
+        + case when lower(t.value) like p.prefix_pattern then 1.0 else 0.0 end
+        + similarity(lower(t.value), p.term)
+    from public.translations t, patterns p
+    where lower(t.value) like p.pattern
+      and (search_language is null or t.language_code = search_language)
+  ),
+  best as (
+    select distinct on (key_id) key_id, matched_in, score
+    from matches
+    order by key_id, score desc
+  )
+  select
+    k.id,
+    k.key,
+    k.category,
+    k.description,
+    k.created_at,
+    k.updated_at,
+    b.matched_in,
+    b.score::real
+  from best b
+  join public.translation_keys k on k.id = b.key_id
+  order by b.score desc, k.key
+  limit result_limit
+  offset result_offset;
+$$;
+
+grant execute on function public.search_translation_keys(text, text, text, integer, integer) to authenticated;
@@ -0,0 +1,29 @@
+-- Background job records written by the API's in-process job runner.
+--
+-- Rows are created and updated with the service role; authenticated users
+-- can read them to follow progress.
+create table public.jobs (
+  id uuid primary key,
+  kind text not null,
+  status text not null default 'queued',
+  params jsonb not null default '{}'::jsonb,
+  progress jsonb not null default '{}'::jsonb,
+  result jsonb,
+  error text,
+  created_at timestamptz not null default now(),
+  started_at timestamptz,
+  finished_at timestamptz,
+  constraint jobs_status_check
+    check (status in ('queued', 'running', 'succeeded', 'failed', 'cancelled'))
+);
+
+create index jobs_status_created_at_idx
+on public.jobs (status, created_at);
+
+alter table public.jobs enable row level security;
+
+create policy "Allow all authenticated users to view jobs"
+on public.jobs
+for select
+to authenticated
+using (true);
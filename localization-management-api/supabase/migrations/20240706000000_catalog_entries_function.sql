@@ -0,0 +1,79 @@
+-- Assemble the full catalog in the database, backing GET /localizations.
+--
+-- Returns {"languages": [...], "entries": [...]} in one round trip, with the
+-- entries in the API shape: one object per key, ordered by id, whose
+-- `translations` map every stored language and every active language (empty
+-- value, null updated_at when there is no row) to {value, updated_at}.
+-- Languages and entries come from the same statement, so they are consistent.
+--
+-- json rather than jsonb keeps the field order and skips the binary
+-- conversion. The function runs as the caller, so row level security applies.
+create or replace function public.catalog_entries()
+returns json
+language sql
+stable
+as $$
+  with active_languages as (
+    select code
+    from public.languages
+    where is_active
+  ),
+  cells as (
+    select t.key_id, t.language_code, t.value, t.updated_at
+    from public.translations t
+
+    union all
+
+    -- Active languages a key has no translation for
+    select k.id, l.code, '', null::timestamptz
+    from public.translation_keys k
+    cross join active_languages l
+    where not exists (
+      select 1
+      from public.translations t
+      where t.key_id = k.id
+        and t.language_code = l.code
+    )
+  ),
+  key_translations as (
+    select
+      key_id,
+      json_object_agg(
+        language_code,
+        json_build_object('value', value, 'updated_at', updated_at)
+        order by language_code
+      ) as translations
+    from cells
+    group by key_id
+  )
+  select json_build_object(
+    'languages', coalesce((
+      select json_agg(code order by code)
+      from active_languages
+    ), '[]'::json),
+    'entries', coalesce((
+      select json_agg(
+        json_build_object(
+          'id', k.id,
+          'key', k.key,
+          'category', k.category,
+          'description', k.description,
+          'created_at', k.created_at,
+          'updated_at', k.updated_at,
+          'translations', coalesce(kt.translations, '{}'::json)
+        )
+        order by k.id
+      )
+      from public.translation_keys k
+      left join key_translations kt on kt.key_id = k.id
+    ), '[]'::json)
+  );
+$$;
+
+grant execute on function public.catalog_entries() to authenticated;
+
+-- translations(key_id) lookups are served by the (key_id, language_code)
+-- unique constraint's index, and updated_at by translations_updated_at_idx.
+-- Per-language reads and the cascade from languages need their own index.
+create index if not exists translations_language_code_idx
+on public.translations (language_code);
@@ -0,0 +1,45 @@
+-- Notify listeners of changed translations, backing the `postgres` source of
+-- the GET /localizations/changes feed.
+--
+-- Statement-level triggers send the key_id, language_code and updated_at of
+-- the written rows on the `translation_changes` channel, 50 rows per
+-- notification to stay well below the 8000 byte payload limit. Values are
+-- not sent, since a single one could exceed it; listeners read them back.
+-- Notifications are delivered when the transaction commits.
+create or replace function public.notify_translation_changes()
+returns trigger
+language plpgsql
+as $$
+declare
+  batch text;
+begin
+  for batch in
+    select json_agg(
+      json_build_object(
+        'key_id', key_id,
+        'language_code', language_code,
+        'updated_at', updated_at
+      )
+    )::text
+    from (
+      select key_id, language_code, updated_at,
+             (row_number() over () - 1) / 50 as batch_number
+      from new_rows
+    ) numbered
+    group by batch_number
+  loop
+    perform pg_notify('translation_changes', batch);
+  end loop;
+  return null;
+end;
+$$;
+
+create trigger notify_translations_insert
+after insert on public.translations
+referencing new table as new_rows
+for each statement execute function public.notify_translation_changes();
+
+create trigger notify_translations_update
+after update on public.translations
+referencing new table as new_rows
+for each statement execute function public.notify_translation_changes();
@@ -0,0 +1,31 @@
+-- Summarise the catalog for ETags and cache freshness checks.
+--
+-- Returns the active languages and, for translation_keys and translations,
+-- the newest updated_at and a row count. The newest updated_at comes from the
+-- updated_at indexes; the counts are read from the completion counters rather
+-- than counted, so the cost does not grow with the catalog. They still move
+-- when keys or non-empty translations are deleted, which updated_at alone
+-- does not reveal.
+--
+-- The function runs as the caller, so row level security applies.
+create or replace function public.catalog_watermark()
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'languages', coalesce((
+      select json_agg(code order by code)
+      from public.languages
+      where is_active
+    ), '[]'::json),
+    'translation_keys', json_build_object(
+      'updated_at', (select max(updated_at) from public.translation_keys),
+      'count', (select coalesce(sum(total), 0) from public.category_key_counters)
+    ),
+    'translations', json_build_object(
+      'updated_at', (select max(updated_at) from public.translations),
+      'count', (select coalesce(sum(translated), 0) from public.translation_completion_counters)
+    )
+  );
+$$;
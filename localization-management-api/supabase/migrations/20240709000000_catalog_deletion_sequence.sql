@@ -0,0 +1,65 @@
+-- Count deletions from the catalog for catalog_watermark().
+--
+-- The watermark's row counts come from the completion counters, which only
+-- count non-empty translations, so deleting an empty translation changed
+-- neither its newest updated_at nor its counts. catalog_deletions holds a
+-- sequence bumped once per statement that deletes translations or keys, and
+-- the watermark includes it.
+
+create table public.catalog_deletions (
+  id boolean primary key default true check (id),
+  sequence bigint not null default 0
+);
+
+insert into public.catalog_deletions default values;
+
+alter table public.catalog_deletions enable row level security;
+
+create policy "Allow all authenticated users to view catalog deletions"
+on public.catalog_deletions
+for select
+to authenticated
+using (true);
+
+create or replace function public.bump_catalog_deletions()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  update public.catalog_deletions set sequence = sequence + 1;
+  return null;
+end;
+$$;
+
+create trigger bump_catalog_deletions_translations
+after delete or truncate on public.translations
+for each statement execute function public.bump_catalog_deletions();
+
+create trigger bump_catalog_deletions_keys
+after delete or truncate on public.translation_keys
+for each statement execute function public.bump_catalog_deletions();
+
+create or replace function public.catalog_watermark()
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'languages', coalesce((
+      select json_agg(code order by code)
+      from public.languages
+      where is_active
+    ), '[]'::json),
+    'translation_keys', json_build_object(
+      'updated_at', (select max(updated_at) from public.translation_keys),
+      'count', (select coalesce(sum(total), 0) from public.category_key_counters)
+    ),
+    'translations', json_build_object(
+      'updated_at', (select max(updated_at) from public.translations),
+      'count', (select coalesce(sum(translated), 0) from public.translation_completion_counters)
+    ),
+    'deletions', (select sequence from public.catalog_deletions)
+  );
+$$;
@@ -25,13 +25,17 @@ def supabase_client():
 def client(supabase_client):
     """Create a FastAPI test client with overridden dependencies."""
     from src.localization_management_api.main import app
-    from src.localization_management_api.deps import get_supabase
+    from src.localization_management_api.deps import get_supabase, get_supabase_strict
+    from src.localization_management_api.core.supabase_client import get_postgrest_client
 
-    # Override the get_supabase dependency
-    def get_supabase_override():
-        return supabase_client
+    # Override the get_supabase dependencies with a client using the service
+    # role key. The app uses the async client, so it is created inside the
+    # app's event loop.
+    async def get_supabase_override():
+        return get_postgrest_client(os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
 
     app.dependency_overrides[get_supabase] = get_supabase_override
+    app.dependency_overrides[get_supabase_strict] = get_supabase_override
 
     with TestClient(app) as test_client:
         yield test_client
@@ -0,0 +1,31 @@
+from fastapi import status
+
+def test_get_translation_completion(client):
+    """Test getting completion percentages per language."""
+    response = client.get("/analytics/translation-completion")
+    assert response.status_code == status.HTTP_200_OK
+
+    for percentage in response.json().values():
+        assert 0 <= percentage <= 100
+
+def test_get_translation_completion_breakdown(client):
+    """Test the per-category and per-language x category breakdowns."""
+    response = client.get(
+        "/analytics/translation-completion/breakdown",
+        params={"include_contributors": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    breakdown = response.json()
+    assert {"total_keys", "languages", "categories", "language_categories", "contributors"} <= breakdown.keys()
+    for lang_code, categories in breakdown["language_categories"].items():
+        translated = sum(stats["translated"] for stats in categories.values())
+        assert translated == breakdown["languages"][lang_code]["translated"]
+
+def test_translation_completion_consistency(client):
+    """Test that the completion counters agree with a full recount."""
+    response = client.get("/analytics/translation-completion/consistency")
+    assert response.status_code == status.HTTP_200_OK
+
+    report = response.json()
+    assert report["consistent"], report["drift"]
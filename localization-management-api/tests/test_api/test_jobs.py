@@ -0,0 +1,43 @@
+import time
+from fastapi import status
+
+def _wait_for_job(client, job_id, timeout=30):
+    """Poll a job until it finishes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f"Job {job_id} did not finish in {timeout}s")
+
+def test_export_job(client):
+    """Test exporting every language as a background job."""
+    response = client.post("/jobs", json={"kind": "export", "params": {"format": "json"}})
+    assert response.status_code == status.HTTP_202_ACCEPTED
+
+    job = _wait_for_job(client, response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["filename"] == "translations-json.zip"
+
+    result = client.get(f"/jobs/{job['id']}/result")
+    assert result.status_code == status.HTTP_200_OK
+    assert result.headers["content-type"] == "application/zip"
+
+def test_translation_completion_job(client):
+    """Test recomputing the completion breakdown as a background job."""
+    response = client.post("/jobs", json={"kind": "translation-completion"})
+    job = _wait_for_job(client, response.json()["id"])
+
+    assert job["status"] == "succeeded"
+    assert "languages" in job["result"]["breakdown"]
+
+def test_unknown_job_kind(client):
+    """Test that unknown job kinds are rejected."""
+    response = client.post("/jobs", json={"kind": "does-not-exist"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_unknown_job(client):
+    """Test that an unknown job id returns 404."""
+    response = client.get("/jobs/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
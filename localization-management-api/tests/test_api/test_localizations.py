@@ -1,4 +1,5 @@
 import pytest
+import json
 from fastapi import status
 import uuid
 
@@ -54,7 +55,7 @@ def test_update_nonexistent_key(client):
         f"/localizations/{uuid.uuid4()}",
         params={"lang": "en", "value": "test"}
     )
-    assert response.status_code in (status.HTTP_404_NOT_FOUND, status.HTTP_500_INTERNAL_SERVER_ERROR)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
 
 def test_update_invalid_language(client, supabase_client):
     """Test updating a translation with an invalid language."""
@@ -74,7 +75,7 @@ def test_update_invalid_language(client, supabase_client):
         f"/localizations/{key_id}",
         params={"lang": "xx", "value": "test"}
     )
-    assert response.status_code in (status.HTTP_400_BAD_REQUEST, status.HTTP_500_INTERNAL_SERVER_ERROR)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_update_missing_parameters(client, supabase_client):
     """Test updating a translation with missing parameters."""
@@ -147,6 +148,7 @@ def test_bulk_update_translations(client, supabase_client):
             print(f"Request body: {updates}")
             
         assert response.status_code == status.HTTP_200_OK
+        assert [result["status"] for result in response.json()["results"]] == ["updated", "updated"]
         
     finally:
         # Restore original values
@@ -157,6 +159,46 @@ def test_bulk_update_translations(client, supabase_client):
         )
         assert restore_response.status_code == status.HTTP_200_OK
 
+def test_bulk_update_dry_run_reports_unchanged(client, supabase_client):
+    """Test that a dry run reports stored values as unchanged without writing."""
+    translations = supabase_client.table("translations")\
+        .select("*")\
+        .limit(1)\
+        .execute()
+
+    if not translations.data:
+        pytest.skip("No translations found in the test database")
+
+    translation = translations.data[0]
+    response = client.patch(
+        "/localizations/bulk-update",
+        params={"dry_run": "true"},
+        json=[
+            {
+                "key_id": str(translation['key_id']),
+                "language_code": translation['language_code'],
+                "value": translation['value']
+            },
+            {
+                "key_id": str(translation['key_id']),
+                "language_code": translation['language_code'],
+                "value": f"Updated {translation['value']}"
+            },
+        ],
+        headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["status"] == "dry_run"
+    assert [result["status"] for result in data["results"]] == ["superseded", "changed"]
+
+    stored = supabase_client.table("translations")\
+        .select("value, updated_at")\
+        .eq("id", translation['id'])\
+        .execute()
+    assert stored.data[0]["updated_at"] == translation["updated_at"]
+
 def test_bulk_update_invalid_key(client, supabase_client):
     """Test bulk update with an invalid key."""
     # Get an existing translation to get a valid language code
@@ -251,4 +293,102 @@ def test_bulk_update_empty_request(client):
         json=[],
         headers={"Content-Type": "application/json"}
     )
-    assert response.status_code == status.HTTP_400_BAD_REQUEST
\ No newline at end of file
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_translation_keys_paginated(client):
+    """Test paging through translation keys with a cursor."""
+    response = client.get("/localizations", params={"limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+
+    page = response.json()
+    assert len(page["items"]) <= 2
+    if page["next_cursor"] is None:
+        return
+
+    next_response = client.get(
+        "/localizations",
+        params={"limit": 2, "cursor": page["next_cursor"]}
+    )
+    assert next_response.status_code == status.HTTP_200_OK
+
+    first_ids = {item["id"] for item in page["items"]}
+    next_ids = {item["id"] for item in next_response.json()["items"]}
+    assert not first_ids & next_ids
+
+def test_get_translation_keys_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/localizations", params={"cursor": "not a cursor!"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_stream_translation_keys(client):
+    """Test streaming the catalog as NDJSON."""
+    response = client.get("/localizations/stream")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    for line in response.text.splitlines():
+        entry = json.loads(line)
+        assert {"id", "key", "translations"} <= entry.keys()
+
+def test_get_translation_keys_not_modified(client):
+    """Test that a matching If-None-Match returns 304."""
+    response = client.get("/localizations")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+
+    cached_response = client.get("/localizations", headers={"If-None-Match": etag})
+    assert cached_response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached_response.content == b""
+
+def test_get_translation_keys_since(client):
+    """Test delta sync returns a watermark for the next poll."""
+    response = client.get("/localizations", params={"since": "2100-01-01T00:00:00Z"})
+    assert response.status_code == status.HTTP_200_OK
+
+    delta = response.json()
+    assert delta["items"] == []
+    assert delta["watermark"] == delta["since"]
+
+def test_search_translation_keys(client, supabase_client):
+    """Test that searching by key prefix finds the key."""
+    key = supabase_client.table("translation_keys").select("key").limit(1).execute().data[0]["key"]
+
+    response = client.get("/localizations/search", params={"q": key[:2], "mode": "prefix"})
+    assert response.status_code == status.HTTP_200_OK
+
+    results = response.json()
+    assert results["items"]
+    assert all({"matched_in", "score", "translations"} <= item.keys() for item in results["items"])
+
+def test_search_rejects_short_substring(client):
+    """Test that substring queries too short for the index are rejected."""
+    response = client.get("/localizations/search", params={"q": "ab"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_import_reports_unknown_keys(client):
+    """Test that importing a file with unknown keys reports them per row."""
+    response = client.post(
+        "/localizations/import",
+        params={"format": "json", "language": "en"},
+        content=json.dumps({f"nonexistent.key.{uuid.uuid4()}": "Value"}),
+    )
+    assert response.status_code == 207
+
+    report = response.json()
+    assert report["invalid"] == 1
+    assert report["updated"] == 0
+    assert report["errors"][0]["row"] == 1
+
+def test_get_translation_keys_columnar(client):
+    """Test the columnar representation of the full catalog."""
+    response = client.get(
+        "/localizations",
+        headers={"Accept": "application/vnd.localization.catalog+json"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/vnd.localization.catalog+json"
+
+    catalog = response.json()
+    count = len(catalog["keys"]["id"])
+    assert all(len(values) == count for values in catalog["values"].values())
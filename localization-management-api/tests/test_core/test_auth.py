@@ -0,0 +1,117 @@
+import asyncio
+import base64
+import json
+import time
+import jwt
+import pytest
+from src.localization_management_api.core.auth import (
+    LocalVerificationUnavailable,
+    TokenVerifier,
+    UnknownSigningKey,
+    token_subject,
+)
+
+SECRET = "super-secret-jwt-token-with-at-least-32-characters-long"
+
+def mint_token(secret=SECRET, expires_in=3600, **claims):
+    """Mint a Supabase-style access token."""
+    payload = {
+        "sub": "00000000-0000-0000-0000-000000000001",
+        "aud": "authenticated",
+        "role": "authenticated",
+        "exp": int(time.time()) + expires_in,
+        **claims,
+    }
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+def test_verify_valid_token():
+    """Test that a token signed with the project secret is accepted."""
+    verifier = TokenVerifier(jwt_secret=SECRET)
+    claims = verifier.verify(mint_token())
+    assert claims["sub"] == "00000000-0000-0000-0000-000000000001"
+
+def test_reject_wrong_signature():
+    """Test that a token signed with another secret is rejected."""
+    verifier = TokenVerifier(jwt_secret=SECRET)
+    with pytest.raises(jwt.InvalidSignatureError):
+        verifier.verify(mint_token(secret="another-secret-that-is-also-32-characters-long"))
+
+def test_reject_expired_token():
+    """Test that an expired token is rejected."""
+    verifier = TokenVerifier(jwt_secret=SECRET)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verifier.verify(mint_token(expires_in=-10))
+
+def test_reject_wrong_audience():
+    """Test that tokens for another audience are rejected."""
+    verifier = TokenVerifier(jwt_secret=SECRET)
+    with pytest.raises(jwt.InvalidAudienceError):
+        verifier.verify(mint_token(aud="anon"))
+
+def test_missing_secret_requires_remote_check():
+    """Test that HS256 tokens cannot be verified locally without the secret."""
+    verifier = TokenVerifier()
+    with pytest.raises(LocalVerificationUnavailable):
+        verifier.verify(mint_token())
+
+def test_validated_tokens_are_cached_until_exp(monkeypatch):
+    """Test that a validated token skips decoding until it expires."""
+    verifier = TokenVerifier(jwt_secret=SECRET)
+    token = mint_token(expires_in=60)
+    verifier.verify(token)
+
+    def fail(token):
+        raise AssertionError("token should have been served from the cache")
+
+    monkeypatch.setattr(verifier, "_decode", fail)
+    assert verifier.verify(token)["aud"] == "authenticated"
+
+    monkeypatch.setattr(time, "time", lambda: jwt.decode(token, options={"verify_signature": False})["exp"] + 1)
+    with pytest.raises(AssertionError):
+        verifier.verify(token)
+
+def test_token_cache_is_bounded():
+    """Test that the least recently used tokens are evicted."""
+    verifier = TokenVerifier(jwt_secret=SECRET, max_entries=2)
+    for user in range(3):
+        verifier.verify(mint_token(sub=f"user-{user}"))
+    assert len(verifier._validated) == 2
+
+def _segment(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+def test_unknown_signing_keys_refresh_the_jwks_at_most_once_per_interval(monkeypatch):
+    """Test that tokens naming unknown keys fetch the JWKS off the event loop, rate limited."""
+    verifier = TokenVerifier(jwks_url="http://localhost/jwks.json", jwks_refresh_interval=60)
+    fetches = []
+
+    def fetch_signing_keys():
+        fetches.append(time.monotonic())
+        return {}
+
+    monkeypatch.setattr(verifier, "_fetch_signing_keys", fetch_signing_keys)
+    tokens = [
+        f"{_segment({'alg': 'RS256', 'kid': f'kid-{index}'})}.{_segment({'sub': 'x'})}.c2ln"
+        for index in range(3)
+    ]
+
+    with pytest.raises(UnknownSigningKey):
+        verifier.verify(tokens[0])
+
+    async def run():
+        outcomes = []
+        for token in tokens:
+            try:
+                await verifier.verify_async(token)
+            except LocalVerificationUnavailable as e:
+                outcomes.append(type(e))
+        return outcomes
+
+    assert asyncio.run(run()) == [UnknownSigningKey] * 3
+    assert len(fetches) == 1
+
+def test_token_subject_is_the_user_id():
+    """Test that the user id is read from a token's `sub` claim, and is None without one."""
+    assert token_subject(mint_token()) == "00000000-0000-0000-0000-000000000001"
+    assert token_subject(jwt.encode({"role": "service_role"}, SECRET, algorithm="HS256")) is None
+    assert token_subject("not-a-token") is None
@@ -0,0 +1,99 @@
+import asyncio
+from src.localization_management_api.core.cache import MISSING, REGION_MAX_ENTRIES, CatalogCache
+
+def _entry(key_id, value):
+    return {
+        "id": key_id,
+        "key": f"key.{key_id}",
+        "translations": {"en": {"value": value, "updated_at": None}},
+    }
+
+def test_snapshot_hit_and_miss():
+    """Test that the full catalog is served from memory once stored."""
+    cache = CatalogCache()
+    assert cache.get_snapshot() is None
+
+    assert cache.store_snapshot([_entry("a", "A")], ["en"], cache.version)
+    assert cache.get_snapshot().entries[0]["id"] == "a"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_stale_snapshot_is_not_stored():
+    """Test that a catalog loaded before a write is discarded."""
+    cache = CatalogCache()
+    version = cache.version
+    cache.apply_translation_updates([])
+
+    assert not cache.store_snapshot([_entry("a", "A")], ["en"], version)
+    assert cache.get_snapshot() is None
+
+def test_updates_patch_snapshot_in_place():
+    """Test that writes patch the cached catalog and bump the version."""
+    cache = CatalogCache()
+    cache.store_snapshot([_entry("a", "A")], ["en"], cache.version)
+
+    version = cache.apply_translation_updates([
+        {"key_id": "a", "language_code": "en", "value": "Updated", "updated_at": "2024-06-24T00:00:00+00:00"},
+    ])
+
+    snapshot = cache.get_snapshot()
+    assert snapshot.version == version == 1
+    assert snapshot.by_id["a"]["translations"]["en"]["value"] == "Updated"
+
+def test_unknown_key_drops_snapshot():
+    """Test that a write to a key missing from the cache forces a reload."""
+    cache = CatalogCache()
+    cache.store_snapshot([_entry("a", "A")], ["en"], cache.version)
+
+    cache.apply_translation_updates([
+        {"key_id": "b", "language_code": "en", "value": "B"},
+    ])
+    assert cache.get_snapshot() is None
+
+def test_derived_entries_are_versioned():
+    """Test that derived entries are retired when the version changes."""
+    cache = CatalogCache()
+
+    async def load():
+        return {"en": 50.0}
+
+    assert asyncio.run(cache.get_or_load("stats", load)) == {"en": 50.0}
+    assert cache.get("stats") == {"en": 50.0}
+
+    cache.apply_translation_updates([])
+    assert cache.get("stats") is MISSING
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = CatalogCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_regions_do_not_evict_catalog_entries():
+    """Test that entries keyed by requests are evicted within their region only."""
+    cache = CatalogCache(max_entries=2)
+    cache.put("encoded_catalog", b"[]")
+    for n in range(REGION_MAX_ENTRIES["runtime"] + 1):
+        cache.put(("runtime_table", n), n, region="runtime")
+
+    assert cache.get("encoded_catalog") == b"[]"
+    assert cache.get(("runtime_table", 0), region="runtime") is MISSING
+    assert cache.stats()["regions"]["runtime"] == REGION_MAX_ENTRIES["runtime"]
+
+    cache.apply_translation_updates([])
+    assert cache.stats()["regions"]["runtime"] == 0
+
+def test_ttl_expiry():
+    """Test that entries expire after the fallback TTL."""
+    cache = CatalogCache(ttl_seconds=0)
+    cache.put("a", 1)
+    cache.store_snapshot([_entry("a", "A")], ["en"], cache.version)
+
+    assert cache.get("a") is MISSING
+    assert cache.get_snapshot() is None
@@ -0,0 +1,74 @@
+import pytest
+from src.localization_management_api.core.catalog import (
+    build_key_entry,
+    compute_etag,
+    decode_cursor,
+    encode_cursor,
+    escape_like,
+    etag_matches,
+    has_missing_translation,
+)
+
+KEY = {
+    "id": "key-1",
+    "key": "button.submit",
+    "category": "buttons",
+    "description": "Submit button text",
+    "created_at": "2024-06-23T00:00:00+00:00",
+    "updated_at": "2024-06-23T00:00:00+00:00",
+}
+
+def test_build_key_entry_fills_missing_languages():
+    """Test that every requested language appears in the entry."""
+    translations = {
+        "en": {"key_id": "key-1", "language_code": "en", "value": "Submit", "updated_at": "2024-06-24T00:00:00+00:00"},
+    }
+    entry = build_key_entry(KEY, translations, ["en", "es"])
+
+    assert entry["key"] == "button.submit"
+    assert entry["translations"]["en"] == {"value": "Submit", "updated_at": "2024-06-24T00:00:00+00:00"}
+    assert entry["translations"]["es"] == {"value": "", "updated_at": None}
+
+def test_has_missing_translation():
+    """Test missing detection is limited to the given languages."""
+    translations = {
+        "en": {"value": "Submit", "updated_at": None},
+    }
+    entry = build_key_entry(KEY, translations, ["en", "es"])
+
+    assert has_missing_translation(entry, ["en", "es"])
+    assert not has_missing_translation(entry, ["en"])
+
+def test_cursor_round_trip():
+    """Test that cursors decode back to the key they were built from."""
+    assert decode_cursor(encode_cursor("welcome.message")) == "welcome.message"
+    assert decode_cursor(encode_cursor("ようこそ")) == "ようこそ"
+
+def test_decode_invalid_cursor():
+    """Test that malformed cursors are rejected."""
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!")
+
+def test_escape_like():
+    """Test that LIKE wildcards are escaped."""
+    assert escape_like("error_") == "error\\_"
+    assert escape_like("100%") == "100\\%"
+
+def test_etag_changes_with_watermark():
+    """Test that the ETag follows the catalog watermark and the variant."""
+    watermark = {"translations": {"updated_at": "2024-06-24T00:00:00+00:00", "count": 15}}
+    etag = compute_etag(watermark)
+
+    assert compute_etag(dict(watermark)) == etag
+    assert compute_etag(watermark, "limit=2") != etag
+    assert compute_etag({"translations": {"updated_at": "2024-06-25T00:00:00+00:00", "count": 15}}) != etag
+
+def test_etag_matches():
+    """Test If-None-Match parsing, including weak validators and lists."""
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"xyz", "abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from src.localization_management_api.core.changes import ChangeFeed, _parse_timestamp, iter_change_events
+from src.localization_management_api.repositories.memory import MemoryRepository
+
+def _row(key_id, language_code, value, updated_at="2024-07-01T00:00:00+00:00"):
+    return {"key_id": key_id, "language_code": language_code, "value": value, "updated_at": updated_at}
+
+def _parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+def test_changes_are_coalesced_and_shared_by_subscribers():
+    """Test that edits within the window become one event, encoded once for all subscribers."""
+    async def run():
+        feed = ChangeFeed(coalesce_seconds=0.01)
+        first, _, _ = feed.subscribe()
+        second, _, _ = feed.subscribe()
+        feed.publish([_row("k1", "en", "Draft")])
+        feed.publish([_row("k1", "en", "Final"), _row("k2", "es", "Hola")])
+        await asyncio.sleep(0.05)
+        return first.queue.get_nowait(), second.queue.get_nowait(), first.queue.empty()
+
+    first_frame, second_frame, drained = asyncio.run(run())
+    assert first_frame is second_frame
+    assert drained
+    event_id, event, data = _parse(first_frame)
+    assert event == "changes"
+    assert event_id.split(":")[1] == "1"
+    assert [(c["key_id"], c["value"]) for c in data["changes"]] == [("k1", "Final"), ("k2", "Hola")]
+
+def test_reconnecting_client_gets_missed_events_from_history():
+    """Test that a known Last-Event-ID replays the events sent after it."""
+    async def run():
+        feed = ChangeFeed(coalesce_seconds=0)
+        for value in ("one", "two", "three"):
+            feed.publish([_row("k1", "en", value)])
+            await asyncio.sleep(0.01)
+        first_id = _parse(feed._history[0][1])[0]
+        _, missed, _ = feed.subscribe(first_id)
+        _, unknown, watermark = feed.subscribe("other:7:2024-06-01T00:00:00+00:00")
+        return missed, unknown, watermark
+
+    missed, unknown, watermark = asyncio.run(run())
+    assert [_parse(frame)[2]["changes"][0]["value"] for frame in missed] == ["two", "three"]
+    assert unknown is None
+    assert watermark == "2024-06-01T00:00:00+00:00"
+
+def test_unknown_event_id_is_caught_up_from_the_database():
+    """Test that a client from another process is sent the changes after its watermark."""
+    repository = MemoryRepository()
+    repository.add_language("en", "English")
+    key = repository.add_key("buttons.save", "buttons")
+    repository.add_translation(key["id"], "en", "Save")
+
+    async def run():
+        feed = ChangeFeed(coalesce_seconds=0)
+        stream = iter_change_events(feed, repository, "other:3:2000-01-01T00:00:00+00:00", heartbeat_seconds=0.01)
+        frames = [await anext(stream) for _ in range(3)]
+        await stream.aclose()
+        return frames, feed.subscribers
+
+    frames, subscribers = asyncio.run(run())
+    assert frames[0].startswith(b"retry:")
+    _, event, data = _parse(frames[1])
+    assert event == "changes"
+    assert data["changes"][0]["value"] == "Save"
+    assert frames[2] == b": keepalive\n\n"
+    assert subscribers == 0
+
+def test_slow_subscriber_is_disconnected():
+    """Test that a subscriber that falls behind is ended instead of buffered."""
+    async def run():
+        feed = ChangeFeed(coalesce_seconds=0, queue_size=2)
+        subscriber, _, _ = feed.subscribe()
+        for value in range(4):
+            feed.publish([_row("k1", "en", str(value))])
+            await asyncio.sleep(0.01)
+        return subscriber.queue.get_nowait()
+
+    assert asyncio.run(run()) is None
+
+def test_reset_when_history_cannot_cover_the_gap():
+    """Test that an unresolvable event id without a watermark asks the client to reload."""
+    async def run():
+        feed = ChangeFeed()
+        stream = iter_change_events(feed, MemoryRepository(), "garbage")
+        frames = [await anext(stream) for _ in range(2)]
+        await stream.aclose()
+        return frames
+
+    _, event, data = _parse(asyncio.run(run())[1])
+    assert event == "reset"
+    assert data == {"reason": "history_unavailable"}
+
+def test_catch_up_overlaps_the_watermark_and_sends_each_cell_once():
+    """Test that rows committed just before the watermark are replayed, once per cell."""
+    repository = MemoryRepository()
+    repository.add_language("en", "English")
+    key = repository.add_key("buttons.save", "buttons")
+    repository.add_translation(key["id"], "en", "Save")
+    fetch_changes_since = repository.fetch_changes_since
+
+    async def fetch_with_duplicates(since, limit=None):
+        keys, translations = await fetch_changes_since(since, limit)
+        return keys, translations + [{**row, "value": "Save all"} for row in translations]
+
+    repository.fetch_changes_since = fetch_with_duplicates
+    watermark = (datetime.now(timezone.utc) + timedelta(seconds=2)).isoformat()
+
+    async def run():
+        feed = ChangeFeed(coalesce_seconds=0)
+        stream = iter_change_events(feed, repository, f"other:3:{watermark}", heartbeat_seconds=0.01)
+        frames = [await anext(stream) for _ in range(2)]
+        await stream.aclose()
+        return frames
+
+    _, event, data = _parse(asyncio.run(run())[1])
+    assert event == "changes"
+    assert [(c["key_id"], c["value"]) for c in data["changes"]] == [(key["id"], "Save all")]
+
+def test_replay_cap_is_pushed_down_to_the_repository():
+    """Test that catching up reads at most one row over the cap before sending a reset."""
+    repository = MemoryRepository()
+    repository.add_language("en", "English")
+    for index in range(5):
+        key = repository.add_key(f"buttons.b{index}", "buttons")
+        repository.add_translation(key["id"], "en", f"Button {index}")
+    limits = []
+    fetch_changes_since = repository.fetch_changes_since
+
+    async def recording_fetch(since, limit=None):
+        limits.append(limit)
+        keys, translations = await fetch_changes_since(since, limit)
+        assert limit is not None and len(translations) <= limit
+        return keys, translations
+
+    repository.fetch_changes_since = recording_fetch
+
+    async def run():
+        feed = ChangeFeed()
+        stream = iter_change_events(feed, repository, since=_parse_timestamp("1970-01-01T00:00:00Z"), max_replay_rows=2)
+        frames = [await anext(stream) for _ in range(2)]
+        await stream.aclose()
+        return frames
+
+    _, event, data = _parse(asyncio.run(run())[1])
+    assert limits == [3]
+    assert event == "reset"
+    assert data == {"reason": "too_many_changes"}
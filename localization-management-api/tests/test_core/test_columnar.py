@@ -0,0 +1,59 @@
+import json
+from src.localization_management_api.core.columnar import (
+    COLUMNAR_JSON_MEDIA_TYPE,
+    COLUMNAR_MSGPACK_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    build_columnar_catalog,
+    encode_catalog,
+    msgpack,
+    negotiate_media_type,
+)
+
+def _entry(index, translations):
+    return {
+        "id": f"key-{index}",
+        "key": f"button.key{index}",
+        "category": "buttons",
+        "description": None,
+        "created_at": "2024-06-23T00:00:00+00:00",
+        "updated_at": "2024-06-23T00:00:00+00:00",
+        "translations": translations,
+    }
+
+ENTRIES = [
+    _entry(0, {
+        "en": {"value": "Submit", "updated_at": "2024-06-24T00:00:00+00:00"},
+        "es": {"value": "", "updated_at": None},
+    }),
+    _entry(1, {
+        "en": {"value": "Cancel", "updated_at": "2024-06-25T00:00:00+00:00"},
+        "es": {"value": "Cancelar", "updated_at": "2024-06-26T00:00:00+00:00"},
+    }),
+]
+
+def test_columnar_arrays_are_aligned():
+    """Test that key fields and per-language values line up by index."""
+    catalog = build_columnar_catalog(ENTRIES, ["en", "es"])
+
+    assert catalog["keys"]["key"] == ["button.key0", "button.key1"]
+    assert catalog["values"] == {"en": ["Submit", "Cancel"], "es": ["", "Cancelar"]}
+    assert catalog["updated_at"]["es"] == [None, "2024-06-26T00:00:00+00:00"]
+
+def test_columnar_is_smaller_than_default():
+    """Test that the columnar encoding is smaller than the nested list."""
+    entries = ENTRIES * 100
+    default = encode_catalog(entries, ["en", "es"], JSON_MEDIA_TYPE)
+    columnar = encode_catalog(entries, ["en", "es"], COLUMNAR_JSON_MEDIA_TYPE)
+
+    assert json.loads(default) == entries
+    assert len(columnar) < len(default)
+
+def test_negotiate_media_type():
+    """Test that columnar formats are only sent when requested."""
+    assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+    assert negotiate_media_type("*/*") == JSON_MEDIA_TYPE
+    assert negotiate_media_type(f"{COLUMNAR_JSON_MEDIA_TYPE}, application/json;q=0.5") == COLUMNAR_JSON_MEDIA_TYPE
+    assert negotiate_media_type(f"{COLUMNAR_JSON_MEDIA_TYPE};q=0") == JSON_MEDIA_TYPE
+
+    expected = COLUMNAR_MSGPACK_MEDIA_TYPE if msgpack is not None else COLUMNAR_JSON_MEDIA_TYPE
+    assert negotiate_media_type(f"{COLUMNAR_MSGPACK_MEDIA_TYPE}, {COLUMNAR_JSON_MEDIA_TYPE}") == expected
@@ -0,0 +1,79 @@
+import brotli
+import gettext
+import gzip
+import io
+import json
+import pytest
+from src.localization_management_api.core.exports import (
+    ExportConflictError,
+    build_export,
+    build_flat_json,
+    build_mo,
+    build_nested_json,
+    build_po,
+)
+
+def _entry(key, value, description=None):
+    return {
+        "key": key,
+        "description": description,
+        "translations": {"es": {"value": value, "updated_at": None}},
+    }
+
+ENTRIES = [
+    _entry("button.submit", "Enviar", "Submit button text"),
+    _entry("button.cancel", ""),
+    _entry("title", 'Título "principal"\nde la página'),
+]
+
+def test_flat_json_skips_untranslated_keys():
+    """Test that the flat export maps keys to non-empty values."""
+    assert json.loads(build_flat_json(ENTRIES, "es")) == {
+        "button.submit": "Enviar",
+        "title": 'Título "principal"\nde la página',
+    }
+
+def test_nested_json_splits_keys():
+    """Test that keys are split on dots into nested objects."""
+    assert json.loads(build_nested_json(ENTRIES, "es")) == {
+        "button": {"submit": "Enviar"},
+        "title": 'Título "principal"\nde la página',
+    }
+
+def test_nested_json_rejects_conflicting_keys():
+    """Test that a key that is also a prefix of another key is rejected."""
+    with pytest.raises(ExportConflictError):
+        build_nested_json(ENTRIES + [_entry("button", "Botón")], "es")
+
+def test_po_includes_untranslated_keys():
+    """Test the gettext catalog layout and escaping."""
+    po = build_po(ENTRIES, "es").decode("utf-8")
+    assert '#. Submit button text\nmsgid "button.submit"\nmsgstr "Enviar"' in po
+    assert 'msgid "button.cancel"\nmsgstr ""' in po
+    assert 'msgstr ""\n"Título \\"principal\\"\\n"\n"de la página"' in po
+
+def test_mo_is_readable_by_gettext():
+    """Test that the compiled catalog loads with the standard library."""
+    translations = gettext.GNUTranslations(io.BytesIO(build_mo(ENTRIES, "es")))
+    assert translations.gettext("button.submit") == "Enviar"
+    assert translations.gettext("title") == 'Título "principal"\nde la página'
+    assert translations.gettext("button.cancel") == "button.cancel"
+    assert translations.info()["language"] == "es"
+
+def test_artifact_is_precompressed():
+    """Test that artifacts are served gzip-compressed when accepted."""
+    artifact = build_export(ENTRIES * 50, "es", "po")
+    assert artifact.filename == "es.po"
+    assert artifact.select_encoding("gzip, deflate") == "gzip"
+    assert artifact.select_encoding("gzip;q=0") == "identity"
+    assert artifact.select_encoding(None) == "identity"
+    assert gzip.decompress(artifact.encodings["gzip"]) == artifact.encodings["identity"]
+    assert artifact.encoding_etag("identity") == artifact.etag
+    assert artifact.encoding_etag("gzip") == f'{artifact.etag[:-1]}-gzip"'
+
+def test_artifact_is_precompressed_with_brotli():
+    """Test that artifacts also carry a brotli body, preferred when accepted."""
+    artifact = build_export(ENTRIES * 50, "es", "json")
+    assert brotli.decompress(artifact.encodings["br"]) == artifact.encodings["identity"]
+    assert artifact.select_encoding("gzip, br") == "br"
+    assert artifact.encoding_etag("br") == f'{artifact.etag[:-1]}-br"'
@@ -0,0 +1,93 @@
+import asyncio
+from src.localization_management_api.core.imports import (
+    ImportFormatError,
+    detect_import_format,
+    parse_csv,
+    parse_json,
+    parse_xliff,
+)
+
+def _parse(parser, data, language=None, chunk_size=5):
+    """Run a parser over `data` split into small chunks."""
+    async def chunks():
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    async def collect():
+        rows = []
+        try:
+            async for row in parser(chunks(), language):
+                rows.append(row)
+        except ImportFormatError as e:
+            rows.append(str(e))
+        return rows
+
+    return asyncio.run(collect())
+
+def test_csv_long_layout_with_multiline_value():
+    """Test that quoted values spanning lines are read as one record."""
+    data = 'key,language_code,value\nbutton.submit,es,"Enviar\n""ya"""\nbad\n'.encode("utf-8")
+    assert _parse(parse_csv, data) == [
+        {"row": 2, "key": "button.submit", "language_code": "es", "value": 'Enviar\n"ya"'},
+        {"row": 3, "error": "Expected 3 columns, got 1"},
+    ]
+
+def test_csv_column_per_language():
+    """Test the one-column-per-language layout, ignoring descriptions."""
+    data = b"key,description,en,es\r\ntitle,Page title,Title,Titulo\r\n"
+    assert _parse(parse_csv, data) == [
+        {"row": 2, "key": "title", "language_code": "en", "value": "Title"},
+        {"row": 2, "key": "title", "language_code": "es", "value": "Titulo"},
+    ]
+
+def test_csv_unterminated_quote():
+    """Test that an unterminated quoted field aborts the import."""
+    assert _parse(parse_csv, b'key,value\n"title,x\n', "es") == [
+        "Unterminated quoted field at end of CSV file",
+    ]
+
+def test_json_split_across_chunks():
+    """Test that a flat JSON object is parsed regardless of chunk boundaries."""
+    data = '{ "a.b" : "v\\u00e9" , "count": 12345, "c": "x" }'.encode("utf-8")
+    for chunk_size in (1, 3, 100):
+        assert _parse(parse_json, data, "es", chunk_size) == [
+            {"row": 1, "key": "a.b", "language_code": "es", "value": "vé"},
+            {"row": 2, "key": "count", "error": "Value must be a string"},
+            {"row": 3, "key": "c", "language_code": "es", "value": "x"},
+        ]
+
+def test_json_must_be_an_object():
+    """Test that anything but a flat object is rejected."""
+    assert _parse(parse_json, b'["a"]', "es") == ["Expected one of '{' in JSON, found '['"]
+
+def test_xliff_1_2():
+    """Test XLIFF 1.2 with inline markup and a unit without a target."""
+    data = (
+        b'<?xml version="1.0"?>'
+        b'<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">'
+        b'<file source-language="en" target-language="de"><body>'
+        b'<trans-unit id="1" resname="button.submit"><source>Submit</source>'
+        b'<target>Jetzt <g id="b">senden</g></target></trans-unit>'
+        b'<trans-unit id="title"><source>Title</source></trans-unit>'
+        b'</body></file></xliff>'
+    )
+    assert _parse(parse_xliff, data) == [
+        {"row": 1, "key": "button.submit", "language_code": "de", "value": "Jetzt senden"},
+    ]
+
+def test_xliff_2_0_language_override():
+    """Test XLIFF 2.0 units, with the language given explicitly."""
+    data = (
+        b'<xliff xmlns="urn:oasis:names:tc:xliff:document:2.0" version="2.0" srcLang="en" trgLang="fr">'
+        b'<file id="f"><unit id="title"><segment><source>Title</source><target>Titre</target></segment></unit></file>'
+        b'</xliff>'
+    )
+    assert _parse(parse_xliff, data, "es") == [
+        {"row": 1, "key": "title", "language_code": "es", "value": "Titre"},
+    ]
+
+def test_detect_import_format():
+    """Test that the format is taken from the Content-Type."""
+    assert detect_import_format("text/csv; charset=utf-8") == "csv"
+    assert detect_import_format("application/xliff+xml") == "xliff"
+    assert detect_import_format("application/octet-stream") is None
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from src.localization_management_api.core.jobs import JobRunner, register_job_handler
+from src.localization_management_api.repositories.memory import MemoryRepository
+
+class RecordingRepository(MemoryRepository):
+    """Records every job record the runner saves."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+
+    async def save_job(self, record):
+        self.rows.append(dict(record))
+        await super().save_job(record)
+
+@register_job_handler("test-sum")
+async def sum_job(job, repository):
+    total = 0
+    for number in job.params["numbers"]:
+        total += number
+        job.set_progress(done=total)
+        await asyncio.sleep(0)
+    return {"total": total}
+
+@register_job_handler("test-wait")
+async def wait_job(job, repository):
+    await asyncio.sleep(60)
+
+def _run(scenario):
+    """Run `scenario(runner, repository)` against a started runner."""
+    repository = RecordingRepository()
+
+    async def get_repository():
+        return repository
+
+    async def main():
+        runner = JobRunner(workers=1, repository_factory=get_repository)
+        await runner.start()
+        try:
+            return await scenario(runner, repository)
+        finally:
+            await runner.stop()
+
+    return asyncio.run(main())
+
+async def _wait_until_finished(job):
+    while not job.finished:
+        await asyncio.sleep(0.01)
+
+def test_job_runs_and_is_persisted():
+    """Test that a job's result and status changes are written to the jobs table."""
+    async def scenario(runner, repository):
+        job = await runner.submit("test-sum", {"numbers": [1, 2, 3]})
+        await _wait_until_finished(job)
+        return job, repository
+
+    job, repository = _run(scenario)
+    assert job.status == "succeeded"
+    assert job.result == {"total": 6}
+    assert job.progress == {"done": 6}
+    # Progress updates may add further "running" rows
+    statuses = [row["status"] for row in repository.rows]
+    assert list(dict.fromkeys(statuses)) == ["queued", "running", "succeeded"]
+
+def test_cancel_running_job():
+    """Test that a running job can be cancelled."""
+    async def scenario(runner, repository):
+        job = await runner.submit("test-wait")
+        while job.status != "running":
+            await asyncio.sleep(0.01)
+        await runner.cancel(job.id)
+        await _wait_until_finished(job)
+        return job
+
+    assert _run(scenario).status == "cancelled"
+
+def test_stop_interrupts_running_jobs():
+    """Test that jobs still running at shutdown are marked as failed."""
+    async def scenario(runner, repository):
+        job = await runner.submit("test-wait")
+        while job.status != "running":
+            await asyncio.sleep(0.01)
+        return job
+
+    job = _run(scenario)
+    assert job.status == "failed"
+    assert job.error == "Interrupted by shutdown"
+
+def test_unknown_job_kind():
+    """Test that only registered job kinds are accepted."""
+    async def scenario(runner, repository):
+        with pytest.raises(ValueError):
+            await runner.submit("test-unknown")
+
+    _run(scenario)
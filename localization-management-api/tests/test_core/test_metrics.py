@@ -0,0 +1,120 @@
+import asyncio
+import httpx
+from fastapi import FastAPI
+from src.localization_management_api.core.metrics import (
+    Histogram,
+    InstrumentedTransport,
+    MetricsMiddleware,
+    RequestTimings,
+    _request_timings,
+    get_metrics,
+    parse_content_range,
+    timed,
+)
+
+class _ChunkedBody(httpx.AsyncByteStream):
+    """A response body that arrives in chunks, like one read from the network."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), 8):
+            yield self.body[start:start + 8]
+
+def test_upstream_calls_are_counted_with_rows_and_bytes():
+    """Test that calls through the instrumented transport record rows, bytes and request timings."""
+    body = b'[{"code": "en"}, {"code": "es"}]'
+
+    async def handler(request):
+        return httpx.Response(200, stream=_ChunkedBody(body), headers={"Content-Range": "0-1/*"})
+
+    async def run():
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        try:
+            transport = InstrumentedTransport(httpx.MockTransport(handler))
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.get("https://example.supabase.co/rest/v1/languages")
+                await client.post("https://example.supabase.co/rest/v1/rpc/catalog_entries")
+        finally:
+            _request_timings.reset(token)
+        return timings
+
+    metrics = get_metrics()
+    calls_before = metrics.upstream_requests.value(("postgrest", "languages", "200"))
+    rows_before = metrics.upstream_rows.value(("postgrest", "languages"))
+    bytes_before = metrics.upstream_bytes.value(("postgrest", "languages"))
+
+    timings = asyncio.run(run())
+
+    assert metrics.upstream_requests.value(("postgrest", "languages", "200")) == calls_before + 1
+    assert metrics.upstream_rows.value(("postgrest", "languages")) == rows_before + 2
+    assert metrics.upstream_bytes.value(("postgrest", "languages")) == bytes_before + len(body)
+    assert metrics.upstream_duration.count(("postgrest", "rpc/catalog_entries")) >= 1
+    assert timings.phases["postgrest"][1] == 2
+    assert 'postgrest;dur=' in timings.server_timing()
+
+def test_parse_content_range():
+    """Test row counts read from PostgREST Content-Range headers."""
+    assert parse_content_range("0-24/100") == 25
+    assert parse_content_range("*/0") == 0
+    assert parse_content_range(None) is None
+    assert parse_content_range("garbage") is None
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the Prometheus text format of a histogram."""
+    histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(("/items",), value)
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{route="/items",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/items",le="1"} 2' in lines
+    assert 'test_seconds_bucket{route="/items",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="/items"} 3' in lines
+
+def test_middleware_records_route_templates_and_server_timing():
+    """Test that requests are recorded by route template and get a Server-Timing header."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, server_timing=True)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        with timed("encode"):
+            return {"id": item_id}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(f"/items/{n}") for n in range(3)]
+
+    metrics = get_metrics()
+    before = metrics.requests.value(("GET", "/items/{item_id}", "200"))
+    responses = asyncio.run(run())
+
+    assert metrics.requests.value(("GET", "/items/{item_id}", "200")) == before + 3
+    assert metrics.requests.value(("GET", "/items/0", "200")) == 0
+    server_timing = responses[0].headers["Server-Timing"]
+    assert server_timing.startswith("encode;dur=")
+    assert "total;dur=" in server_timing
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"}' in get_metrics().render()
+
+def test_middleware_omits_server_timing_by_default():
+    """Test that the Server-Timing header is only sent when enabled."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items")
+    async def get_items():
+        return []
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/items")
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    assert "Timing-Allow-Origin" not in response.headers
@@ -0,0 +1,134 @@
+import asyncio
+import httpx
+from datetime import datetime, timezone
+from postgrest import AsyncPostgrestClient
+from src.localization_management_api.core.bulk import IN_FILTER_BATCH_SIZE, write_translation_updates
+from src.localization_management_api.repositories.memory import MemoryRepository
+from src.localization_management_api.repositories.supabase import SupabaseRepository
+
+def _repository():
+    repository = MemoryRepository()
+    repository.add_language("en", "English")
+    repository.add_language("es", "Spanish")
+    repository.add_language("fr", "French", is_active=False)
+    for name, category in [("nav.home", "nav"), ("button.save", "buttons"), ("button.cancel", "buttons")]:
+        key = repository.add_key(name, category)
+        repository.add_translation(key["id"], "en", name.split(".")[1].title())
+    return repository
+
+def test_catalog_includes_every_active_language():
+    """Test that loaded entries have a value for each active language."""
+    entries, languages = asyncio.run(_repository().load_catalog())
+
+    assert languages == ["en", "es"]
+    assert len(entries) == 3
+    for entry in entries:
+        assert entry["translations"]["es"] == {"value": "", "updated_at": None}
+
+def test_key_batches_follow_key_order():
+    """Test cursor-style paging by key name, with prefix and category filters."""
+    repository = _repository()
+
+    async def names(*args):
+        return [key["key"] for key in await repository.fetch_key_batch(*args)]
+
+    assert asyncio.run(names(None, 2, None, None)) == ["button.cancel", "button.save"]
+    assert asyncio.run(names("button.save", 2, None, None)) == ["nav.home"]
+    assert asyncio.run(names(None, 10, None, "button.")) == ["button.cancel", "button.save"]
+    assert asyncio.run(names(None, 10, "nav", None)) == ["nav.home"]
+
+def test_upsert_reports_rows_and_bumps_updated_at():
+    """Test that upserts write the last row per cell and report the others as superseded."""
+    repository = _repository()
+    key_id = asyncio.run(repository.fetch_key_index())["button.save"]
+    before = datetime.now(timezone.utc)
+
+    results, written = asyncio.run(repository.upsert_translations(
+        [
+            {"key_id": key_id, "language_code": "es", "value": "Guardar"},
+            {"key_id": key_id, "language_code": "es", "value": "Salvar"},
+            {"key_id": "missing", "language_code": "es", "value": "?"},
+        ],
+        chunk_size=1,
+        concurrency=2,
+    ))
+
+    assert [result["status"] for result in results] == ["superseded", "updated", "failed"]
+    assert [row["value"] for row in written] == ["Salvar"]
+    changed_keys, changed_translations = asyncio.run(repository.fetch_changes_since(before))
+    assert changed_keys == []
+    assert [trans["value"] for trans in changed_translations] == ["Salvar"]
+
+def test_unchanged_values_are_not_written():
+    """Test that only new and changed values are upserted, and that dry runs write nothing."""
+    repository = _repository()
+    key_ids = asyncio.run(repository.fetch_key_index())
+    rows = [
+        {"key_id": key_ids["button.save"], "language_code": "en", "value": "Save"},
+        {"key_id": key_ids["nav.home"], "language_code": "en", "value": "Start"},
+        {"key_id": key_ids["nav.home"], "language_code": "es", "value": "Inicio"},
+    ]
+    before = datetime.now(timezone.utc)
+
+    results, written = asyncio.run(write_translation_updates(repository, rows, 10, 2, dry_run=True))
+    assert [result["status"] for result in results] == ["unchanged", "changed", "new"]
+    assert written == []
+    assert asyncio.run(repository.fetch_changes_since(before)) == ([], [])
+
+    results, written = asyncio.run(write_translation_updates(repository, rows, 10, 2))
+    assert [result["status"] for result in results] == ["unchanged", "updated", "updated"]
+    assert [result["change"] for result in results] == ["unchanged", "changed", "new"]
+    assert sorted(row["value"] for row in written) == ["Inicio", "Start"]
+
+    results, written = asyncio.run(write_translation_updates(repository, rows, 10, 2))
+    assert {result["status"] for result in results} == {"unchanged"}
+    assert written == []
+
+def test_completion_counts():
+    """Test that completion counts have the shape of the translation_completion function."""
+    counts = asyncio.run(_repository().fetch_completion_counts(False))
+
+    assert counts["total_keys"] == 3
+    assert counts["languages"] == {
+        "en": {"translated": 3, "total": 3},
+        "es": {"translated": 0, "total": 3},
+    }
+    assert counts["categories"]["buttons"] == {"translated": 2, "total": 4}
+    assert counts["language_categories"]["en"]["nav"] == {"translated": 1, "total": 1}
+
+def test_contributors_are_the_users_who_wrote_translations():
+    """Test that writes record `updated_by` and the contributor breakdown counts them."""
+    repository = _repository()
+    key_ids = asyncio.run(repository.fetch_key_index())
+    rows = [
+        {"key_id": key_ids["button.save"], "language_code": "es", "value": "Guardar"},
+        {"key_id": key_ids["nav.home"], "language_code": "es", "value": "Inicio"},
+        {"key_id": key_ids["nav.home"], "language_code": "en", "value": "Start"},
+    ]
+
+    results, written = asyncio.run(write_translation_updates(repository, rows, 10, 2, updated_by="user-1"))
+    counts = asyncio.run(repository.fetch_completion_counts(True))
+
+    assert {row["updated_by"] for row in written} == {"user-1"}
+    assert counts["contributors"] == {"user-1": {"es": 2, "en": 1}}
+
+def test_supabase_translations_for_many_keys_are_read_in_batches():
+    """Test that long key id lists are split into several `in` filters."""
+    key_ids = [f"key-{n}" for n in range(IN_FILTER_BATCH_SIZE * 2 + 1)]
+    batch_sizes = []
+
+    async def handler(request):
+        ids = request.url.params["key_id"].removeprefix("in.(").removesuffix(")").split(",")
+        batch_sizes.append(len(ids))
+        rows = [{"key_id": key_id, "language_code": "en", "value": key_id, "updated_at": None} for key_id in ids]
+        return httpx.Response(200, json=rows)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            client = AsyncPostgrestClient("https://example.supabase.co/rest/v1", http_client=http_client)
+            return await SupabaseRepository(client).fetch_translations_for_keys(key_ids)
+
+    translations = asyncio.run(run())
+    assert sorted(batch_sizes) == [1, IN_FILTER_BATCH_SIZE, IN_FILTER_BATCH_SIZE]
+    assert len(translations) == len(key_ids)
+    assert translations["key-0"]["en"]["value"] == "key-0"
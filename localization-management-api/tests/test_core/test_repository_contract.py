@@ -0,0 +1,199 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.localization_management_api.core.config import settings
+from src.localization_management_api.repositories import postgres
+from src.localization_management_api.repositories.memory import MemoryRepository
+
+# Every backend must pass the same tests. The postgres backend runs against
+# the database at DATABASE_URL, so its tests only touch keys they create.
+BACKENDS = [
+    "memory",
+    pytest.param(
+        "postgres",
+        marks=pytest.mark.skipif(
+            not settings.DATABASE_URL or postgres.asyncpg is None,
+            reason="needs DATABASE_URL and asyncpg",
+        ),
+    ),
+]
+
+KEYS = [("nav.home", "nav", "Home"), ("button.save", "buttons", "Save"), ("button.cancel", "buttons", "Cancel")]
+
+@asynccontextmanager
+async def _seeded(backend):
+    """
+    A repository of `backend` holding the keys of KEYS under a unique prefix,
+    with English values, and the active languages `en` and `es`. Yields the
+    repository, the prefix and the key ids by unprefixed name.
+    """
+    prefix = f"contract-{uuid.uuid4().hex[:8]}."
+    if backend == "memory":
+        repository = MemoryRepository()
+        repository.add_language("en", "English")
+        repository.add_language("es", "Spanish")
+        key_ids = {}
+        for name, category, value in KEYS:
+            key_ids[name] = repository.add_key(prefix + name, category)["id"]
+            repository.add_translation(key_ids[name], "en", value)
+        yield repository, prefix, key_ids
+        return
+
+    pool = await postgres.get_postgres_pool()
+    try:
+        await pool.execute(
+            "insert into public.languages (code, name) values ('en', 'English'), ('es', 'Spanish') "
+            "on conflict (code) do update set is_active = true"
+        )
+        key_ids = {}
+        for name, category, value in KEYS:
+            key_id = await pool.fetchval(
+                "insert into public.translation_keys (key, category) values ($1, $2) returning id::text",
+                prefix + name,
+                category,
+            )
+            await pool.execute(
+                "insert into public.translations (key_id, language_code, value) values ($1::text::uuid, 'en', $2)",
+                key_id,
+                value,
+            )
+            key_ids[name] = key_id
+        yield postgres.PostgresRepository(pool), prefix, key_ids
+    finally:
+        await pool.execute("delete from public.translation_keys where key like $1", prefix + "%")
+        await postgres.close_postgres_pool()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_catalog_fills_every_active_language(backend):
+    """Test that loaded entries carry a value, possibly empty, for each active language."""
+    async def run():
+        async with _seeded(backend) as (repository, prefix, key_ids):
+            entries, languages = await repository.load_catalog()
+            return [entry for entry in entries if entry["key"].startswith(prefix)], languages, key_ids
+
+    entries, languages, key_ids = asyncio.run(run())
+    assert {"en", "es"} <= set(languages)
+    assert {entry["id"] for entry in entries} == set(key_ids.values())
+    for entry in entries:
+        assert entry["translations"]["es"] == {"value": "", "updated_at": None}
+        assert entry["translations"]["en"]["value"]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_key_batches_follow_key_order(backend):
+    """Test paging by key name with a prefix filter, and lookups by id."""
+    async def run():
+        async with _seeded(backend) as (repository, prefix, key_ids):
+            first = await repository.fetch_key_batch(None, 2, None, prefix)
+            rest = await repository.fetch_key_batch(first[-1]["key"], 2, None, prefix)
+            by_category = await repository.fetch_key_batch(None, 10, "nav", prefix)
+            by_id = await repository.fetch_keys_by_id([key_ids["nav.home"]])
+            existing = await repository.fetch_existing_key_ids([key_ids["nav.home"], str(uuid.uuid4())])
+            return prefix, key_ids, first, rest, by_category, by_id, existing
+
+    prefix, key_ids, first, rest, by_category, by_id, existing = asyncio.run(run())
+    assert [key["key"] for key in first + rest] == [prefix + "button.cancel", prefix + "button.save", prefix + "nav.home"]
+    assert [key["key"] for key in by_category] == [prefix + "nav.home"]
+    assert [key["id"] for key in by_id] == [key_ids["nav.home"]]
+    assert existing == {key_ids["nav.home"]}
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_upsert_reports_rows_and_records_changes(backend):
+    """Test that upserts write the last row per cell, fail whole chunks, and show up as changes."""
+    async def run():
+        async with _seeded(backend) as (repository, prefix, key_ids):
+            key_id = key_ids["button.save"]
+            before = datetime.now(timezone.utc) - timedelta(seconds=1)
+            results, written = await repository.upsert_translations(
+                [
+                    {"key_id": key_id, "language_code": "es", "value": "Guardar", "updated_by": None},
+                    {"key_id": key_id, "language_code": "es", "value": "Salvar", "updated_by": None},
+                    {"key_id": str(uuid.uuid4()), "language_code": "es", "value": "?", "updated_by": None},
+                ],
+                chunk_size=1,
+                concurrency=2,
+            )
+            translations = await repository.fetch_translations_for_keys([key_id], "es")
+            _, changed = await repository.fetch_changes_since(before)
+            return key_id, results, written, translations, changed
+
+    key_id, results, written, translations, changed = asyncio.run(run())
+    assert [result["status"] for result in results] == ["superseded", "updated", "failed"]
+    assert [row["value"] for row in written] == ["Salvar"]
+    assert translations[key_id]["es"]["value"] == "Salvar"
+    assert [row["value"] for row in changed if row["key_id"] == key_id and row["language_code"] == "es"] == ["Salvar"]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watermark_changes_with_writes(backend):
+    """Test that a write changes the catalog watermark."""
+    async def run():
+        async with _seeded(backend) as (repository, prefix, key_ids):
+            before = await repository.fetch_catalog_watermark()
+            await repository.upsert_translations(
+                [{"key_id": key_ids["nav.home"], "language_code": "es", "value": "Inicio", "updated_by": None}],
+                chunk_size=1,
+                concurrency=1,
+            )
+            return before, await repository.fetch_catalog_watermark()
+
+    before, after = asyncio.run(run())
+    assert before != after
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watermark_changes_when_an_empty_translation_is_deleted(backend):
+    """Test that deletions move the watermark even when no counted row goes away."""
+    async def run():
+        async with _seeded(backend) as (repository, prefix, key_ids):
+            key_id = key_ids["nav.home"]
+            # The empty row is neither counted nor the newest one
+            for row in (
+                {"key_id": key_id, "language_code": "es", "value": "", "updated_by": None},
+                {"key_id": key_ids["button.save"], "language_code": "es", "value": "Guardar", "updated_by": None},
+            ):
+                await repository.upsert_translations([row], chunk_size=1, concurrency=1)
+            before = await repository.fetch_catalog_watermark()
+            if backend == "postgres":
+                await repository.pool.execute(
+                    "delete from public.translations where key_id = $1::text::uuid and language_code = 'es'",
+                    key_id,
+                )
+            else:
+                repository.delete_translation(key_id, "es")
+            return before, await repository.fetch_catalog_watermark()
+
+    before, after = asyncio.run(run())
+    assert before["translations"] == after["translations"]
+    assert before != after
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_jobs_round_trip(backend):
+    """Test that a saved job record is loaded back unchanged, and replaced when saved again."""
+    record = {
+        "id": str(uuid.uuid4()),
+        "kind": "export",
+        "status": "queued",
+        "params": {"format": "json"},
+        "progress": {},
+        "result": None,
+        "error": None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+    async def run():
+        async with _seeded(backend) as (repository, prefix, key_ids):
+            await repository.save_job(record)
+            await repository.save_job({**record, "status": "succeeded", "result": {"rows": 3}})
+            loaded = await repository.load_job(record["id"])
+            missing = await repository.load_job(str(uuid.uuid4()))
+            if backend == "postgres":
+                await repository.pool.execute("delete from public.jobs where id = $1::text::uuid", record["id"])
+            return loaded, missing
+
+    loaded, missing = asyncio.run(run())
+    assert loaded["status"] == "succeeded"
+    assert loaded["result"] == {"rows": 3}
+    assert loaded["params"] == {"format": "json"}
+    assert missing is None
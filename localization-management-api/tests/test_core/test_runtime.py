@@ -0,0 +1,63 @@
+import asyncio
+from src.localization_management_api.core import runtime
+from src.localization_management_api.core.runtime import (
+    build_runtime_table,
+    fallback_chain,
+    parse_fallbacks,
+)
+
+LANGUAGES = ["en", "es", "es-419", "es-MX", "pt-BR"]
+
+def _entry(key, **values):
+    return {"key": key, "translations": {lang.replace("_", "-"): {"value": value} for lang, value in values.items()}}
+
+def test_fallback_chain_follows_configured_fallbacks_parents_and_default():
+    """Test that chains list configured fallbacks, then parent tags, then the default."""
+    fallbacks = parse_fallbacks("es-MX:es-419, pt-BR:es")
+    assert fallback_chain("es-MX", LANGUAGES, fallbacks, "en") == ["es-MX", "es-419", "es", "en"]
+    assert fallback_chain("ES-mx", LANGUAGES, fallbacks, "en") == ["es-MX", "es-419", "es", "en"]
+    # Inactive locales are skipped but still lead to their parent
+    assert fallback_chain("es-AR", LANGUAGES, fallbacks, "en") == ["es", "en"]
+    assert fallback_chain("pt-BR", LANGUAGES, fallbacks, "en") == ["pt-BR", "es", "en"]
+    assert fallback_chain("fr-CA", LANGUAGES, fallbacks) == []
+
+def test_fallback_chain_survives_cycles():
+    """Test that fallbacks pointing back at each other end instead of looping."""
+    fallbacks = parse_fallbacks("es:es-MX,es-MX:es")
+    assert fallback_chain("es", LANGUAGES, fallbacks, "en") == ["es", "es-MX", "en"]
+
+def test_runtime_table_resolves_values_and_filters_by_prefix():
+    """Test that each key takes the first non-empty value along the chain."""
+    entries = [
+        _entry("buttons.save", en="Save", es="Guardar", es_MX="Guardar ya"),
+        _entry("buttons.cancel", en="Cancel", es="Cancelar", es_MX=""),
+        _entry("errors.required", en="Required"),
+        _entry("labels.only_fr"),
+    ]
+    table = build_runtime_table(entries, "es-MX", ["es-MX", "es", "en"])
+
+    assert table.lookup() == {
+        "buttons.cancel": "Cancelar",
+        "buttons.save": "Guardar ya",
+        "errors.required": "Required",
+    }
+    assert table.lookup("buttons.") == {"buttons.cancel": "Cancelar", "buttons.save": "Guardar ya"}
+    assert table.lookup("missing.") == {}
+
+def test_prefix_artifacts_are_shared_by_key_range_and_bounded(monkeypatch):
+    """Test that prefixes selecting the same keys share one body, and that few prefix bodies are kept."""
+    monkeypatch.setattr(runtime, "MAX_CACHED_PREFIX_RANGES", 2)
+    entries = [_entry(f"k{index}", en=str(index)) for index in range(5)]
+    table = build_runtime_table(entries, "en", ["en"])
+
+    async def run():
+        whole = await table.artifact()
+        unmatched = [await table.artifact(prefix) for prefix in ("x", "y", "zz")]
+        for prefix in ("k1", "k2", "k3"):
+            await table.artifact(prefix)
+        return whole, unmatched
+
+    whole, unmatched = asyncio.run(run())
+    assert unmatched[0] is unmatched[1] is unmatched[2]
+    assert len(table._artifacts) == 3
+    assert table._artifacts[(0, 5)] is whole
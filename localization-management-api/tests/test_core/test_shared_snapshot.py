@@ -0,0 +1,145 @@
+import asyncio
+import os
+from src.localization_management_api.core.columnar import JSON_MEDIA_TYPE, encode_catalog
+from src.localization_management_api.core import shared_snapshot
+from src.localization_management_api.core.runtime import build_runtime_table
+from src.localization_management_api.core.shared_snapshot import (
+    MappedCatalog,
+    MappedSnapshot,
+    SharedSnapshot,
+    build_mapped_catalog,
+)
+
+ENTRIES = [
+    {
+        "id": "2",
+        "key": "buttons.save",
+        "category": "buttons",
+        "description": None,
+        "created_at": "2024-07-01T00:00:00+00:00",
+        "updated_at": "2024-07-01T00:00:00+00:00",
+        "translations": {
+            "en": {"value": "Save", "updated_at": "2024-07-02T00:00:00+00:00"},
+            "es": {"value": "", "updated_at": None},
+        },
+    },
+    {
+        "id": "1",
+        "key": "buttons.cancel",
+        "category": "buttons",
+        "description": "Dismisses a dialog",
+        "created_at": "2024-07-01T00:00:00+00:00",
+        "updated_at": "2024-07-01T00:00:00+00:00",
+        "translations": {
+            "en": {"value": "Cancel", "updated_at": "2024-07-02T00:00:00+00:00"},
+            "es": {"value": "Cancelar", "updated_at": "2024-07-03T00:00:00+00:00"},
+            "fr": {"value": "Annuler", "updated_at": "2024-07-03T00:00:00+00:00"},
+        },
+    },
+    {
+        "id": "3",
+        "key": "titles.home",
+        "category": None,
+        "description": None,
+        "created_at": "2024-07-01T00:00:00+00:00",
+        "updated_at": "2024-07-01T00:00:00+00:00",
+        "translations": {
+            "en": {"value": "Home", "updated_at": "2024-07-02T00:00:00+00:00"},
+            "es": {"value": "Inicio", "updated_at": "2024-07-02T00:00:00+00:00"},
+        },
+    },
+]
+LANGUAGES = ["en", "es"]
+
+def _write(path, catalog_tag, entries=ENTRIES):
+    body = encode_catalog(entries, LANGUAGES, JSON_MEDIA_TYPE)
+    path.write_bytes(build_mapped_catalog(entries, LANGUAGES, catalog_tag, body))
+    return body
+
+def test_mapped_catalog_round_trip(tmp_path):
+    """Test that entries read from the mapping are the ones written, in order."""
+    path = tmp_path / "catalog.snapshot"
+    body = _write(path, '"v1"')
+    mapped = MappedCatalog(path)
+
+    assert mapped.catalog_tag == '"v1"'
+    assert mapped.languages == LANGUAGES
+    assert list(mapped.entries()) == ENTRIES
+    assert b"".join(mapped.iter_catalog_json(chunk_size=7)) == body
+    assert mapped.catalog_json_size == len(body)
+
+def test_mapped_snapshot_reads_entries_like_a_list(tmp_path):
+    """Test that the mapped stand-in for a catalog snapshot indexes, slices and iterates entries."""
+    path = tmp_path / "catalog.snapshot"
+    _write(path, '"v1"')
+    snapshot = MappedSnapshot(MappedCatalog(path))
+
+    assert snapshot.languages == LANGUAGES
+    assert len(snapshot.entries) == len(ENTRIES)
+    assert list(snapshot.entries) == ENTRIES
+    assert snapshot.entries[-1] == ENTRIES[-1]
+    assert snapshot.entries[1:] == ENTRIES[1:]
+
+def test_mapped_catalog_resolves_like_the_runtime_table(tmp_path):
+    """Test that lookups on the mapping match tables built from the entries."""
+    path = tmp_path / "catalog.snapshot"
+    _write(path, '"v1"')
+    mapped = MappedCatalog(path)
+
+    table = build_runtime_table(ENTRIES, "es", ["es", "en"])
+    assert mapped.resolve(["es", "en"]) == (table.keys, table.values)
+    assert mapped.resolve(["es", "en"], "buttons.") == (["buttons.cancel", "buttons.save"], ["Cancelar", "Save"])
+    assert mapped.resolve(["es"], "buttons.s") == ([], [])
+    assert mapped.resolve(["en"], "zzz") == ([], [])
+
+def test_shared_snapshot_publishes_and_swaps(tmp_path):
+    """Test that a published catalog is mapped by every reader and replaced atomically."""
+    path = tmp_path / "catalog.snapshot"
+    writer = SharedSnapshot(str(path), check_interval=0)
+    reader = SharedSnapshot(str(path), check_interval=0)
+
+    async def publish(snapshot, catalog_tag, is_current=lambda: True):
+        snapshot.publish(ENTRIES, LANGUAGES, catalog_tag, is_current)
+        await asyncio.sleep(0)
+        while snapshot._publish_task is not None:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(publish(writer, '"v1"'))
+    first = reader.current('"v1"')
+    assert first is not None
+    assert reader.current('"v2"') is None
+
+    # A catalog that changed while it was being written is not put in place
+    asyncio.run(publish(writer, '"v2"', is_current=lambda: False))
+    assert reader.current('"v2"') is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    asyncio.run(publish(writer, '"v2"'))
+    assert reader.current('"v2"') is not None
+    assert reader.swaps == 2
+    # Readers of the previous file keep a working mapping
+    assert list(first.entries()) == ENTRIES
+
+def test_shared_snapshot_writes_a_copy_and_cleans_up_on_failure(tmp_path, monkeypatch):
+    """Test that later edits to the entries do not reach the file, and failed writes leave no temp file."""
+    path = tmp_path / "catalog.snapshot"
+    writer = SharedSnapshot(str(path), check_interval=0)
+    entries = [{**entry, "translations": dict(entry["translations"])} for entry in ENTRIES]
+
+    async def publish(catalog_tag):
+        writer.publish(entries, LANGUAGES, catalog_tag, lambda: True)
+        # Patched on the loop the way the catalog cache does it
+        entries[0]["translations"]["en"] = {"value": "Changed", "updated_at": None}
+        while writer._publish_task is not None:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(publish('"v1"'))
+    assert list(writer.current('"v1"').entries()) == ENTRIES
+
+    def failing_replace(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(shared_snapshot.os, "replace", failing_replace)
+    asyncio.run(publish('"v2"'))
+    assert writer.current('"v2"') is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,46 @@
+import asyncio
+import httpx
+from src.localization_management_api.core.supabase_client import ScopedPostgrestClient
+
+def _make_client(http_client, token):
+    return ScopedPostgrestClient(
+        "https://example.supabase.co/rest/v1",
+        headers={"apikey": "service-key", "Authorization": f"Bearer {token}"},
+        http_client=http_client,
+    )
+
+def test_scoped_clients_keep_their_own_token():
+    """Test that concurrent clients over one pool each send their own token."""
+    seen = []
+
+    async def handler(request):
+        await asyncio.sleep(0)
+        seen.append((request.url.path, request.headers["Authorization"]))
+        return httpx.Response(200, json=[])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            clients = [_make_client(http_client, f"token-{n}") for n in range(5)]
+            await asyncio.gather(*(
+                client.table("translations").select("*").execute()
+                for client in clients
+            ))
+            assert "Authorization" not in http_client.headers
+
+    asyncio.run(run())
+    assert sorted(seen) == [("/rest/v1/translations", f"Bearer token-{n}") for n in range(5)]
+
+def test_scoped_client_calls_rpc():
+    """Test that RPC calls go to the function endpoint of the REST API."""
+    seen = []
+
+    async def handler(request):
+        seen.append((request.method, request.url.path))
+        return httpx.Response(200, json=[{"language_code": "en"}])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            return await _make_client(http_client, "token").rpc("translation_completion", {}).execute()
+
+    assert asyncio.run(run()).data == [{"language_code": "en"}]
+    assert seen == [("POST", "/rest/v1/rpc/translation_completion")]
@@ -0,0 +1,144 @@
+import asyncio
+from src.localization_management_api.core import write_behind
+from src.localization_management_api.core.cache import CatalogCache
+from src.localization_management_api.core.write_behind import WriteBehindBuffer
+from src.localization_management_api.repositories.memory import MemoryRepository
+
+def _repository(monkeypatch):
+    repository = MemoryRepository()
+    repository.add_language("en", "English")
+    key = repository.add_key("buttons.save", "buttons")
+
+    async def get_catalog_repository(supabase):
+        return repository
+
+    cache = CatalogCache()
+    monkeypatch.setattr(write_behind, "get_postgrest_client", lambda access_token: access_token)
+    monkeypatch.setattr(write_behind, "get_catalog_repository", get_catalog_repository)
+    monkeypatch.setattr(write_behind, "get_catalog_cache", lambda: cache)
+    return repository, key["id"]
+
+def test_edits_to_one_cell_are_coalesced(monkeypatch):
+    """Test that a burst of edits to the same cell is written once, with the last value."""
+    repository, key_id = _repository(monkeypatch)
+    upserts = []
+    upsert_translations = repository.upsert_translations
+
+    async def counting_upsert(rows, chunk_size, concurrency):
+        upserts.append(len(rows))
+        return await upsert_translations(rows, chunk_size, concurrency)
+
+    monkeypatch.setattr(repository, "upsert_translations", counting_upsert)
+
+    async def run():
+        buffer = WriteBehindBuffer(flush_interval=0.01)
+        for value in ("S", "Sa", "Sav", "Save"):
+            buffer.add(key_id, "en", value, "token")
+        pending = buffer.pending
+        await asyncio.sleep(0.05)
+        return pending, buffer.pending, await repository.fetch_translations_for_keys([key_id])
+
+    pending, after, translations = asyncio.run(run())
+    assert pending == 1
+    assert after == 0
+    assert upserts == [1]
+    assert translations[key_id]["en"]["value"] == "Save"
+
+def test_failed_rows_are_retried_and_flushed_on_stop(monkeypatch):
+    """Test that rows that fail to write are kept and written by the shutdown flush."""
+    repository, key_id = _repository(monkeypatch)
+    upsert_translations = repository.upsert_translations
+    failures = [RuntimeError("connection reset")]
+
+    async def flaky_upsert(rows, chunk_size, concurrency):
+        if failures:
+            raise failures.pop()
+        return await upsert_translations(rows, chunk_size, concurrency)
+
+    monkeypatch.setattr(repository, "upsert_translations", flaky_upsert)
+
+    async def run():
+        buffer = WriteBehindBuffer(flush_interval=60)
+        buffer.add(key_id, "en", "Save", "token")
+        first = await buffer.flush()
+        await buffer.stop()
+        return first, buffer.pending, await repository.fetch_translations_for_keys([key_id])
+
+    first, pending, translations = asyncio.run(run())
+    assert first == {"flushed": 1, "updated": 0, "unchanged": 0, "failed": 1, "pending": 1}
+    assert pending == 0
+    assert translations[key_id]["en"]["value"] == "Save"
+
+def test_reads_see_queued_edits_before_they_are_written(monkeypatch):
+    """Test that queued edits reach the cached catalog and entries read from the database."""
+    repository, key_id = _repository(monkeypatch)
+    cache = write_behind.get_catalog_cache()
+
+    async def run():
+        entries, languages = await repository.load_catalog()
+        cache.store_snapshot(entries, languages, cache.version)
+        buffer = WriteBehindBuffer(flush_interval=60)
+        version = cache.version
+        buffer.add(key_id, "en", "Save", "token")
+        versions = [cache.version]
+
+        cached = cache.get_snapshot().by_id[key_id]["translations"]["en"]["value"]
+        fresh, _ = await repository.load_catalog()
+        buffer.overlay(fresh, ["es"])
+        other_language = fresh[0]["translations"]["en"]["value"]
+        buffer.overlay(fresh)
+        overlaid = fresh[0]["translations"]["en"]["value"]
+        stored = (await repository.fetch_translations_for_keys([key_id])).get(key_id, {})
+
+        await buffer.flush()
+        versions.append(cache.version)
+        return version, versions, cached, other_language, overlaid, stored, buffer.unflushed
+
+    version, versions, cached, other_language, overlaid, stored, unflushed = asyncio.run(run())
+    assert versions == [version, version + 1]
+    assert cached == "Save"
+    assert other_language == ""
+    assert overlaid == "Save"
+    assert "en" not in stored
+    assert not unflushed
+
+def test_flush_only_writes_its_own_buffer(monkeypatch):
+    """Test that flushing one buffer, as POST /localizations/flush does, leaves other workers' edits queued."""
+    repository, key_id = _repository(monkeypatch)
+
+    async def run():
+        this_worker = WriteBehindBuffer(flush_interval=60)
+        other_worker = WriteBehindBuffer(flush_interval=60)
+        this_worker.add(key_id, "en", "Save", "token")
+        other_worker.add(key_id, "en", "Save all", "token")
+        summary = await this_worker.flush()
+        stored = await repository.fetch_translations_for_keys([key_id])
+        return summary, other_worker.pending, stored
+
+    summary, other_pending, stored = asyncio.run(run())
+    assert summary["flushed"] == 1
+    assert other_pending == 1
+    assert stored[key_id]["en"]["value"] == "Save"
+
+def test_edits_are_written_with_their_editors_token(monkeypatch):
+    """Test that a flush writes each user's edits with that user's own credentials, once per user."""
+    repository, key_id = _repository(monkeypatch)
+    other_key_id = repository.add_key("buttons.cancel", "buttons")["id"]
+    tokens = []
+
+    async def get_catalog_repository(supabase):
+        tokens.append(supabase)
+        return repository
+
+    monkeypatch.setattr(write_behind, "get_catalog_repository", get_catalog_repository)
+
+    async def run():
+        buffer = WriteBehindBuffer(flush_interval=60)
+        buffer.add(key_id, "en", "Save", "alice")
+        buffer.add(other_key_id, "en", "Cancel", "bob")
+        buffer.add(key_id, "en", "Save all", "alice")
+        return await buffer.flush()
+
+    summary = asyncio.run(run())
+    assert summary["flushed"] == 2
+    assert sorted(tokens) == ["alice", "bob"]